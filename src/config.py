@@ -18,6 +18,17 @@ db_connection_string = f'postgresql://{db_user}:{db_password}@{db_hostname}:{db_
 class Config:
     SECRET_KEY = uuid4().hex
     SQLALCHEMY_DATABASE_URI = db_connection_string
+    # Room for every distinct statement the models build, so SQLAlchemy compiles each
+    # one once; the default of 500 is shared with the statements the ORM emits itself.
+    # The pool covers the stats pages' concurrent requests, and pre-ping/recycle
+    # replace connections the server has dropped before a request tries to use them
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'query_cache_size': 1200,
+        'pool_size': 20,
+        'max_overflow': 40,
+        'pool_pre_ping': True,
+        'pool_recycle': 3600,
+    }
     DISCOGS_KEY = os.environ.get('DISCOGS_KEY')
     DISCOGS_SECRET = os.environ.get('DISCOGS_SECRET')
     TIMEZONE = os.environ.get('TIMEZONE')
@@ -26,4 +37,8 @@ class Config:
     # Flask-Assets
     LESS_BIN = '/usr/bin/lessc'
     ASSETS_DEBUG = False
-    ASSETS_AUTO_BUILD = True
+    # Bundles are built once in create_app(); don't re-check them on every render
+    ASSETS_AUTO_BUILD = False
+    # Gzip for HTML/JSON responses, see databass.compress_response()
+    COMPRESS_MIN_SIZE = 1024  # bytes
+    COMPRESS_LEVEL = 6
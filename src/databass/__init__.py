@@ -1,19 +1,100 @@
+import gzip
 import os
-from flask import Flask, g
+from flask import Flask, Response, current_app, g, request
 from flask_assets import Environment, Bundle
 from dotenv import load_dotenv
 from .db.base import app_db
-from .db.util import ensure_db_placeholders
+from .db.models import Base
+from .db.util import ensure_db_placeholders, ensure_indexes
 from .routes import register_routes
+from .releases.routes import release_bp
+from .artists.routes import artist_bp
+from .labels.routes import label_bp
+from .errors.routes import error_bp
 
 load_dotenv()
 VERSION = os.environ.get("VERSION")
 print(f"App version: {VERSION}")
 
+# Database URIs whose tables and placeholder entries have already been set up
+INITIALIZED_DATABASES: set[str] = set()
+# Text responses worth compressing; images are already compressed
+COMPRESSIBLE_MIMETYPES = frozenset(
+    ["text/html", "text/css", "text/javascript", "application/json"]
+)
+
+
+def init_db(app: Flask) -> None:
+    """
+    Creates all tables and placeholder entries, once per database per process.
+    In-memory SQLite databases start out empty for every app, so they are always set up.
+    """
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    if uri in INITIALIZED_DATABASES:
+        return
+    Base.metadata.bind = app_db.engine
+    Base.metadata.create_all(app_db.engine)
+    ensure_indexes(app_db.engine)
+    ensure_db_placeholders()
+    app_db.session.commit()
+    if ":memory:" not in uri:
+        INITIALIZED_DATABASES.add(uri)
+
+
+def register_assets(app: Flask) -> None:
+    """
+    Registers the LESS and JS bundles and builds them once at startup.
+    build() uses the timestamp updater, so the filters only run when a source file
+    is newer than its output; with ASSETS_AUTO_BUILD disabled, page renders
+    never re-check the bundles.
+    """
+    assets = Environment(app)
+    style_bundle = Bundle(
+        "src/less/*.less",
+        filters="less,cssmin",
+        output="dist/css/style.min.css",
+        extra={"rel": "stylesheet/css"},
+    )
+    assets.register("main_styles", style_bundle)
+    style_bundle.build()
+    js_bundle = Bundle("src/js/main.js", filters="jsmin", output="dist/js/main.min.js")
+    assets.register("main_js", js_bundle)
+    js_bundle.build()
+
+
+def compress_response(response: Response) -> Response:
+    """
+    Gzips text responses for clients that accept it. Files sent with send_file
+    are passed through as they are, as are responses under COMPRESS_MIN_SIZE
+    bytes, where the gzip header outweighs the savings.
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    if not request.accept_encodings["gzip"]:
+        return response
+    data = response.get_data()
+    if len(data) < current_app.config["COMPRESS_MIN_SIZE"]:
+        return response
+    # mtime=0 keeps the output identical for identical content
+    response.set_data(
+        gzip.compress(data, current_app.config["COMPRESS_LEVEL"], mtime=0)
+    )
+    response.headers["Content-Encoding"] = "gzip"
+    return response
+
 
 def create_app():
     app = Flask(__name__, instance_relative_config=False)
     app.config.from_object("config.Config")
+    # Module loggers (e.g. databass.api.discogs) are children of app.logger
+    app.logger.setLevel((os.environ.get("LOG_LEVEL") or "INFO").upper())
 
     is_testing = (
         "PYTEST_CURRENT_TEST" in os.environ
@@ -23,53 +104,32 @@ def create_app():
     if is_testing:
         app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
         app.config["TESTING"] = True
+        # The in-memory SQLite database uses a single static connection, not a sized pool
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            key: value
+            for key, value in app.config["SQLALCHEMY_ENGINE_OPTIONS"].items()
+            if key not in ("pool_size", "max_overflow")
+        }
 
     app.static_folder = "static"
     app_db.init_app(app)
 
     if not is_testing:
-        assets = Environment(app)
-        style_bundle = Bundle(
-            "src/less/*.less",
-            filters="less,cssmin",
-            output="dist/css/style.min.css",
-            extra={"rel": "stylesheet/css"},
-        )
-        assets.register("main_styles", style_bundle)
-        style_bundle.build()
-        js_bundle = Bundle(
-            "src/js/main.js", filters="jsmin", output="dist/js/main.min.js"
-        )
-        assets.register("main_js", js_bundle)
-        js_bundle.build()
+        register_assets(app)
 
     with app.app_context():
-        from .db.models import Base, Release, Artist, Label, Genre, Review, Goal
-
-        Base.metadata.bind = app_db.engine
-        Base.metadata.create_all(app_db.engine)
-        ensure_db_placeholders()
-        app_db.session.commit()
-        from .releases.routes import release_bp
-
-        app.register_blueprint(release_bp)
-
-        from .artists.routes import artist_bp
-
-        app.register_blueprint(artist_bp)
-
-        from .labels.routes import label_bp
-
-        app.register_blueprint(label_bp)
-
-        from .errors.routes import error_bp
+        init_db(app)
 
-        app.register_blueprint(error_bp)
+    app.register_blueprint(release_bp)
+    app.register_blueprint(artist_bp)
+    app.register_blueprint(label_bp)
+    app.register_blueprint(error_bp)
+    register_routes(app)
 
-        register_routes(app)
+    @app.before_request
+    def before_request():
+        g.app_version = VERSION
 
-        @app.before_request
-        def before_request():
-            g.app_version = VERSION
+    app.after_request(compress_response)
 
-        return app
+    return app
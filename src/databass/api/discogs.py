@@ -3,23 +3,28 @@ Implements Discogs API-related functions via Discogs class methods
 """
 
 from os import getenv
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from threading import Lock
 from typing import Dict, Optional, Any
 from urllib.parse import urljoin, urlencode
+import logging
 import time
 import re
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .util import VERSION
 
 
-load_dotenv()
+log = logging.getLogger(__name__)
 DISCOGS_KEY = getenv("DISCOGS_KEY")
 DISCOGS_SECRET = getenv("DISCOGS_SECRET")
-VERSION = getenv("VERSION")
 RATE_LIMIT_THRESHOLD: float = 1.1
-DIMENSIONS_PATTERN = r"/h:\d+/w:\d+/"
-HEIGHT_PATTERN = r"/h:(\d+)/.*"
-WIDTH_PATTERN = r".*/w:(\d+)/.*"
-DISAMBIG_PATTERN = r"\s*\(\d+\)\s*$"
+CACHE_SIZE = 1024
+MAX_WORKERS = 8
+DIMENSIONS_PATTERN = re.compile(r"/h:(\d+)/w:(\d+)/")
+DISAMBIG_PATTERN = re.compile(r"\s*\(\d+\)\s*$")
 
 
 class Discogs:
@@ -29,6 +34,7 @@ class Discogs:
         url (str): The base URL for the Discogs API
         headers (dict): The headers to use for the requests
         remaining_requests (int): The number of remaining requests
+        rate_limit_lock (Lock): Serializes rate limit updates between threads
     """
 
     url: str = "https://api.discogs.com"
@@ -37,6 +43,7 @@ class Discogs:
         "Authorization": f"Discogs key={DISCOGS_KEY}, secret={DISCOGS_SECRET}",
     }
     remaining_requests: Optional[int] = None
+    rate_limit_lock: Lock = Lock()
 
     @classmethod
     def update_rate_limit(cls, response: requests.Response):
@@ -61,15 +68,20 @@ class Discogs:
     @staticmethod
     def request(endpoint: str) -> Dict[str, Any]:
         """
-        Sends request to an endpoint then updates rate limit count
+        Waits out the rate limit if throttled, sends request to an endpoint
+        then updates rate limit count
         Returns json if response code is 200
         """
-        resp = requests.get(
-            urljoin(Discogs.url, endpoint), headers=Discogs.headers, timeout=60
-        )
-        Discogs.update_rate_limit(resp)
-        if Discogs.is_throttled() is True:
-            time.sleep(5)  # Sleep for 5s to avoid exceeding rate limit
+        # Other threads wait on the lock while we sleep off the rate limit,
+        # and each request claims one from the count before it is sent
+        with Discogs.rate_limit_lock:
+            if Discogs.is_throttled() is True:
+                time.sleep(5)  # Sleep for 5s to avoid exceeding rate limit
+            if Discogs.remaining_requests is not None:
+                Discogs.remaining_requests -= 1
+        resp = SESSION.get(urljoin(Discogs.url, endpoint), timeout=60)
+        with Discogs.rate_limit_lock:
+            Discogs.update_rate_limit(resp)
         if resp.status_code == 200:
             return resp.json()
 
@@ -90,19 +102,30 @@ class Discogs:
         """
         if not name or not item_type:
             return None
-        print(f"Getting ID for {item_type}: {name}")
+        try:
+            return Discogs._search_item_id(name, item_type, artist)
+        except requests.RequestException:
+            return None
+
+    @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def _search_item_id(
+        name: str, item_type: str, artist: Optional[str]
+    ) -> Optional[str]:
+        """
+        Cached search behind get_item_id. Request errors are raised rather than
+        returned so that a failed lookup is not cached.
+        """
+        log.debug("Getting ID for %s: %s", item_type, name)
         if item_type == "release":
             query_params = {"q": artist, "type": "release", "release_title": name}
         else:
             query_params = {"q": name, "type": item_type}
         encoded_params = urlencode(query_params)
         endpoint = f"/database/search?{encoded_params}"
-        print(f"Search endpoint: {endpoint}")
+        log.debug("Search endpoint: %s", endpoint)
 
-        try:
-            res = Discogs.request(endpoint)
-        except requests.RequestException:
-            return None
+        res = Discogs.request(endpoint)
 
         item_id = None
         results = res.get("results", [])
@@ -112,7 +135,8 @@ class Discogs:
                 continue
             # remove disambiguation chars
             # e.g. "Future (4)" -> "Future"
-            result_title = re.sub(DISAMBIG_PATTERN, "", result_title)
+            if "(" in result_title:
+                result_title = DISAMBIG_PATTERN.sub("", result_title)
             if result_title == name:
                 format = result.get("format", [])
                 if "Blu-ray" in format:
@@ -122,7 +146,7 @@ class Discogs:
                     break
 
         if item_id:
-            print(f"ID for {item_type} {name}: {item_id}")
+            log.debug("ID for %s %s: %s", item_type, name, item_id)
             return item_id
 
         return None
@@ -150,22 +174,15 @@ class Discogs:
             try:
                 # Attempt to determine image dimensions from the URL
                 # Should contain a string like /h:500/w:500/ to denote the height and width
-                # Below regex first extracts that entire substring;
-                # the next extract the height and width themselves
-
-                # IN: https://........../h:250/w:500/......  OUT: "/h:250/w:500"
-                dimensions = re.findall(DIMENSIONS_PATTERN, image_url)[0]
-                # IN: "/h:250/w:500"                         OUT: 250
-                height = int(re.sub(HEIGHT_PATTERN, r"\1", dimensions))
-                # IN: "/h:250/w:500"                         OUT: 500
-                width = int(re.sub(WIDTH_PATTERN, r"\1", dimensions))
+                # IN: https://........../h:250/w:500/......  OUT: ("250", "500")
+                height, width = map(int, DIMENSIONS_PATTERN.search(image_url).groups())
 
                 # Make sure image is square; if not, try next result
                 if height == width:
                     return image_url
             except Exception:
                 continue
-        print("INFO: No square images found.")
+        log.info("No square images found.")
 
     @staticmethod
     def find_image(search_results: Dict[str, Any]) -> Optional[str]:
@@ -178,29 +195,44 @@ class Discogs:
         Returns:
             Optional[str]: The URL of the first square image found, or None if no square images are found.
         """
-        if (
-            not search_results
-            or "images" not in search_results.keys()
-            or not isinstance(search_results["images"], list)
-        ):
+        if not search_results or not isinstance(search_results.get("images"), list):
             return None
-        imgs = search_results.get("images", [])
-        print(f"{len(imgs)} candidates found")
-        for image in imgs:
-            img_url = image.get("uri")
-            height = image.get("height")
-            width = image.get("width")
-            if height == width and height is not None:
-                print(f"Square image found: {img_url}")
-                return img_url
-            print(f"Non-square image: H:{height}/W:{width} | {img_url}")
-
-        print("No square images found. Returning first image result")
-        try:
-            return imgs[0].get("uri")
-        except IndexError:
-            print("No images found in search results.")
+        imgs = search_results["images"]
+        log.debug("%d candidates found", len(imgs))
+        square = next(
+            (
+                image
+                for image in imgs
+                if image.get("height") is not None
+                and image.get("height") == image.get("width")
+            ),
+            None,
+        )
+        if square is not None:
+            img_url = square.get("uri")
+            log.debug("Square image found: %s", img_url)
+            return img_url
+
+        if not imgs:
+            log.debug("No images found in search results.")
             return None
+        log.debug("No square images found. Returning first image result")
+        return imgs[0].get("uri")
+
+    @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def _fetch_image_url(endpoint: str) -> Optional[str]:
+        """
+        Cached fetch of an item's image URL from its Discogs API endpoint,
+        e.g. /artists/123. Request errors are raised so they are not cached.
+        """
+        return Discogs.find_image(Discogs.request(endpoint))
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Clears the cached item IDs and image URLs"""
+        Discogs._search_item_id.cache_clear()
+        Discogs._fetch_image_url.cache_clear()
 
     @staticmethod
     def get_release_image_url(name: str, artist: str) -> Optional[str]:
@@ -225,16 +257,15 @@ class Discogs:
 
         release_id = Discogs.get_item_id(name=name, artist=artist, item_type="release")
         if release_id:
-            print("Got release ID. Checking for images...")
+            log.debug("Got release ID. Checking for images...")
             endpoint = f"/releases/{release_id}"
             try:
-                res = Discogs.request(endpoint)
-                img = Discogs.find_image(res)
+                img = Discogs._fetch_image_url(endpoint)
                 return img if img else None
             except requests.exceptions.RequestException:
                 return None
         else:
-            print("No search results found.")
+            log.debug("No search results found.")
             return None
 
     @staticmethod
@@ -255,12 +286,11 @@ class Discogs:
         if artist_id:
             endpoint = f"/artists/{artist_id}"
             try:
-                res = Discogs.request(endpoint)
-                return Discogs.find_image(res)
+                return Discogs._fetch_image_url(endpoint)
             except requests.exceptions.RequestException:
                 return None
         else:
-            print("No search results found.")
+            log.debug("No search results found.")
             return None
 
     @staticmethod
@@ -281,10 +311,66 @@ class Discogs:
         if label_id:
             endpoint = f"/labels/{label_id}"
             try:
-                res = Discogs.request(endpoint)
-                return Discogs.find_image(res)
+                return Discogs._fetch_image_url(endpoint)
             except requests.exceptions.RequestException:
                 return None
         else:
-            print("No search results found.")
+            log.debug("No search results found.")
             return None
+
+    @staticmethod
+    def batch_image_urls(
+        items: list[tuple[str, str, Optional[str]]],
+    ) -> list[Optional[str]]:
+        """
+        Looks up image URLs for several items concurrently.
+
+        Args:
+            items (list[tuple]): (item_type, name, artist) tuples, where item_type is
+                                 'release', 'artist', or 'label' and artist is only
+                                 used for releases.
+
+        Returns:
+            list[Optional[str]]: The image URL for each item, in the same order as `items`;
+                                 None where no image was found.
+        """
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(items))) as executor:
+            futures = [
+                executor.submit(Discogs._image_url_for, item_type, name, artist)
+                for item_type, name, artist in items
+            ]
+            return [future.result() for future in futures]
+
+    @staticmethod
+    def _image_url_for(
+        item_type: str, name: str, artist: Optional[str]
+    ) -> Optional[str]:
+        match item_type:
+            case "release":
+                return Discogs.get_release_image_url(name=name, artist=artist)
+            case "artist":
+                return Discogs.get_artist_image_url(name=name)
+            case "label":
+                return Discogs.get_label_image_url(name=name)
+            case _:
+                return None
+
+
+# Shared session so consecutive Discogs calls reuse the same keep-alive connection
+# instead of paying for a new TCP + TLS handshake on every request
+SESSION = requests.Session()
+SESSION.headers.update(Discogs.headers)
+SESSION.mount(
+    Discogs.url,
+    HTTPAdapter(
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
@@ -1,152 +1,176 @@
-from os import getenv
-from dateutil import parser as dateparser
+import re
+import time
+from functools import lru_cache
+from threading import Lock
 from typing import Optional, Dict, Any
-from dotenv import load_dotenv
 import musicbrainzngs as mbz
-import musicbrainzngs.musicbrainz
-from .util import Util
+from .util import Util, SESSION, CAA_TIMEOUT, VERSION
 from .types import ArtistInfo, LabelInfo, ReleaseInfo, EntityInfo, SearchResult
 
-load_dotenv()
-VERSION = getenv("VERSION")
+# MusicBrainz dates are YYYY, YYYY-MM or YYYY-MM-DD; only the year is needed
+YEAR_PATTERN = re.compile(r"^\s*(\d{4})")
+CAA_URL = "https://coverartarchive.org"
+CAA_CONNECT_TIMEOUT = 3.05  # seconds
+SEARCH_CACHE_TTL = 600  # seconds
+SEARCH_CACHE_SIZE = 1024
+# (release, artist, label) -> (expiry, results), see MusicBrainz.release_search()
+SEARCH_CACHE: dict[tuple[str, str, str], tuple[float, list[ReleaseInfo]]] = {}
+SEARCH_CACHE_LOCK = Lock()
+
+
+@lru_cache(maxsize=4096)
+def parse_year(raw_date: str) -> int | str:
+    """Return the year of a MusicBrainz date string, or "" if it has none"""
+    match = YEAR_PATTERN.match(raw_date)
+    return int(match.group(1)) if match else ""
+
+
+def parse_label_info(r: dict) -> dict:
+    """
+    Parse MusicBrainz release search results into dict with keys `mbid` and `name`
+    representing label info
+    """
+    labelinfo_list = r.get("label-info-list")
+    try:
+        labelinfo = labelinfo_list[0].get("label", {})
+    except (AttributeError, TypeError, IndexError):
+        labelinfo = {}
+        label_id = ""
+        label_name = ""
+
+    label_id = labelinfo.get("id")
+    label_name = labelinfo.get("name")
+
+    return {"mbid": label_id, "name": label_name}
+
+
+def parse_artist_info(r: dict) -> dict:
+    """
+    Parse MusicBrainz release search results into dict with keys `mbid` and `name`
+    representing artist info
+    """
+    try:
+        artist_info = r.get("artist-credit")[0]
+        artist_name = artist_info.get("name")
+        artist_mbid = artist_info.get("artist")["id"]
+    except (AttributeError, TypeError, IndexError):
+        artist_info = {}
+        artist_name = ""
+        artist_mbid = ""
+    return {"mbid": artist_mbid, "name": artist_name}
+
+
+def parse_date(r: dict) -> int | str:
+    """
+    Extract the release year from a MusicBrainz release, or "" if there is no valid date
+    """
+    return parse_year(r.get("date") or "")
+
+
+def parse_format(r: dict) -> str:
+    try:
+        physical_release = r.get("medium-list", [])[0]
+        fmt = physical_release.get("format")
+    except (TypeError, IndexError):
+        fmt = ""
+    return fmt
+
+
+def parse_track_count(r: dict) -> int:
+    return sum(disc.get("track-count") or 0 for disc in r.get("medium-list") or ())
+
+
+def parse_release(r: dict) -> ReleaseInfo:
+    """
+    Parse all release information from MusicBrainz search results
+    """
+    label = parse_label_info(r)
+    date = parse_date(r)
+    release_format = parse_format(r)
+    track_count = parse_track_count(r)
+    country = r.get("country")
+    release_id = r.get("id")
+    release_name = r.get("title")
+
+    artist = parse_artist_info(r)
+    return ReleaseInfo(
+        release={"name": release_name, "mbid": release_id},
+        artist=artist,
+        label=label,
+        date=date,
+        format=release_format,
+        track_count=track_count,
+        country=country,
+        release_group_id=r.get("release-group")["id"],
+    )
+
+
+def parse_search_result(search_result: SearchResult) -> EntityInfo:
+    """
+    Parse a search result from the MusicBrainz API into a dictionary with the following keys:
+    - name: The name of the item (e.g. label, artist)
+    - mbid: The MusicBrainz ID of the item
+    - begin: The start date of the item, as a datetime object or None if not available
+    - end: The end date of the item, as a datetime object or None if not available
+    - country: The country of the item, or None if not available
+    - type: The type of the item (e.g. "Label", "Artist"), or None if not available
+
+    Args:
+        search_result (dict): The raw search result dictionary from the MusicBrainz API.
+
+    Returns:
+        dict: A dictionary containing the parsed information about the item.
+    """
+    if not isinstance(search_result, dict) or not search_result:
+        raise ValueError("Invalid or empty search result passed to the function")
+
+    country = search_result.get("country")
+    item_type = search_result.get("type")
+    lifespan = search_result.get("life_span", {})
+
+    begin_raw = lifespan.get("begin")
+    end_raw = lifespan.get("end")
+    begin = Util.to_date("begin", begin_raw)
+    end = Util.to_date("end", end_raw)
+
+    item = EntityInfo(
+        name=search_result["name"],
+        mbid=search_result["id"],
+        begin=begin,
+        end=end,
+        country=country,
+        type=item_type,
+    )
+    return item
 
 
 class MbzParser:
-    @staticmethod
-    def parse_label_info(r: dict) -> dict:
-        """
-        Parse MusicBrainz release search results into dict with keys `mbid` and `name`
-        representing label info
-        """
-        labelinfo_list = r.get("label-info-list")
-        try:
-            labelinfo = labelinfo_list[0].get("label", {})
-        except (AttributeError, TypeError, IndexError):
-            labelinfo = {}
-            label_id = ""
-            label_name = ""
-
-        label_id = labelinfo.get("id")
-        label_name = labelinfo.get("name")
+    """Namespace for the parsing functions above, kept for existing callers"""
 
-        return {"mbid": label_id, "name": label_name}
-
-    @staticmethod
-    def parse_artist_info(r: dict) -> dict:
-        """
-        Parse MusicBrainz release search results into dict with keys `mbid` and `name`
-        representing artist info
-        """
-        try:
-            artist_info = r.get("artist-credit")[0]
-            artist_name = artist_info.get("name")
-            artist_mbid = artist_info.get("artist")["id"]
-        except (AttributeError, TypeError, IndexError):
-            artist_info = {}
-            artist_name = ""
-            artist_mbid = ""
-        return {"mbid": artist_mbid, "name": artist_name}
-
-    @staticmethod
-    def parse_date(r: dict) -> str:
-        try:
-            raw_date = r.get("date")
-            date = dateparser.parse(raw_date, fuzzy=True).year
-        except Exception:
-            date = ""
-        return date
-
-    @staticmethod
-    def parse_format(r: dict) -> str:
-        try:
-            physical_release = r.get("medium-list", [])[0]
-            fmt = physical_release.get("format")
-        except (TypeError, IndexError):
-            fmt = ""
-        return fmt
-
-    @staticmethod
-    def parse_track_count(r: dict) -> int:
-        track_count = 0
-        try:
-            for disc in r.get("medium-list", []):
-                track_count += disc.get("track-count")
-        except IndexError:
-            track_count = 0
-        return track_count
-
-    @staticmethod
-    def parse(r: dict) -> ReleaseInfo:
-        """
-        Parse all release information from MusicBrainz search results
-        """
-        label = MbzParser.parse_label_info(r)
-        date = MbzParser.parse_date(r)
-        release_format = MbzParser.parse_format(r)
-        track_count = MbzParser.parse_track_count(r)
-        country = r.get("country")
-        release_id = r.get("id")
-        release_name = r.get("title")
-
-        artist = MbzParser.parse_artist_info(r)
-        return ReleaseInfo(
-            release={"name": release_name, "mbid": release_id},
-            artist=artist,
-            label=label,
-            date=date,
-            format=release_format,
-            track_count=track_count,
-            country=country,
-            release_group_id=r.get("release-group")["id"],
-        )
-
-    @staticmethod
-    def parse_search_result(search_result: SearchResult) -> EntityInfo:
-        """
-        Parse a search result from the MusicBrainz API into a dictionary with the following keys:
-        - name: The name of the item (e.g. label, artist)
-        - mbid: The MusicBrainz ID of the item
-        - begin: The start date of the item, as a datetime object or None if not available
-        - end: The end date of the item, as a datetime object or None if not available
-        - country: The country of the item, or None if not available
-        - type: The type of the item (e.g. "Label", "Artist"), or None if not available
-
-        Args:
-            search_result (dict): The raw search result dictionary from the MusicBrainz API.
-
-        Returns:
-            dict: A dictionary containing the parsed information about the item.
-        """
-        if not isinstance(search_result, dict) or not search_result:
-            raise ValueError("Invalid or empty search result passed to the function")
-
-        country = search_result.get("country")
-        item_type = search_result.get("type")
-        lifespan = search_result.get("life_span", {})
-
-        begin_raw = lifespan.get("begin")
-        end_raw = lifespan.get("end")
-        begin = Util.to_date("begin", begin_raw)
-        begin = Util.to_date("begin", begin_raw)
-        end = Util.to_date("end", end_raw)
-
-        item = EntityInfo(
-            name=search_result["name"],
-            mbid=search_result["id"],
-            begin=begin,
-            end=end,
-            country=country,
-            type=item_type,
-        )
-        return item
+    parse_label_info = staticmethod(parse_label_info)
+    parse_artist_info = staticmethod(parse_artist_info)
+    parse_date = staticmethod(parse_date)
+    parse_format = staticmethod(parse_format)
+    parse_track_count = staticmethod(parse_track_count)
+    parse = staticmethod(parse_release)
+    parse_search_result = staticmethod(parse_search_result)
 
 
 class MusicBrainz:
     init = False
+    init_lock = Lock()
 
     @classmethod
     def initialize(cls):
-        if not cls.init:
+        """
+        Sets the musicbrainzngs user agent, once. Safe to call from every request thread;
+        the lock is only taken until initialization has happened.
+        """
+        if cls.init:
+            return
+        with cls.init_lock:
+            if cls.init:
+                return
             mbz.set_useragent(
                 "Databass", f"v{VERSION}", contact="https://github.com/chunned/databass"
             )
@@ -167,17 +191,36 @@ class MusicBrainz:
         Returns:
             list[ReleaseInfo]: A list of `ReleaseInfo` objects representing the search results, or `None` if no results were found.
         """  # noqa
-        if not MusicBrainz.init:
-            MusicBrainz.initialize()
+        MusicBrainz.initialize()
 
         if all(search_term is None for search_term in (release, artist, label)):
             raise ValueError("At least one query term is required")
+
+        # Searches are repeated on refresh and when going back to the results, so
+        # results are kept for SEARCH_CACHE_TTL seconds. MusicBrainz search ignores
+        # case and surrounding whitespace, so the key does too
+        key = tuple(
+            (term or "").strip().casefold() for term in (release, artist, label)
+        )
+        now = time.monotonic()
+        cached = SEARCH_CACHE.get(key)
+        if cached is not None and now < cached[0]:
+            return cached[1]
+
         results = mbz.search_releases(artist=artist, label=label, release=release)
-        search_data = []  # Will hold the main return data
-        for r in results.get("release-list"):
-            release_info = MbzParser.parse(r)
-            search_data.append(release_info)
-        return search_data
+        releases = [parse_release(r) for r in results.get("release-list") or []]
+        with SEARCH_CACHE_LOCK:
+            if len(SEARCH_CACHE) >= SEARCH_CACHE_SIZE:
+                # Evict the oldest search; dicts keep insertion order
+                SEARCH_CACHE.pop(next(iter(SEARCH_CACHE)), None)
+            SEARCH_CACHE[key] = (now + SEARCH_CACHE_TTL, releases)
+        return releases
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Clears the cached release search results"""
+        with SEARCH_CACHE_LOCK:
+            SEARCH_CACHE.clear()
 
     @staticmethod
     def label_search(name: str, mbid: Optional[str] = None) -> Optional[LabelInfo]:
@@ -193,23 +236,21 @@ class MusicBrainz:
         """  # noqa
         if not name or not isinstance(name, str):
             return None
-        if not MusicBrainz.init:
-            MusicBrainz.initialize()
+        MusicBrainz.initialize()
 
         if mbid is not None:
             # If we have MBID, we can query the label directly
             label_result = mbz.get_label_by_id(mbid, includes=["area-rels"])["label"]
-            label = MbzParser.parse_search_result(label_result)
+            label = parse_search_result(label_result)
             return label
 
         # No MBID, have to search. Assume first result is correct
-        label_results = mbz.search_labels(query=name)
+        # Search results already carry life-span, country and type, so the
+        # top result is parsed directly rather than re-fetched by its MBID
+        label_results = mbz.search_labels(query=name, limit=1)
         label_list = label_results.get("label-list")
         try:
-            label_id = label_list[0]["id"]
-            # Now that we have an MBID, call this function using that ID
-            # This call is required because begin_date/end_date are not included in search results
-            return MusicBrainz.label_search(name=name, mbid=label_id)
+            return parse_search_result(label_list[0])
         except (IndexError, TypeError):
             return None
 
@@ -227,8 +268,7 @@ class MusicBrainz:
         """
         if not name or not isinstance(name, str):
             return None
-        if not MusicBrainz.init:
-            MusicBrainz.initialize()
+        MusicBrainz.initialize()
         if mbid is not None:
             # If we have MBID, we can query the label directly
             try:
@@ -237,16 +277,15 @@ class MusicBrainz:
                 ]
             except Exception:
                 return None
-            artist = MbzParser.parse_search_result(artist_result)
+            artist = parse_search_result(artist_result)
             return artist
         # No MBID, have to search. Assume first result is correct
-        artist_results = mbz.search_artists(query=name)
+        # Search results already carry life-span, country and type, so the
+        # top result is parsed directly rather than re-fetched by its MBID
+        artist_results = mbz.search_artists(query=name, limit=1)
         artist_list = artist_results.get("artist-list")
         try:
-            artist_id = artist_list[0]["id"]
-            # Now that we have a MBID, call this function using that ID
-            # This call is required because begin_date/end_date are not included in search results
-            return MusicBrainz.artist_search(name=name, mbid=artist_id)
+            return parse_search_result(artist_list[0])
         except (TypeError, IndexError):
             return None
 
@@ -263,49 +302,47 @@ class MusicBrainz:
         """
         if not mbid or not isinstance(mbid, str):
             return 0
-        if not MusicBrainz.init:
-            MusicBrainz.initialize()
+        MusicBrainz.initialize()
 
         try:
-            release_data = mbz.get_release_by_id(
-                mbid, includes=["recordings", "media", "recording-level-rels"]
+            # Only track lengths are needed, so skip the recording relationships
+            release_data = mbz.get_release_by_id(mbid, includes=["recordings", "media"])
+            discs = release_data["release"].get("medium-list") or []
+            return sum(
+                int(track.get("length") or 0)
+                for disc in discs
+                for track in disc.get("track-list") or []
             )
-            track_data = release_data.get("release")
-            discs = track_data.get("medium-list")
-            length = 0
-            for disc in discs:
-                tracks = disc.get("track-list")
-                for track in tracks:
-                    try:
-                        track_len = track.get("length")
-                        length += int(track_len)
-                    except (KeyError, TypeError):
-                        pass
-
-            return length
         except Exception:
             return 0
 
     @staticmethod
-    def get_image(mbid: str, size: str = "250") -> Optional[bytes]:
+    def get_image(
+        mbid: str, size: str = "250", timeout: float = CAA_TIMEOUT
+    ) -> Optional[bytes]:
         """
         Search for the front cover image of a release group on MusicBrainz and return it as bytes, or return None if no image is found.
 
         Args:
             mbid (str): The MBID (MusicBrainz ID) of the release group.
             size (str): Desired size of the image in pixels, 250px by default
+            timeout (float): Seconds to wait for CoverArtArchive to send the image
 
         Returns:
             Optional[bytes]: The front cover image of the release group as bytes, or None if no image is found.
-        """
+        """  # noqa
         if not size.isdigit():
             return None
         if not mbid or not isinstance(mbid, str):
             return None
 
         try:
-            return mbz.get_release_group_image_front(mbid, size=size)
-        except musicbrainzngs.musicbrainz.ResponseError:
+            response = SESSION.get(
+                f"{CAA_URL}/release-group/{mbid}/front-{size}",
+                timeout=(CAA_CONNECT_TIMEOUT, timeout),
+            )
+            if response.ok:
+                return response.content
             covers: Dict[str, Any] = mbz.get_image_list(mbid)
             coverid = MusicBrainz._get_first_cover_id(covers)
             if coverid:
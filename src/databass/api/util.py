@@ -1,39 +1,159 @@
 import requests
+from requests.adapters import HTTPAdapter
 import datetime
-import signal
+import logging
+import re
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+import os
 from os import getenv
 from pathlib import Path
 from typing import Optional
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 
+# The .env file is loaded here once for the whole api package; the other modules
+# import from this one, so their getenv calls see its values
 load_dotenv()
 VERSION = getenv("VERSION")
+log = logging.getLogger(__name__)
 
 JPEG_HEADER = b"\xff\xd8\xff"
 PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+# First 3 bytes of a file -> (full file signature, extension), so
+# get_image_type_from_bytes needs one dict lookup rather than a check per format
+IMAGE_SIGNATURES = {
+    JPEG_HEADER[:3]: (JPEG_HEADER, ".jpg"),
+    PNG_HEADER[:3]: (PNG_HEADER, ".png"),
+}
 
 VALID_TYPES = frozenset(["release", "artist", "label"])
 VALID_DATE_TYPES = frozenset(["begin", "end"])
+# Stand-ins for a missing begin or end date
+MIN_DATE = datetime.date(1, 1, 1)
+MAX_DATE = datetime.date(9999, 12, 31)
+BEGIN_END_DATES = {"begin": MIN_DATE, "end": MAX_DATE}
 
-YEAR_FORMAT = "%Y"
-MONTH_FORMAT = "%Y-%m"
-DAY_FORMAT = "%Y-%m-%d"
+# YYYY, YYYY-MM or YYYY-MM-DD
+DATE_PATTERN = re.compile(r"([0-9]{4})(?:-([0-9]{2})(?:-([0-9]{2}))?)?")
 
-SUPPORTED_EXTENSIONS = {
+# A tuple so that the fallback scan in get_image_type_from_url checks in a fixed order
+SUPPORTED_EXTENSIONS = (
     ".jpg",
     ".jpeg",
     ".png",
     ".webp",
-}
+)
 IMG_BASE_PATH = "./databass/static/img"
+# Per-type image directories, built once: IMG_DIRS for writing files, and
+# STATIC_IMG_DIRS for the paths img_exists checks relative to the app root
+IMG_ROOT = Path(IMG_BASE_PATH)
+IMG_DIRS = {t: IMG_ROOT / t for t in VALID_TYPES}
+STATIC_IMG_DIRS = {t: Path("static/img") / t for t in VALID_TYPES}
+# URL prefix of each type's images, e.g. "/static/img/release/"
+STATIC_IMG_URLS = {t: f"/{STATIC_IMG_DIRS[t]}/" for t in VALID_TYPES}
+# item_type -> (directory mtime, {file stem: file name}), see image_index()
+IMG_INDEX: dict[str, tuple[int, dict[str, str]]] = {}
+
+
+@lru_cache(maxsize=4096)
+def parse_date_str(date_str: str) -> datetime.date:
+    """
+    Parse a YYYY, YYYY-MM or YYYY-MM-DD string into a datetime.date.
+    Cached, since the same dates come up repeatedly across search results.
+    """
+    # Pulling the fields out with a regex is several times faster than strptime;
+    # datetime.date still rejects out of range months and days
+    match = DATE_PATTERN.fullmatch(date_str)
+    if match is None:
+        raise ValueError(f"Unexpected date string format: {date_str}")
+    year, month, day = match.groups()
+    return datetime.date(int(year), int(month or 1), int(day or 1))
+
+
+@lru_cache(maxsize=1024)
+def image_type_from_url(url: str) -> str:
+    """
+    Cached implementation of Util.get_image_type_from_url. The same image URLs come up
+    repeatedly, e.g. one Discogs artist image across several releases.
+    """
+    path = urlparse(url).path.lower()
+    ext = path[path.rfind(".") :]
+    if ext in SUPPORTED_EXTENSIONS:
+        return ext
+    # Extension earlier in the path, e.g. /image.jpg/download
+    for ext in SUPPORTED_EXTENSIONS:
+        if ext in path:
+            return ext
 
+    raise ValueError(f"ERROR: No supported image type found in URL: {url}")
 
-class TimeoutException(Exception):
-    pass
 
+@lru_cache(maxsize=None)
+def image_dir(entity_type: str) -> Path:
+    """
+    Return the directory images of the given entity type are saved to.
+    The directory is created on first use only, rather than on every save.
+    """
+    img_dir = IMG_DIRS[entity_type]
+    img_dir.mkdir(parents=True, exist_ok=True)
+    return img_dir
 
-def timeout_handler(signum, frame):
-    raise TimeoutException("Request timed out")
+
+def image_index(item_type: str) -> dict[str, str]:
+    """
+    Map the file stem of each image in the item type's static directory to its file name.
+    The directory is only rescanned when its modification time changes, so each lookup
+    costs a single stat call; a new image in the directory, including one written by
+    another process, changes the mtime and triggers a rescan.
+    """
+    img_dir = STATIC_IMG_DIRS[item_type]
+    try:
+        mtime = os.stat(img_dir).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    cached = IMG_INDEX.get(item_type)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    index = {}
+    with os.scandir(img_dir) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext in SUPPORTED_EXTENSIONS and entry.is_file():
+                index.setdefault(stem, entry.name)
+    IMG_INDEX[item_type] = (mtime, index)
+    return index
+
+
+def to_static_path(file_path: Path) -> str:
+    """Convert the path of a saved image into the path it is served from"""
+    return "./" + file_path.relative_to(IMG_ROOT.parents[1]).as_posix()
+
+
+# Shared session so image downloads from the same host reuse keep-alive connections
+SESSION = requests.Session()
+SESSION.headers["User-Agent"] = (
+    f"databass/{VERSION} (https://github.com/hc-nolan/databass)"
+)
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20))
+
+CAA_TIMEOUT = 5  # seconds
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # bytes copied at a time when streaming images to disk
+MAX_IMAGE_WORKERS = 8
+# Runs image downloads that the request doesn't need to wait for, see
+# Util.get_image_in_background()
+IMAGE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=MAX_IMAGE_WORKERS, thread_name_prefix="image"
+)
+
+
+def report_image_error(future: Future) -> None:
+    """Log the error of a background image download, which nothing else sees"""
+    error = future.exception()
+    if error is not None:
+        log.error("Background image download failed", exc_info=error)
 
 
 class Util:
@@ -43,15 +163,12 @@ class Util:
 
     @staticmethod
     def to_begin_or_end(option: str) -> datetime.date:
-        match option:
-            case "begin":
-                return datetime.date(year=1, month=1, day=1)
-            case "end":
-                return datetime.date(year=9999, month=12, day=31)
-            case _:
-                raise ValueError(
-                    f"Invalid option: {option} - should be 'begin' or 'end'"
-                )
+        try:
+            return BEGIN_END_DATES[option]
+        except (KeyError, TypeError):
+            raise ValueError(
+                f"Invalid option: {option} - should be 'begin' or 'end'"
+            ) from None
 
     @staticmethod
     def to_date(begin_or_end: Optional[str], date_str: Optional[str]) -> datetime.date:
@@ -66,17 +183,7 @@ class Util:
             )
         if date_str is None:
             return Util.to_begin_or_end(begin_or_end)
-        match len(date_str):
-            case 4:
-                date = datetime.datetime.strptime(date_str, YEAR_FORMAT)
-            case 7:
-                date = datetime.datetime.strptime(date_str, MONTH_FORMAT)
-            case 10:
-                date = datetime.datetime.strptime(date_str, DAY_FORMAT)
-            case _:
-                raise ValueError(f"Unexpected date string format: {date_str}")
-
-        return date.date()
+        return parse_date_str(date_str)
 
     @staticmethod
     def today() -> str:
@@ -87,13 +194,9 @@ class Util:
     def get_image_type_from_url(url: str) -> str:
         """
         Determine the image file extension from the URL of an image file.
+        Only the URL path is considered, so query strings can't cause a false match.
         """
-        url = url.lower()
-        for ext in SUPPORTED_EXTENSIONS:
-            if ext in url:
-                return ext
-
-        raise ValueError(f"ERROR: No supported image type found in URL: {url}")
+        return image_type_from_url(url)
 
     @staticmethod
     def get_image_type_from_bytes(bytestr: bytes) -> str:
@@ -102,42 +205,33 @@ class Util:
         """
         if len(bytestr) < 8:
             raise ValueError("bytestr must be at least 8 bytes.")
-        if bytestr.startswith(JPEG_HEADER):
-            return ".jpg"
-        if bytestr.startswith(PNG_HEADER):
-            return ".png"
-        else:
-            raise ValueError(
-                f"Unsupported file type (signature: {bytestr[:8].hex()}). Supported types: jpg, png"
-            )
+        head = bytes(bytestr[:8])
+        signature, ext = IMAGE_SIGNATURES.get(head[:3], (None, None))
+        if signature is not None and head.startswith(signature):
+            return ext
+        raise ValueError(
+            f"Unsupported file type (signature: {head.hex()}). Supported types: jpg, png"
+        )
 
     @staticmethod
     def get_image_from_url(url: str, entity_type: str, entity_id: int | int):
-        response = requests.get(
-            url,
-            headers={
-                "User-Agent": f"databass/{VERSION} (https://github.com/chunned/databass)"
-            },
-        )
-        if response:
+        with SESSION.get(url, stream=True, timeout=60) as response:
+            if not response:
+                return None
             ext = Util.get_image_type_from_url(url)
-            img_filepath = IMG_BASE_PATH + f"/{entity_type}/" + str(entity_id) + ext
+            img_filepath = image_dir(entity_type) / f"{entity_id}{ext}"
+            response.raw.decode_content = True
             with open(img_filepath, "wb") as img_file:
-                img_file.write(response.content)
-            return img_filepath.replace("databass/", "")
+                shutil.copyfileobj(response.raw, img_file, DOWNLOAD_CHUNK_SIZE)
+        IMG_INDEX.pop(entity_type, None)
+        return to_static_path(img_filepath)
 
     @staticmethod
     def get_caa_image(mbid: str) -> dict:
-        from .musicbrainz import MusicBrainz
-
         """Get image from CoverArtArchive"""
         print(f"Attempting to fetch image from CoverArtArchive: {mbid}")
 
-        timeout_duration = 5
-        signal.signal(signal.SIGALRM, timeout_handler)
-        signal.alarm(timeout_duration)
-
-        img = MusicBrainz.get_image(mbid)
+        img = musicbrainz.MusicBrainz.get_image(mbid, timeout=CAA_TIMEOUT)
         if img is not None:
             print("CoverArtArchive image found")
             # CAA returns the raw image data
@@ -149,48 +243,56 @@ class Util:
         return {"image": img, "type": img_type}
 
     @staticmethod
-    def get_discogs_image(
+    def get_discogs_image_url(
         entity_type: str,
         release_name: Optional[str],
         artist_name: Optional[str],
         label_name: Optional[str],
-    ) -> dict:
-        from .discogs import Discogs
-
+    ) -> Optional[str]:
+        """Find the URL of an entity's image on Discogs, or None if there isn't one"""
         match entity_type:
             case "release":
-                img_url = Discogs.get_release_image_url(
+                return discogs.Discogs.get_release_image_url(
                     name=release_name, artist=artist_name
                 )
             case "artist":
-                img_url = Discogs.get_artist_image_url(name=artist_name)
+                return discogs.Discogs.get_artist_image_url(name=artist_name)
             case "label":
-                img_url = Discogs.get_label_image_url(name=label_name)
+                return discogs.Discogs.get_label_image_url(name=label_name)
             case _:
-                return {}
-        if img_url is None:
-            return {}
-        response = requests.get(
-            img_url,
-            headers={
-                "Accept": "application/json",
-                "User-Agent": f"databass/{VERSION} (https://github.com/hc-nolan/databass)",
-            },
-            timeout=60,
-        )
-        img = response.content
-        img_type = Util.get_image_type_from_bytes(img)
-        return {"image": img, "type": img_type}
+                return None
+
+    @staticmethod
+    def download_image(url: str, entity_type: str, entity_id: str | int) -> str:
+        """
+        Stream an image straight to disk instead of holding the whole response in memory.
+        The file type is determined from the first 8 bytes of the response.
+
+        Returns:
+            str: Path to the saved image
+        """
+        with SESSION.get(url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            head = response.raw.read(8)
+            img_type = Util.get_image_type_from_bytes(head)
+            file_path = image_dir(entity_type) / f"{entity_id}{img_type}"
+            with open(file_path, "wb") as img_file:
+                img_file.write(head)
+                shutil.copyfileobj(response.raw, img_file, DOWNLOAD_CHUNK_SIZE)
+        print(f"Image saved to {file_path}")
+        IMG_INDEX.pop(entity_type, None)
+        return to_static_path(file_path)
 
     @staticmethod
     def get_image(
         entity_type: str,
         entity_id: str | int,
-        mbid: Optional[str],
-        release_name: Optional[str],
-        artist_name: Optional[str],
-        label_name: Optional[str],
-        url: Optional[str],
+        mbid: Optional[str] = None,
+        release_name: Optional[str] = None,
+        artist_name: Optional[str] = None,
+        label_name: Optional[str] = None,
+        url: Optional[str] = None,
     ):
         if entity_type not in VALID_TYPES:
             raise ValueError(f"Unexpected entity_type: {entity_type}")
@@ -198,55 +300,59 @@ class Util:
             return Util.get_image_from_url(
                 entity_id=entity_id, entity_type=entity_type, url=url
             )
-        Path(f"{IMG_BASE_PATH}/{entity_type}").mkdir(parents=True, exist_ok=True)
-
-        img = img_type = None
-
         if mbid is not None and entity_type == "release":
             try:
                 caa_image = Util.get_caa_image(mbid=mbid)
-                img = caa_image.get("image")
-                img_type = caa_image.get("type")
             except Exception:
                 print("Image not found on CAA, checking Discogs")
-                Util.get_image(
-                    url=None,
-                    mbid=None,
+            else:
+                return Util.write_image(
                     entity_type=entity_type,
                     entity_id=entity_id,
-                    release_name=release_name,
-                    artist_name=artist_name,
-                    label_name=label_name,
+                    img_bytes=caa_image["image"],
+                    img_type=caa_image["type"],
                 )
-        else:
-            print(f"Attempting to fetch {entity_type} image from Discogs")
-            discogs_image = Util.get_discogs_image(
-                entity_type=entity_type,
-                release_name=release_name,
-                artist_name=artist_name,
-                label_name=label_name,
-            )
-            img = discogs_image.get("image")
-            img_type = discogs_image.get("type")
-
-        if img is not None and img_type is not None:
-            return Util.write_image(
-                entity_type=entity_type,
-                entity_id=entity_id,
-                img_bytes=img,
-                img_type=img_type,
+
+        print(f"Attempting to fetch {entity_type} image from Discogs")
+        img_url = Util.get_discogs_image_url(
+            entity_type=entity_type,
+            release_name=release_name,
+            artist_name=artist_name,
+            label_name=label_name,
+        )
+        if img_url is not None:
+            return Util.download_image(
+                url=img_url, entity_type=entity_type, entity_id=entity_id
             )
+        return None
+
+    @staticmethod
+    def get_image_in_background(**kwargs) -> Future:
+        """
+        Run Util.get_image on IMAGE_EXECUTOR and return at once, for callers that
+        don't use the saved path. Errors are logged by report_image_error rather
+        than raised.
+
+        Args:
+            **kwargs: Keyword arguments for Util.get_image
+
+        Returns:
+            Future: Resolves to the path of the saved image, or None
+        """
+        future = IMAGE_EXECUTOR.submit(Util.get_image, **kwargs)
+        future.add_done_callback(report_image_error)
+        return future
 
     @staticmethod
     def write_image(
         entity_id: int, entity_type: str, img_type: str, img_bytes: bytes
     ) -> str:
-        file_name = str(entity_id) + img_type
-        file_path = IMG_BASE_PATH + "/" + entity_type + "/" + file_name
+        file_path = image_dir(entity_type) / f"{entity_id}{img_type}"
         with open(file_path, "wb") as img_file:
             img_file.write(img_bytes)
         print(f"Image saved to {file_path}")
-        return file_path.replace("databass/", "")
+        IMG_INDEX.pop(entity_type, None)
+        return to_static_path(file_path)
 
     @staticmethod
     def img_exists(item_id: int, item_type: str) -> Optional[str]:
@@ -279,9 +385,12 @@ class Util:
                 f"Must be one of the following strings: {', '.join(VALID_TYPES)}"
             )
 
-        base_path = Path("static/img")
-        result = list(base_path.joinpath(item_type).glob(f"{item_id}.*"))
-        if result:
-            url = "/" + str(result[0]).replace("databass/", "")
-            return url
+        file_name = image_index(item_type).get(str(item_id))
+        if file_name is not None:
+            return STATIC_IMG_URLS[item_type] + file_name
         return None
+
+
+# musicbrainz and discogs import from this module, so they are imported last,
+# once everything they need from here is defined
+from . import discogs, musicbrainz  # noqa: E402
@@ -1,13 +1,18 @@
-from datetime import date
 from flask import Blueprint, render_template, request, flash, redirect
 from ..db.models import Artist
 from ..pagination import Pager
-from ..api.util import Util
+from ..api.util import Util, MIN_DATE, MAX_DATE
 from ..db import construct_item, update
 
 artist_bp = Blueprint("artist_bp", __name__, template_folder="templates")
 
 
+def artist_countries() -> list[str]:
+    """Sorted list of the distinct countries of all artists"""
+    countries = Artist.get_distinct_column_values("country")
+    return [c for c in countries if c is not None]
+
+
 @artist_bp.route("/artist/<int:artist_id>", methods=["GET"])
 def artist(artist_id):
     # Displays all info related to a particular artist
@@ -19,32 +24,25 @@ def artist(artist_id):
         flash(error)
         return redirect("/error", code=302)
 
-    no_end = date(9999, 12, 31)
-    no_start = date(1, 1, 1)
-    data = {"artist": artist_data, "no_end": no_end, "no_start": no_start}
+    data = {"artist": artist_data, "no_end": MAX_DATE, "no_start": MIN_DATE}
     return render_template("artist.html", data=data)
 
 
 @artist_bp.route("/artists", methods=["GET"])
 def artists():
-    countries = Artist.get_distinct_column_values("country")
-    data = {"countries": countries}
+    data = {"countries": artist_countries()}
     return render_template("artists.html", data=data, active_page="artists")
 
 
 @artist_bp.route("/artist_search", methods=["POST"])
 def artist_search():
     data = request.get_json()
-    search_results = Artist.dynamic_search(data)
     page = Pager.get_page_param(request)
-    paged_data, flask_pagination = Pager.paginate(
-        per_page=15, current_page=page, data=search_results
-    )
+    paged_data, total = Artist.search_page(data, page=page, per_page=15)
     return render_template(
         "artist_search.html",
         data=paged_data,
-        data_full=search_results,
-        pagination=flask_pagination,
+        pagination=Pager.get_pagination(page, total),
     )
 
 
@@ -58,10 +56,8 @@ def edit_artist(artist_id):
         return redirect("/error", code=302)
 
     if request.method == "GET":
-        countries = Artist.get_distinct_column_values("country")
-        countries = sorted([c for c in countries if c is not None])
         return render_template(
-            "edit_artist.html", artist=artist_data, countries=countries
+            "edit_artist.html", artist=artist_data, countries=artist_countries()
         )
 
     elif request.method == "POST":
@@ -77,7 +73,7 @@ def edit_artist(artist_id):
 
         image_url = edit_data.get("image")
         if image_url is not None:
-            if "http" and "://" in image_url:
+            if image_url.startswith(("http://", "https://")):
                 # If image is a URL, download it
                 Util.get_image(entity_type="artist", entity_id=artist_id, url=image_url)
                 artist_data.image = image_url
@@ -1,8 +1,10 @@
 from __future__ import annotations
 from datetime import datetime, date
-from typing import Any, Optional, List
+from functools import wraps
+import time
+from typing import Any, Optional, List, NamedTuple
+from flask import g, has_app_context
 
-import sqlalchemy.exc
 from sqlalchemy import (
     String,
     Integer,
@@ -10,48 +12,107 @@ from sqlalchemy import (
     DateTime,
     Date,
     func,
-    extract,
+    case,
+    and_,
+    or_,
+    select,
+    lambda_stmt,
+    true,
     distinct,
     Table,
     Column,
     CheckConstraint,
+    Index,
+    DDL,
+    event,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    mapped_column,
+    relationship,
+    declared_attr,
+    joinedload,
+    selectinload,
+    raiseload,
+    load_only,
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.engine.row import Row
-from .operations import construct_item, insert
+from .operations import construct_item, insert, STATS_CACHE
 from .base import app_db
 
+STATS_TTL = 300  # seconds
+# Placeholder names that do not refer to a specific real-world artist or label
+EXCLUDED_NAMES = ("[NONE]", "[no label]", "Various Artists")
+
+
+class ReviewText(NamedTuple):
+    timestamp: str
+    text: str
+
+
+def cached_stat(method):
+    """
+    Reuse the result of an aggregate classmethod for STATS_TTL seconds, separately for
+    each combination of positional arguments. Any insert, update or delete through
+    db.operations clears the cache, so results are never stale after a write made by
+    this app.
+    """
+
+    @wraps(method)
+    def wrapper(cls, *args):
+        key = (cls.__name__, method.__name__, *args)
+        now = time.monotonic()
+        cached = STATS_CACHE.get(key)
+        if cached is None or now >= cached[0]:
+            cached = STATS_CACHE[key] = (now + STATS_TTL, method(cls, *args))
+        return cached[1]
+
+    return wrapper
+
 
 class Base(DeclarativeBase):
     """Base class which all other database model classes are built from"""
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    date_added: Mapped[date | None] = mapped_column(default=date.today(), nullable=True)
+    date_added: Mapped[date | None] = mapped_column(
+        Date, nullable=True, default=date.today, server_default=func.current_date()
+    )
 
     @classmethod
     def added_this_year(cls):
         # Returns the number of entries where date_added is within current year
         current_year = datetime.now().year
         try:
+            # A range on the bare column, unlike extract("year", ...), can use its index
             results = (
-                app_db.session.query(cls)
-                .filter(extract("year", cls.date_added) == current_year)
-                .count()
+                app_db.session.query(func.count(cls.id))
+                .filter(
+                    cls.date_added >= date(current_year, 1, 1),
+                    cls.date_added < date(current_year + 1, 1, 1),
+                )
+                .scalar()
             )
             if current_year == 2024:
                 # This section is required for backwards compatibility
                 results += (
-                    app_db.session.query(cls).filter(cls.date_added is None).count()
+                    app_db.session.query(func.count(cls.id))
+                    .filter(cls.date_added.is_(None))
+                    .scalar()
                 )
         except Exception:
             results = 0
         return results
 
     @classmethod
-    def added_per_day_this_year(cls):
+    def added_per_day_this_year(cls, count: Optional[int] = None):
         """
         Calculates the average number of listens per day so far this year.
 
+        Args:
+            count (int, optional): The result of added_this_year, if the caller already has it.
+
         Returns:
             float: The average number of listens per day so far this year,
             rounded to 2 decimal places.
@@ -59,7 +120,8 @@ class Base(DeclarativeBase):
         days_this_year: int = date.today().timetuple().tm_yday
         if days_this_year == 0:
             return 0.0
-        count = cls.added_this_year()
+        if count is None:
+            count = cls.added_this_year()
         result = count / days_this_year
         return round(result, 2)
 
@@ -76,18 +138,35 @@ class Base(DeclarativeBase):
         """
         if not name or not isinstance(name, str):
             return None
-        try:
-            result = (
-                app_db.session.query(cls)
-                .filter(cls.name.ilike(f"%{name}%"))
-                .one_or_none()
-            )
-        except sqlalchemy.exc.MultipleResultsFound:
-            result = (
-                app_db.session.query(cls).filter(cls.name.ilike(f"%{name}%")).first()
-            )
+        # Several names can match a partial search; the first match is used either
+        # way, so first() asks for one row instead of checking for others
+        result = app_db.session.query(cls).filter(cls.name.ilike(f"%{name}%")).first()
         return result
 
+    @classmethod
+    @cached_stat
+    def get_distinct_column_values(cls, column: str) -> list:
+        """
+        Get all distinct values of a given column, sorted by the database. The result is
+        cached like the aggregate statistics, so callers must not modify the returned list.
+        :param column: String representing the column's name
+        :return: Sorted list of the unique values of the given column
+        """
+        try:
+            attribute = getattr(cls, column)
+            return app_db.session.scalars(
+                select(attribute).distinct().order_by(attribute)
+            ).all()
+        except AttributeError as e:
+            raise e
+
+
+# gin_trgm_ops, used by the name indexes, comes from the pg_trgm extension
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
 
 # Relationship tables
 label_artist_association = Table(
@@ -128,6 +207,20 @@ class MusicBrainzEntity(Base):
     image: Mapped[str | None] = mapped_column(String(), nullable=True)
     country: Mapped[str | None] = mapped_column(String(), nullable=True)
 
+    @declared_attr.directive
+    def __table_args__(cls) -> tuple:
+        # Trigram index so the name ILIKE '%...%' searches can use an index on Postgres
+        # instead of scanning the whole table. Other databases get a plain index.
+        return (
+            Index(
+                f"ix_{cls.__tablename__}_name_trgm",
+                "name",
+                postgresql_using="gin",
+                postgresql_ops={"name": "gin_trgm_ops"},
+            ),
+            Index(f"ix_{cls.__tablename__}_date_added", "date_added"),
+        )
+
     @classmethod
     def get_all(cls) -> list[Any]:
         # Return all database entries for this class
@@ -138,7 +231,8 @@ class MusicBrainzEntity(Base):
     def total_count(cls) -> int:
         # Return the count of all database entries for this class
         try:
-            results = app_db.session.query(cls).count()
+            # Query.count() would wrap a SELECT of every column in a subquery
+            results = app_db.session.query(func.count(cls.id)).scalar()
             return results if isinstance(results, int) else None
         except Exception:
             return 0
@@ -151,24 +245,12 @@ class MusicBrainzEntity(Base):
         :return: The item, if it exists, or False if the item does not exist
         """
         try:
-            result = app_db.session.query(cls).filter(cls.id == item_id).one_or_none()
+            # get() returns objects already loaded in this session without a query
+            result = app_db.session.get(cls, item_id)
             return result if result else None
         except Exception:
             return None
 
-    @classmethod
-    def get_distinct_column_values(cls, column: str) -> list:
-        """
-        Get all distinct values of a given column
-        :param column: String representing the column's name
-        :return: List of the unique values of the given column
-        """
-        try:
-            attribute = getattr(cls, column)
-            return [value for (value,) in app_db.session.query(distinct(attribute))]
-        except AttributeError as e:
-            raise e
-
     @classmethod
     def exists_by_mbid(cls, mbid: str) -> Optional[MusicBrainzEntity]:
         """
@@ -183,7 +265,11 @@ class MusicBrainzEntity(Base):
         if not mbid or not isinstance(mbid, str):
             return None
         try:
-            result = app_db.session.query(cls).filter(cls.mbid == mbid).one_or_none()
+            # Built once per class as a lambda statement; later calls only bind the MBID
+            # instead of rebuilding the query. LIMIT 1 stops at the first match
+            result = app_db.session.scalars(
+                lambda_stmt(lambda: select(cls).where(cls.mbid == mbid).limit(1))
+            ).first()
         except Exception:
             app_db.session.rollback()
             return None
@@ -205,8 +291,9 @@ class MusicBrainzEntity(Base):
         """
         if not isinstance(item_id, int) or item_id <= 0:
             return None
-        result = app_db.session.query(cls.name).where(cls.id == item_id).one_or_none()
-        return result[0] if result is not None else None
+        # get() skips the query entirely if the entity is already in the session
+        result = app_db.session.get(cls, item_id, options=[load_only(cls.name)])
+        return result.name if result is not None else None
 
     @classmethod
     def id_by_matching_name(cls, name: str) -> list[MusicBrainzEntity.id]:
@@ -223,22 +310,21 @@ class MusicBrainzEntity(Base):
         """
         if not isinstance(name, str):
             return []
-        result = app_db.session.query(cls.id).filter(cls.name.ilike(f"%{name}%")).all()
-        # .all() returns a list of tuples like [(1,), (2,)]
-        # below list comprehension unpacks it to [1, 2]
-        return [r[0] for r in result]
+        return app_db.session.scalars(
+            select(cls.id).where(cls.name.ilike(f"%{name}%"))
+        ).all()
 
 
 class Release(MusicBrainzEntity):
     __tablename__ = "release"
-    artist_id: Mapped[int] = mapped_column(ForeignKey("artist.id"))
-    label_id: Mapped[int] = mapped_column(ForeignKey("label.id"))
+    artist_id: Mapped[int] = mapped_column(ForeignKey("artist.id"), index=True)
+    label_id: Mapped[int] = mapped_column(ForeignKey("label.id"), index=True)
     year: Mapped[int] = mapped_column(Integer)
     runtime: Mapped[int] = mapped_column(Integer)
     rating: Mapped[int] = mapped_column(
         Integer, CheckConstraint("rating >= 0 AND rating <= 100")
     )
-    listen_date: Mapped[datetime] = mapped_column(DateTime)
+    listen_date: Mapped[datetime] = mapped_column(DateTime, index=True)
     track_count: Mapped[int] = mapped_column(Integer)
     main_genre_id: Mapped[int] = mapped_column(ForeignKey("genre.id"))
 
@@ -263,6 +349,7 @@ class Release(MusicBrainzEntity):
             setattr(self, key, value)
 
     @classmethod
+    @cached_stat
     def average_runtime(cls) -> float:
         """
         Calculate the average runtime of all Release entries.
@@ -282,6 +369,7 @@ class Release(MusicBrainzEntity):
         return result
 
     @classmethod
+    @cached_stat
     def total_runtime(cls) -> float:
         """
         Calculate the total runtime of all Release entries.
@@ -319,8 +407,8 @@ class Release(MusicBrainzEntity):
             app_db.session.query(
                 cls.id, cls.name, cls.rating, cls.artist_id, cls.label_id
             )
-            .limit(limit)
             .order_by(cls.rating.asc())
+            .limit(limit)
             .all()
         )
         return result
@@ -346,13 +434,14 @@ class Release(MusicBrainzEntity):
             app_db.session.query(
                 cls.id, cls.name, cls.rating, cls.artist_id, cls.label_id
             )
-            .limit(limit)
             .order_by(cls.rating.desc())
+            .limit(limit)
             .all()
         )
         return result
 
     @classmethod
+    @cached_stat
     def ratings_average(cls) -> float:
         """
         Retrieves the average rating for all releases.
@@ -369,21 +458,98 @@ class Release(MusicBrainzEntity):
         return result
 
     @classmethod
-    def home_data(cls) -> list[Row]:
+    @cached_stat
+    def stats_bundle(cls) -> dict:
         """
-        Retrieves a list of data for the home page, including artist information,
-        release information, and associated genres.
+        Computes the release totals and averages shown on the stats pages in a
+        single query, rather than one query per statistic.
 
         Returns:
-            list[Row]: A list of Release database entries
+            dict: The results of total_count, ratings_average, average_runtime,
+                  total_runtime and added_this_year, keyed by those method names.
+        """
+        current_year = datetime.now().year
+        this_year = and_(
+            cls.date_added >= date(current_year, 1, 1),
+            cls.date_added < date(current_year + 1, 1, 1),
+        )
+        if current_year == 2024:
+            # Same backwards compatibility as Base.added_this_year
+            this_year = or_(this_year, cls.date_added.is_(None))
+        try:
+            row = app_db.session.query(
+                func.count(cls.id).label("total"),
+                func.avg(cls.rating).label("rating"),
+                func.avg(cls.runtime).label("runtime_avg"),
+                func.sum(cls.runtime).label("runtime_sum"),
+                func.count(cls.id).filter(this_year).label("this_year"),
+            ).one()
+        except Exception:
+            return {
+                "total_count": 0,
+                "ratings_average": 0.0,
+                "average_runtime": 0,
+                "total_runtime": 0,
+                "added_this_year": 0,
+            }
+        return {
+            "total_count": row.total,
+            "ratings_average": round(row.rating or 0, 2),
+            "average_runtime": (
+                round(row.runtime_avg / 60000, 2) if row.runtime_avg is not None else 0
+            ),
+            "total_runtime": (
+                round(row.runtime_sum / 3600000, 2)
+                if row.runtime_sum is not None
+                else 0
+            ),
+            "added_this_year": row.this_year,
+        }
+
+    @classmethod
+    def home_page(
+        cls, per_page: int, after: Optional[int] = None, before: Optional[int] = None
+    ) -> tuple[list[Release], bool, bool]:
+        """
+        Retrieves one page of the home page's release table, newest release first.
+        Pages are found by release ID (keyset pagination) rather than with OFFSET, so
+        every page costs the same however far back it is.
+
+        Args:
+            per_page (int): The number of releases per page
+            after (int): [optional] Return the page of releases older than this release ID
+            before (int): [optional] Return the page of releases newer than this release ID
 
-        The data is ordered by the release ID in descending order.
+        Returns:
+            tuple: The releases on the page ordered by ID in descending order, whether
+                   there is a newer page, and whether there is an older page
         """
         try:
-            results = (app_db.session.query(cls).order_by(cls.id.desc())).all()
+            # Load the relationships the home table renders up front rather than
+            # lazily per release; genres is many-to-many so it gets its own query.
+            # Anything else the table starts rendering raises instead of quietly
+            # running a query per row
+            query = app_db.session.query(cls).options(
+                joinedload(cls.artist),
+                joinedload(cls.main_genre),
+                selectinload(cls.genres),
+                raiseload("*"),
+            )
+            # One extra row is fetched to tell whether there is another page
+            if before is not None:
+                results = (
+                    query.filter(cls.id > before)
+                    .order_by(cls.id.asc())
+                    .limit(per_page + 1)
+                    .all()
+                )
+                return results[:per_page][::-1], len(results) > per_page, True
+            if after is not None:
+                query = query.filter(cls.id < after)
+            results = query.order_by(cls.id.desc()).limit(per_page + 1).all()
         except Exception:
-            return []
-        return results
+            return [], False, False
+        return results[:per_page], after is not None, len(results) > per_page
 
     @classmethod
     def listens_this_year(cls) -> int:
@@ -398,7 +564,10 @@ class Release(MusicBrainzEntity):
             current_year = datetime.now().year
             results = (
                 app_db.session.query(func.count(Release.id))
-                .filter(extract("year", Release.listen_date) == current_year)
+                .filter(
+                    Release.listen_date >= datetime(current_year, 1, 1),
+                    Release.listen_date < datetime(current_year + 1, 1, 1),
+                )
                 .scalar()
             )
         except Exception:
@@ -416,11 +585,54 @@ class Release(MusicBrainzEntity):
         Returns:
             list[Release]: A list of Release objects representing the matching releases.
         """
+        # Search results only render columns; any relationship access would be a
+        # query per result, so make it raise instead
+        results = cls._search_query(data).options(raiseload("*")).order_by(cls.id).all()
+        return results
+
+    @classmethod
+    def search_page(
+        cls, data: dict, page: int, per_page: int
+    ) -> tuple[list[Release], int]:
+        """
+        Like `dynamic_search`, but only loads one page of results from the database.
+        No other pages are held between requests; the search pages' next/previous
+        buttons send the search again with the new page number.
+
+        Args:
+            data (dict): Search criteria, as accepted by `dynamic_search`
+            page (int): The page to return, starting from 1
+            per_page (int): The number of results per page
+
+        Returns:
+            tuple: The releases on the requested page, ordered by ID,
+                   and the total number of matching releases
+        """
+        from ..pagination import Pager
+
+        start, end = Pager.get_page_range(per_page, page)
+        query = cls._search_query(data)
+        total = query.with_entities(func.count(cls.id)).scalar()
+        results = (
+            query.options(raiseload("*"))
+            .order_by(cls.id)
+            .offset(start)
+            .limit(end - start)
+            .all()
+        )
+        return results, total
+
+    @classmethod
+    def _search_query(cls, data: dict):
+        """Build the query behind `dynamic_search` and `search_page`"""
         if not isinstance(data, dict):
             raise ValueError("Search criteria must be a dictionary")
         from .util import apply_comparison_filter
 
         query = app_db.session.query(cls)
+        # Plain predicates are collected and applied with a single filter() call,
+        # rather than copying the query once per search key
+        conditions = []
         search_keys = [
             "name",
             "artist",
@@ -434,13 +646,15 @@ class Release(MusicBrainzEntity):
             if value == "" or value == [""] or key not in search_keys:
                 pass  # Empty value or key not meant for searching, do nothing
             elif key == "name":
-                query = query.filter(cls.name.ilike(f"%{value}%"))
+                conditions.append(cls.name.ilike(f"%{value}%"))
             elif key == "artist":
-                artist_ids = Artist.id_by_matching_name(name=value)
-                query = query.filter(cls.artist_id.in_(artist_ids))
+                # Subquery rather than fetching the matching IDs first, so the
+                # whole search runs as one statement
+                artist_ids = select(Artist.id).where(Artist.name.ilike(f"%{value}%"))
+                conditions.append(cls.artist_id.in_(artist_ids))
             elif key == "label":
-                label_ids = Label.id_by_matching_name(name=value)
-                query = query.filter(cls.label_id.in_(label_ids))
+                label_ids = select(Label.id).where(Label.name.ilike(f"%{value}%"))
+                conditions.append(cls.label_id.in_(label_ids))
             elif key == "rating":
                 operator = data["rating_comparison"]  # <, ==, or >
                 query = apply_comparison_filter(
@@ -452,18 +666,72 @@ class Release(MusicBrainzEntity):
                     query=query, model=cls, key=key, operator=operator, value=value
                 )
             elif key == "main_genre":
-                query = query.filter(cls.main_genre.has(name=value))
+                conditions.append(cls.main_genre.has(name=value))
             else:
                 # generic handler for any other search key not matching above (country, genre)
-                query = query.filter(getattr(cls, key) == value)
-        results = query.order_by(cls.id).all()
-        return results
+                conditions.append(getattr(cls, key) == value)
+        if conditions:
+            query = query.filter(*conditions)
+        return query
+
+    @classmethod
+    def get_with_relations(cls, release_id: int) -> Optional[Release]:
+        """
+        Retrieves a release along with what the release page renders from it: its
+        artist and label, its genres, and its reviews.
+
+        Args:
+            release_id (int): The ID of the release to retrieve.
+
+        Returns:
+            Optional[Release]: The release, or None if it does not exist.
+        """
+        try:
+            return (
+                app_db.session.query(cls)
+                .options(
+                    joinedload(cls.artist),
+                    joinedload(cls.label),
+                    joinedload(cls.main_genre),
+                    selectinload(cls.genres),
+                    selectinload(cls.reviews).load_only(Review.timestamp, Review.text),
+                    # Anything else the page touches would be a query per access
+                    raiseload("*"),
+                )
+                .filter(cls.id == release_id)
+                .one_or_none()
+            )
+        except Exception:
+            return None
+
+    @classmethod
+    def others_with(cls, release: Release, column: str) -> list[Release]:
+        """
+        Retrieves the other releases that share an artist or label with the given release.
+
+        Args:
+            release (Release): The release to find the siblings of.
+            column (str): The shared foreign key, either 'artist_id' or 'label_id'.
+
+        Returns:
+            list[Release]: The other releases, ordered by ID. Only their IDs are loaded.
+        """
+        if column not in ("artist_id", "label_id"):
+            raise ValueError(f"Unsupported column: {column}")
+        attribute = getattr(cls, column)
+        return (
+            app_db.session.query(cls)
+            .options(load_only(cls.id), raiseload("*"))
+            .filter(attribute == getattr(release, column), cls.id != release.id)
+            .order_by(cls.id)
+            .all()
+        )
 
     @classmethod
     def get_reviews(
         cls,
         release_id: int,
-    ) -> list[Row]:
+    ) -> list[ReviewText]:
         """
         Retrieves a list of reviews for the specified release ID.
 
@@ -471,7 +739,8 @@ class Release(MusicBrainzEntity):
             release_id (int): The ID of the release to retrieve reviews for.
 
         Returns:
-            list[Row]: List of review objects, where each contains timestamp & text of the review.
+            list[ReviewText]: List of reviews, each with the review's text and its
+                              timestamp formatted as YYYY-MM-DD HH:MM.
 
         Raises:
             ValueError: If `release_id` is a non-integer or an integer less than 0.
@@ -479,12 +748,15 @@ class Release(MusicBrainzEntity):
         if not isinstance(release_id, int) or release_id < 0:
             raise ValueError("Release ID must be a positive integer.")
         reviews = (
-            app_db.session.query(
-                func.to_char(Review.timestamp, "YYYY-MM-DD HH24:MI").label("timestamp"),
-                Review.text,
-            ).where(Review.release_id == release_id)
+            app_db.session.query(Review.timestamp, Review.text).where(
+                Review.release_id == release_id
+            )
         ).all()
-        return reviews
+        # Formatted here rather than with to_char() for every row in the database
+        return [
+            ReviewText(timestamp.strftime("%Y-%m-%d %H:%M"), text)
+            for timestamp, text in reviews
+        ]
 
     @staticmethod
     def create_new(data: dict) -> int:
@@ -506,43 +778,44 @@ class Release(MusicBrainzEntity):
         new_release = construct_item("release", data)
         release_id = insert(new_release)
 
-        if data["image"] is not None:
-            Util.get_image(
-                entity_type="release",
-                entity_id=release_id,
-                url=data["image"],
-                mbid=None,
-                release_name=None,
-                artist_name=None,
-                label_name=None,
-            )
-        else:
-            Util.get_image(
-                url=None,
-                entity_type="release",
-                entity_id=release_id,
-                release_name=data["name"],
-                artist_name=data["artist_name"],
-                label_name=data["label_name"],
-                mbid=data["release_group_mbid"],
-            )
-
+        # The image is served by release ID and its path isn't stored, so the
+        # download doesn't have to hold up the request that submitted the release
         try:
-            Util.get_image(
-                url=None,
-                entity_type="release",
-                entity_id=release_id,
-                release_name=data["name"],
-                artist_name=data["artist_name"],
-                label_name=data["label_name"],
-                mbid=data["release_group_mbid"],
-            )
+            if data["image"] is not None:
+                Util.get_image_in_background(
+                    entity_type="release",
+                    entity_id=release_id,
+                    url=data["image"],
+                    mbid=None,
+                    release_name=None,
+                    artist_name=None,
+                    label_name=None,
+                )
+            else:
+                Util.get_image_in_background(
+                    url=None,
+                    entity_type="release",
+                    entity_id=release_id,
+                    release_name=data["name"],
+                    artist_name=data["artist_name"],
+                    label_name=data["label_name"],
+                    mbid=data["release_group_mbid"],
+                )
         except KeyError:
             pass
 
         return release_id
 
 
+# Covers the columns ratings_lowest/ratings_highest select, so Postgres can read the
+# first rows in rating order straight from the index
+Index(
+    "ix_release_rating_cover",
+    Release.rating,
+    postgresql_include=["id", "name", "artist_id", "label_id"],
+)
+
+
 class ArtistOrLabel(MusicBrainzEntity):
     """
     Abstract base class for Artist and Label models with shared fields.
@@ -598,15 +871,19 @@ class ArtistOrLabel(MusicBrainzEntity):
             Release.artist_id if cls.__tablename__ == "artist" else Release.label_id
         )
 
+        # Count releases per integer foreign key first, then join the much smaller
+        # aggregate to pick up names and images
+        counts = (
+            select(relation_id.label("entity_id"), func.count().label("count"))
+            .group_by(relation_id)
+            .subquery("release_counts")
+        )
         try:
             query = (
-                app_db.session.query(
-                    cls.name, func.count(relation_id).label("count"), cls.image
-                )
-                .join(Release, relation_id == cls.id)
+                app_db.session.query(cls.name, counts.c.count, cls.image)
+                .join(counts, counts.c.entity_id == cls.id)
                 .where(cls.name.notin_(["[NONE]", "Various Artists", "", "[no label]"]))
-                .group_by(cls.name, cls.image)
-                .order_by(func.count(relation_id).desc())
+                .order_by(counts.c.count.desc())
                 .limit(limit)
                 .all()
             )
@@ -636,32 +913,40 @@ class ArtistOrLabel(MusicBrainzEntity):
         Raises:
             TypeError: If the method is called on a class that is not either the Artist or Label class.
         """
-        if cls.__tablename__ == "artist":
-            relation_id = Release.artist_id
-        elif cls.__tablename__ == "label":
-            relation_id = Release.label_id
-        else:
-            raise TypeError("Method only supported by Artist and Label classes.")
+        query = cls._ratings_and_counts_query()
         try:
-            entities = (
-                app_db.session.query(
-                    cls.id,
-                    cls.name,
-                    func.avg(Release.rating).label("average_rating"),
-                    func.count(Release.id).label("release_count"),
-                    cls.image,
-                )
-                .join(Release, relation_id == cls.id)
-                .where(cls.name.notin_(["[NONE]", "Various Artists"]))
-                .having(func.count(Release.id) > 1)
-                .group_by(cls.name, cls.id)
-                .order_by(func.avg(Release.rating).desc())
-                .all()
-            )
+            entities = query.order_by(func.avg(Release.rating).desc()).all()
         except Exception:
             return []
         return entities
 
+    @classmethod
+    def _release_relation_id(cls):
+        """The Release foreign key column that refers to this model"""
+        if cls.__tablename__ == "artist":
+            return Release.artist_id
+        if cls.__tablename__ == "label":
+            return Release.label_id
+        raise TypeError("Method only supported by Artist and Label classes.")
+
+    @classmethod
+    def _ratings_and_counts_query(cls):
+        """Build the query behind `average_ratings_and_total_counts`, without ordering or running it"""
+        relation_id = cls._release_relation_id()
+        return (
+            app_db.session.query(
+                cls.id,
+                cls.name,
+                func.avg(Release.rating).label("average_rating"),
+                func.count(Release.id).label("release_count"),
+                cls.image,
+            )
+            .join(Release, relation_id == cls.id)
+            .where(cls.name.notin_(["[NONE]", "Various Artists"]))
+            .having(func.count(Release.id) > 1)
+            .group_by(cls.name, cls.id)
+        )
+
     @classmethod
     def average_ratings_bayesian(
         cls,
@@ -691,42 +976,47 @@ class ArtistOrLabel(MusicBrainzEntity):
                 f"Unrecognized sort order: {sort_order}. Valid orders are: 'desc', 'asc'"
             )
 
-        entities = cls.average_ratings_and_total_counts()
-        entity_count = len(entities)
-        if entity_count == 0:
-            return []
-
-        from .util import mean_avg_and_count, bayesian_avg
-
-        mean_avg, mean_count = mean_avg_and_count(entities)
-        items = []
-        for entity in entities:
-            entity_avg = int(entity.average_rating)
-            entity_count = int(entity.release_count)
-
-            weight = entity_count / (entity_count + mean_count)
-            bayesian = bayesian_avg(
-                item_weight=weight, item_avg=entity_avg, mean_avg=mean_avg
-            )
-            items.append(
-                {
-                    "id": entity.id,
-                    "name": entity.name,
-                    "rating": round(bayesian),
-                    "image": entity.image,
-                    "count": entity.release_count,
-                }
+        # Per-entity averages and counts, then the means across all entities;
+        # the weighting and sort both happen in the database
+        entities = cls._ratings_and_counts_query().cte("entities")
+        entity_avg = func.trunc(entities.c.average_rating)
+        stats = app_db.session.query(
+            func.avg(entity_avg).label("mean_avg"),
+            func.avg(entities.c.release_count).label("mean_count"),
+        ).cte("stats")
+        weight = entities.c.release_count / (
+            entities.c.release_count + stats.c.mean_count
+        )
+        bayesian = (weight * entity_avg + (1 - weight) * stats.c.mean_avg).label(
+            "bayesian"
+        )
+        try:
+            results = (
+                app_db.session.query(
+                    entities.c.id,
+                    entities.c.name,
+                    bayesian,
+                    entities.c.image,
+                    entities.c.release_count,
+                )
+                .join(stats, true())
+                .where(entities.c.average_rating.is_not(None))
+                .order_by(bayesian.desc() if sort_order == "desc" else bayesian.asc())
+                .all()
             )
+        except Exception:
+            return []
 
-        # Sort results by Bayesian average
-        # 'order' is used for sorted(reverse=..)
-        # Hence, order = True means descending; False means ascending
-        order = True
-        if sort_order == "asc":
-            order = False
-
-        sorted_entities = sorted(items, key=lambda k: k["rating"], reverse=order)
-        return sorted_entities
+        return [
+            {
+                "id": entity.id,
+                "name": entity.name,
+                "rating": round(entity.bayesian),
+                "image": entity.image,
+                "count": entity.release_count,
+            }
+            for entity in results
+        ]
 
     @classmethod
     def statistic(cls, sort_order: str, metric: str, item_property: str) -> list[dict]:
@@ -742,23 +1032,35 @@ class ArtistOrLabel(MusicBrainzEntity):
             raise ValueError(
                 f"Unrecognized sort order: {sort_order}. Valid orders are: 'desc', 'asc'"
             )
-
-        order = "desc"
-        if sort_order == "lowest":
-            order = "asc"
-
-        result = cls.average_ratings_and_total_counts()
-        if metric == "average":
-            if item_property == "rating":
-                return sorted(result, key=lambda k: k["rating"], reverse=order)
-            if item_property == "runtime":
-                return sorted(result, key=lambda k: k["runtime"], reverse=order)
-
-        elif metric == "total":
-            if item_property == "count":
-                return sorted(result, key=lambda k: k["count"], reverse=order)
-            if item_property == "runtime":
-                return sorted(result, key=lambda k: k["runtime"], reverse=order)
+        statistics = {
+            ("average", "rating"): func.avg(Release.rating),
+            ("average", "runtime"): func.avg(Release.runtime),
+            ("total", "count"): func.count(Release.id),
+            ("total", "runtime"): func.sum(Release.runtime),
+        }
+        stat = statistics.get((metric, item_property))
+        if stat is None:
+            raise ValueError(f"Unsupported statistic: {metric} {item_property}")
+
+        relation_id = cls._release_relation_id()
+        # Sorted by the database rather than in Python after fetching every row
+        results = (
+            app_db.session.query(cls.id, cls.name, stat.label("value"), cls.image)
+            .join(Release, relation_id == cls.id)
+            .where(cls.name.notin_(["[NONE]", "Various Artists"]))
+            .group_by(cls.name, cls.id)
+            .order_by(stat.desc() if sort_order == "desc" else stat.asc())
+            .all()
+        )
+        return [
+            {
+                "id": result.id,
+                "name": result.name,
+                item_property: result.value,
+                "image": result.image,
+            }
+            for result in results
+        ]
 
     @classmethod
     def dynamic_search(cls, filters: dict) -> List[ArtistOrLabel]:
@@ -777,17 +1079,55 @@ class ArtistOrLabel(MusicBrainzEntity):
         Raises:
             ValueError: If `filters` is not a dict
         """
+        return cls._search_query(filters).options(raiseload("*")).all()
+
+    @classmethod
+    def search_page(
+        cls, filters: dict, page: int, per_page: int
+    ) -> tuple[List[ArtistOrLabel], int]:
+        """
+        Like `dynamic_search`, but only loads one page of results from the database.
+        Paging works as in `Release.search_page`.
+
+        Args:
+            filters (dict): Search filters, as accepted by `dynamic_search`
+            page (int): The page to return, starting from 1
+            per_page (int): The number of results per page
+
+        Returns:
+            tuple: The model instances on the requested page, ordered by ID,
+                   and the total number of matching results
+        """
+        from ..pagination import Pager
+
+        start, end = Pager.get_page_range(per_page, page)
+        query = cls._search_query(filters)
+        total = query.with_entities(func.count(cls.id)).scalar()
+        results = (
+            query.options(raiseload("*"))
+            .order_by(cls.id)
+            .offset(start)
+            .limit(end - start)
+            .all()
+        )
+        return results, total
+
+    @classmethod
+    def _search_query(cls, filters: dict):
+        """Build the query behind `dynamic_search` and `search_page`"""
         if not isinstance(filters, dict):
             raise ValueError("filters must be a dictionary")
         from .util import apply_comparison_filter
 
         query = app_db.session.query(cls)
+        # Plain predicates are collected and applied with a single filter() call
+        conditions = []
         search_keys = ["name", "begin_date", "end_date", "country", "type"]
         for key, value in filters.items():
             if value == "" or key not in search_keys:
                 pass  # Empty value or key not meant from searching, pass
             elif key == "name":
-                query = query.filter(cls.name.ilike(f"%{value}%"))
+                conditions.append(cls.name.ilike(f"%{value}%"))
             elif key == "begin_date":
                 operator = filters["begin_comparison"]
                 if operator not in ["<", "=", ">"]:
@@ -807,15 +1147,40 @@ class ArtistOrLabel(MusicBrainzEntity):
                     query=query, model=cls, key=key, operator=operator, value=value
                 )
             else:
-                query = query.filter(getattr(cls, key) == value)
+                conditions.append(getattr(cls, key) == value)
         # Filter out names that do not refer to a specific real-world entity
-        results = (
-            query.where(cls.name != "[NONE]")
-            .where(cls.name != "[no label]")
-            .where(cls.name != "Various Artists")
-            .all()
-        )
-        return results
+        conditions.append(cls.name.notin_(EXCLUDED_NAMES))
+        return query.filter(*conditions)
+
+    @classmethod
+    def exists_by_mbid_or_name(
+        cls, mbid: Optional[str], name: Optional[str]
+    ) -> Optional[ArtistOrLabel]:
+        """
+        Find an existing entry by MBID or, failing that, by name, in a single query.
+        An MBID match is preferred over a name match, as in calling exists_by_mbid()
+        then exists_by_name().
+
+        Args:
+            mbid (str): The MBID to match exactly.
+            name (str): The name to match partially, case-insensitively.
+
+        Returns:
+            Optional[ArtistOrLabel]: The matching entry if one exists, otherwise None.
+        """
+        has_mbid = bool(mbid) and isinstance(mbid, str)
+        has_name = bool(name) and isinstance(name, str)
+        if not has_mbid and not has_name:
+            return None
+        conditions = []
+        if has_mbid:
+            conditions.append(cls.mbid == mbid)
+        if has_name:
+            conditions.append(cls.name.ilike(f"%{name}%"))
+        query = app_db.session.query(cls).filter(or_(*conditions))
+        if has_mbid and has_name:
+            query = query.order_by(case((cls.mbid == mbid, 0), else_=1))
+        return query.first()
 
     @classmethod
     def create_if_not_exist(cls, name: str, mbid: str = None) -> int:
@@ -832,13 +1197,15 @@ class ArtistOrLabel(MusicBrainzEntity):
         from ..api import MusicBrainz, Util
         from .operations import insert, construct_item
 
-        item_exists = cls.exists_by_mbid(mbid)
-        if item_exists:
-            return item_exists.id
-        item_exists = cls.exists_by_name(name)
+        item_exists = cls.exists_by_mbid_or_name(mbid=mbid, name=name)
         if item_exists:
             return item_exists.id
         else:
+            # End the lookup's transaction so its connection goes back to the pool
+            # while MusicBrainz is queried, unless there are changes waiting to be saved
+            session = app_db.session
+            if not (session.new or session.dirty or session.deleted):
+                session.commit()
             # Grab image, start/end date, type, and insert
             if cls.__name__ == "Label":
                 item_search = MusicBrainz.label_search(name=name, mbid=mbid)
@@ -855,35 +1222,23 @@ class ArtistOrLabel(MusicBrainzEntity):
                     f"Unsupported class: {cls} - supported classes are Label and Artist"
                 )
 
-            # check if we got a mbid from the above search
-            if item_search["mbid"]:
-                item_exists = cls.exists_by_mbid(item_search["mbid"])
+            try:
+                item_id = insert(new_item)
+            except IntegrityError:
+                # The MBID found by the search above belongs to an existing entry
+                item_exists = cls.exists_by_mbid(item_search.get("mbid"))
                 if item_exists:
                     return item_exists.id
-
-            item_id = insert(new_item)
-            # TODO: see if Util.get_image() can be refactored; instead of label_name and artist_name use item_name
+                raise
+            # The image is saved to a path derived from the ID, so nothing waits on it
             if cls.__name__ == "Label":
-                Util.get_image(
-                    entity_type="label",
-                    entity_id=item_id,
-                    label_name=name,
-                    mbid=None,
-                    release_name=None,
-                    artist_name=None,
-                    url=None,
+                Util.get_image_in_background(
+                    entity_type="label", entity_id=item_id, label_name=name
                 )
             elif cls.__name__ == "Artist":
-                Util.get_image(
-                    entity_type="artist",
-                    entity_id=item_id,
-                    artist_name=name,
-                    mbid=None,
-                    release_name=None,
-                    label_name=None,
-                    url=None,
+                Util.get_image_in_background(
+                    entity_type="artist", entity_id=item_id, artist_name=name
                 )
-            # TODO: figure out a way to call Util.get_image() upon any insertion so it doesn't need to be manually called
         return item_id
 
 
@@ -935,23 +1290,6 @@ class Goal(Base):
             .scalar()
         )
 
-    def update_goal(self):
-        """
-        Updates the `end_actual` attribute of the `Goal` instance if the number of new releases
-        since the goal's `start_date` is greater than or equal to the `amount` attribute.
-
-        This method is used to check if a goal has been met, based on the number of new releases since
-        the goal's start date. If the goal has been met, the `end_actual` attribute is updated
-        to the current time.
-        """
-        print(
-            f"Target amount: {self.amount} - Actual amount: {self.new_releases_since_start_date}"
-        )
-        if self.type == "release":
-            if self.new_releases_since_start_date >= self.amount:
-                print("Updating end_actual to current time")
-                self.completed = datetime.now()
-
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         for key, value in kwargs.items():
@@ -972,22 +1310,47 @@ class Goal(Base):
             return results
         return []
 
+    @classmethod
+    def incomplete_with_counts(cls) -> list[tuple[Goal, int]]:
+        """
+        Query database for incomplete goals along with each goal's
+        new_releases_since_start_date, counted for all goals in a single query
+        Returns a list of (goal, count) tuples; empty list if the query fails
+        """
+        try:
+            return (
+                app_db.session.query(cls, func.count(Release.id))
+                .outerjoin(Release, Release.listen_date >= cls.start)
+                .where(cls.completed.is_(None))
+                .group_by(cls.id)
+                .all()
+            )
+        except Exception:
+            return []
+
     @classmethod
     def check_goals(cls) -> None:
         """
         Checks all incomplete goals and updates them if the goal has been met.
 
-        This method retrieves all incomplete goals from the database, then for each goal it calls the `update_goal()` method to check if the goal has been met based on the number of new releases since the goal's start date. If the goal has been met, the `end_actual` attribute is updated to the current time, and the updated goal is saved to the database.
+        This method retrieves all incomplete goals from the database along with the number of new releases since each goal's start date. Each goal whose count has reached its amount has its `completed` attribute set to the current time, and the completed goals are saved to the database in a single commit.
         """
-        active_goals = cls.get_incomplete()
-        if active_goals is not None:
-            for goal in active_goals:
-                goal.update_goal()
-                if goal.completed:
-                    # Goal is complete; updating db entry
-                    from .operations import update
-
-                    update(goal)
+        completed = [
+            goal
+            for goal, release_count in cls.incomplete_with_counts()
+            if goal.type == "release" and release_count >= goal.amount
+        ]
+        if not completed:
+            return
+        now = datetime.now()
+        for goal in completed:
+            goal.completed = now
+        try:
+            app_db.session.commit()
+        except Exception:
+            app_db.session.rollback()
+            raise
+        STATS_CACHE.clear()
 
 
 class Review(Base):
@@ -1014,19 +1377,6 @@ class Genre(Base):
         "Label", secondary=label_genre_association, back_populates="genres"
     )
 
-    @classmethod
-    def get_distinct_column_values(cls, column: str) -> list:
-        """
-        Get all distinct values of a given column
-        :param column: String representing the column's name
-        :return: List of the unique values of the given column
-        """
-        try:
-            attribute = getattr(cls, column)
-            return [value for (value,) in app_db.session.query(distinct(attribute))]
-        except AttributeError as e:
-            raise e
-
     @staticmethod
     def create_genres(genres: str) -> list:
         """
@@ -1036,25 +1386,51 @@ class Genre(Base):
             genres (str): A comma-separated string of genre names to create.
 
         Returns:
-            List of the genre objects
+            List of the genre objects, in the order they appear in `genres`
 
-        This function splits the `genres` string on commas to get a list of individual genre names.
-        For each genre name, it constructs a new `Genre` object with the genre name and inserts it.
+        This function splits the `genres` string on commas to get a list of individual genre names,
+        ignoring surrounding whitespace, blanks and repeats. Existing genres are looked up in one
+        query and any missing ones are inserted together.
         """
-        from .operations import insert, construct_item
+        from .operations import insert_all
 
-        out_genres = []
-        for genre in genres.split(","):
-            exists = Genre.exists_by_name(genre)
-            if exists:
-                out_genres.append(exists)
-            else:
-                # new genre, create and insert
-                item = construct_item("genre", {"name": genre})
-                genre_id = insert(item)
-                item.id = genre_id
-                out_genres.append(item)
-        return out_genres
+        names = list(
+            dict.fromkeys(name.strip() for name in genres.split(",") if name.strip())
+        )
+        if not names:
+            return []
+        cache = Genre.request_cache()
+        existing = {name: cache[name] for name in names if name in cache}
+        lookup_names = [name for name in names if name not in existing]
+        if lookup_names:
+            existing.update(
+                (genre.name, genre)
+                for genre in app_db.session.query(Genre).filter(
+                    Genre.name.in_(lookup_names)
+                )
+            )
+        missing_names = [name for name in names if name not in existing]
+        if missing_names:
+            missing = [Genre(name=name) for name in missing_names]
+            insert_all(missing)
+            # Pair by the names we already have; reading genre.name after the commit
+            # would reload every new genre
+            existing.update(zip(missing_names, missing))
+        cache.update(existing)
+        return [existing[name] for name in names]
+
+    @staticmethod
+    def request_cache() -> dict[str, Genre]:
+        """
+        Genres already looked up or created during the current request, by name, so that
+        e.g. a release's main genre and genre list do not query for the same genre twice.
+        Outside of an app context a new, empty dict is returned each time.
+        """
+        if not has_app_context():
+            return {}
+        if "genre_cache" not in g:
+            g.genre_cache = {}
+        return g.genre_cache
 
     @staticmethod
     def create_if_not_exists(name: str) -> Genre:
@@ -1064,14 +1440,19 @@ class Genre(Base):
         Returns:
             Genre object; either newly created or existing
         """
+        cache = Genre.request_cache()
+        if name in cache:
+            return cache[name]
         exists = Genre.exists_by_name(name)
         if exists:
+            cache[name] = exists
             return exists
 
         # No existing entry; create one
         genre = construct_item(model_name="genre", data_dict={"name": name})
         genre_id = insert(genre)
         genre.id = genre_id
+        cache[name] = genre
         return genre
 
     @classmethod
@@ -1089,5 +1470,7 @@ class Genre(Base):
         """
         if not name or not isinstance(name, str):
             return None
-        result = app_db.session.query(cls).filter(cls.name == name).one_or_none()
+        result = app_db.session.scalars(
+            lambda_stmt(lambda: select(cls).where(cls.name == name))
+        ).one_or_none()
         return result
@@ -6,6 +6,8 @@ from .base import app_db
 
 load_dotenv()
 TIMEZONE = getenv("TIMEZONE")
+# Results of whole-table aggregates, keyed by (model, method); see models.cached_stat
+STATS_CACHE: dict = {}
 
 
 def insert(item: app_db.Model) -> int:
@@ -24,8 +26,45 @@ def insert(item: app_db.Model) -> int:
     """
     try:
         app_db.session.add(item)
+        app_db.session.flush()
+        # The ID is known after the flush; reading it after commit() would reload the row
+        item_id = item.id
         app_db.session.commit()
-        return item.id
+        STATS_CACHE.clear()
+        return item_id
+    except IntegrityError as err:
+        app_db.session.rollback()
+        raise IntegrityError(
+            f"SQLite Integrity Error: \n{err}\n", params=err.params, orig=err
+        )
+    except Exception as err:
+        app_db.session.rollback()
+        raise Exception(f"Unexpected error: {err}")
+
+
+def insert_all(items: list[app_db.Model]) -> list[int]:
+    """
+    Insert several new database entries with a single commit. Rows of the same model are
+    sent to the database as one batched INSERT rather than one statement per row.
+
+    Args:
+        items (list[app_db.Model]): Instances of database model classes to insert.
+
+    Returns:
+        list[int]: The IDs of the newly inserted items, in the same order as `items`.
+
+    Raises:
+        IntegrityError: If there is a SQLite integrity error when inserting the items.
+        Exception: For any other unexpected errors.
+    """
+    try:
+        app_db.session.add_all(items)
+        app_db.session.flush()
+        # Collected before commit() expires the items, which would reload each one
+        item_ids = [item.id for item in items]
+        app_db.session.commit()
+        STATS_CACHE.clear()
+        return item_ids
     except IntegrityError as err:
         app_db.session.rollback()
         raise IntegrityError(
@@ -47,13 +86,13 @@ def update(item: app_db.Model) -> None:
         Exception: For any unexpected errors that occur during the update operation.
     """
     try:
-        model_class = type(item)
-        existing_item = app_db.session.query(model_class).get(item.id)
+        existing_item = app_db.session.get(type(item), item.id)
         if existing_item:
             for key in item.__dict__:
                 if not key.startswith("_"):  # Ignore private attributes
                     setattr(existing_item, key, getattr(item, key))
             app_db.session.commit()
+            STATS_CACHE.clear()
         else:
             raise Exception(f"No entry found with ID {item.id}")
     except Exception as err:
@@ -70,14 +109,16 @@ def delete(item_type: str, item_id: str) -> None:
         item_id (str): The ID of the database item to delete.
 
     Raises:
+        ValueError: If there is no entry of the given type with the given ID.
         Exception: If no model is found for the given item_type, or if an unexpected error occurs during the delete operation.
     """
     try:
         model = get_model(item_type)
-        to_delete = app_db.session.query(model).where(model.id == item_id).one()
+        to_delete = app_db.session.get(model, item_id)
         if to_delete:
             app_db.session.delete(to_delete)
             app_db.session.commit()
+            STATS_CACHE.clear()
         else:
             raise ValueError(f"No {item_type} entry found for {item_id}")
     except Exception as err:
@@ -1,13 +1,17 @@
+import time
 from typing import Type
 from sqlalchemy.orm import query as sql_query
-from .operations import insert
+from .operations import insert, STATS_CACHE
+from .base import app_db
 
 # from .models import *
 # above imports all of the below
 from sqlalchemy import extract, Integer
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.engine.row import Row
 from .models import Artist, Release, Label, MusicBrainzEntity, Base, Goal, Genre
+from .models import STATS_TTL
+
+ALL_STATS_KEY = ("get_all_stats",)
 
 
 def get_valid_models():
@@ -46,57 +50,31 @@ def apply_comparison_filter(
     return query
 
 
-# Utility function to calculate the mean average rating and total release count
-# for releases associated with a specific Label/Artist
-def mean_avg_and_count(entities: list[Row]) -> (int, int):
-    """
-    :param entities: List of SQLAlchemy Rows; returned from average_ratings_and_total_counts()
-    :return: A tuple representing the mean average release rating and mean release count
-    """
-    avg = count = 0
-    total = len(entities)
-    for item in entities:
-        try:
-            avg += int(item.average_rating)
-            count += int(item.release_count)
-        except AttributeError:
-            # TODO: consider logging info about the erroring release
-            # Have not encountered this in practice, but if it is encountered
-            # it means there is a corrupt entry
-            total -= 1
-
-    mean_avg = avg / total
-    mean_count = count / total
-    return mean_avg, mean_count
-
-
-# Utility function used to calculate Bayesian average
-def bayesian_avg(item_weight: float, item_avg: float, mean_avg: float) -> float:
+def get_all_stats():
     """
-    Calculates the Bayesian average rating for a given item weight and average
-    :param item_weight: Float representing the item's weight for the formula;
-                        calculated as: count / (count + mean count)
-    :param item_avg: Item's average rating
-    :param mean_avg: Mean average release rating for all database entries
-    :return: Float representing the Bayesian average rating for releases associated with this item
+    Statistics shown on the home and stats pages. The whole dict is kept in
+    STATS_CACHE for STATS_TTL seconds, so it is dropped along with the individual
+    statistics whenever db.operations writes to the database.
     """
-    if not item_weight or not item_avg or not mean_avg:
-        raise ValueError("Input missing one of the required values")
-    return item_weight * item_avg + (1 - item_weight) * mean_avg
-
+    now = time.monotonic()
+    cached = STATS_CACHE.get(ALL_STATS_KEY)
+    if cached is not None and now < cached[0]:
+        return cached[1]
 
-def get_all_stats():
+    release_stats = Release.stats_bundle()
     stats = {
-        "total_listens": Release.total_count(),
+        "total_listens": release_stats["total_count"],
         "total_artists": Artist.total_count(),
         "total_labels": Label.total_count(),
-        "average_rating": Release.ratings_average(),
-        "average_runtime": Release.average_runtime(),
-        "total_runtime": Release.total_runtime(),
-        "releases_this_year": Release.added_this_year(),
+        "average_rating": release_stats["ratings_average"],
+        "average_runtime": release_stats["average_runtime"],
+        "total_runtime": release_stats["total_runtime"],
+        "releases_this_year": release_stats["added_this_year"],
         "artists_this_year": Artist.added_this_year(),
         "labels_this_year": Label.added_this_year(),
-        "releases_per_day": Release.added_per_day_this_year(),
+        "releases_per_day": Release.added_per_day_this_year(
+            release_stats["added_this_year"]
+        ),
         "artists_per_day": Artist.added_per_day_this_year(),
         "labels_per_day": Label.added_per_day_this_year(),
         "top_rated_labels": Label.average_ratings_bayesian()[0:10],
@@ -106,6 +84,7 @@ def get_all_stats():
         "top_average_artists": Artist.average_ratings_and_total_counts()[0:10],
         "top_average_labels": Label.average_ratings_and_total_counts()[0:10],
     }
+    STATS_CACHE[ALL_STATS_KEY] = (now + STATS_TTL, stats)
     return stats
 
 
@@ -117,20 +96,27 @@ def ensure_db_placeholders():
 
     This function ensures these entries exist.
     """
-    label = Label()
-    label.id = 0
-    label.name = "Unknown"
-    try:
-        insert(label)
-    except IntegrityError:
-        pass
-    artist = Artist()
-    artist.id = 0
-    artist.name = "Unknown"
-    try:
-        insert(artist)
-    except IntegrityError:
-        pass
+    for model in (Label, Artist):
+        if app_db.session.get(model, 0) is not None:
+            continue
+        placeholder = model()
+        placeholder.id = 0
+        placeholder.name = "Unknown"
+        try:
+            insert(placeholder)
+        except IntegrityError:
+            pass
+
+
+def ensure_indexes(engine) -> None:
+    """
+    create_all() skips tables that already exist, along with their indexes, so
+    databases created before the search, date and foreign key indexes were added
+    need them created separately.
+    """
+    for model in (Release, Artist, Label):
+        for index in model.__table__.indexes:
+            index.create(engine, checkfirst=True)
 
 
 def handle_submit_data(submit_data: dict) -> None:
@@ -181,8 +167,7 @@ def handle_submit_data(submit_data: dict) -> None:
 
     genres = []
     if submit_data.get("genres"):
-        for g in submit_data["genres"].split(","):
-            genres.append(Genre.create_if_not_exists(g))
+        genres = Genre.create_genres(submit_data["genres"])
     submit_data["genres"] = genres
     Release.create_new(submit_data)
     Goal.check_goals()
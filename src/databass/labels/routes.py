@@ -1,8 +1,7 @@
 from flask import Blueprint, render_template, request, flash, redirect
-from datetime import date
 from ..db.models import Label
 from ..db import construct_item, update
-from ..api.util import Util
+from ..api.util import Util, MIN_DATE, MAX_DATE
 
 label_bp = Blueprint("label_bp", __name__, template_folder="templates")
 
@@ -16,9 +15,7 @@ def label(label_id):
         error = f"No label with ID {label_id} found."
         flash(error)
         return redirect("/error", code=302)
-    no_end = date(9999, 12, 31)
-    no_start = date(1, 1, 1)
-    data = {"label": label_data, "no_end": no_end, "no_start": no_start}
+    data = {"label": label_data, "no_end": MAX_DATE, "no_start": MIN_DATE}
     return render_template("label.html", data=data)
 
 
@@ -35,16 +32,12 @@ def label_search():
     from ..pagination import Pager
 
     data = request.get_json()
-    search_results = Label.dynamic_search(data)
     page = Pager.get_page_param(request)
-    paged_data, flask_pagination = Pager.paginate(
-        per_page=15, current_page=page, data=search_results
-    )
+    paged_data, total = Label.search_page(data, page=page, per_page=15)
     return render_template(
         "label_search.html",
         data=paged_data,
-        data_full=search_results,
-        pagination=flask_pagination,
+        pagination=Pager.get_pagination(page, total),
     )
 
 
@@ -83,7 +76,7 @@ def edit_label(label_id):
         try:
             if edit_data["image"]:
                 image = edit_data["image"]
-                if "http" and "://" in image:
+                if image.startswith(("http://", "https://")):
                     # If image is a URL, download it
                     new_image = Util.get_image(
                         entity_type="release", entity_id=label_id, url=image
@@ -44,10 +44,18 @@ class Pager:
     ):
         start, end = Pager.get_page_range(per_page, current_page)
         paged_data = data[start:end]
-        flask_pagination = Pagination(
+        flask_pagination = Pager.get_pagination(current_page, len(data))
+        return paged_data, flask_pagination
+
+    @staticmethod
+    def get_pagination(current_page: int, total: int) -> Pagination:
+        """
+        Builds the Flask pagination object for a page of results, for callers
+        that have already fetched only that page
+        """
+        return Pagination(
             page=current_page,
-            total=len(data),
+            total=total,
             search=False,
             # record_name='latest_releases'
         )
-        return paged_data, flask_pagination
@@ -9,31 +9,26 @@ release_bp = Blueprint("release_bp", __name__, template_folder="templates")
 @release_bp.route("/release/<string:release_id>", methods=["GET"])
 def release(release_id):
     # Displays all info related to a particular release
-    release_data = models.Release.exists_by_id(release_id)
+    # Artist and label come back with the release
+    release_data = models.Release.get_with_relations(release_id)
     if not release_data:
         error = f"No release with id {release_id} found."
         flash(error)
         return redirect("/error", code=302)
-    artist_data = models.Artist.exists_by_id(release_data.artist_id)
-    label_data = models.Label.exists_by_id(release_data.label_id)
     label = release_data.label
     label_releases = []
     if not label.name == "[NONE]":
-        for rel in label.releases:
-            if not rel.id == release_data.id:
-                label_releases.append(rel)
+        label_releases = models.Release.others_with(release_data, "label_id")
 
     artist = release_data.artist
     artist_releases = []
     if artist.name not in ("Various Artists", "[NONE]"):
-        for rel in artist.releases:
-            if not rel.id == release_data.id:
-                artist_releases.append(rel)
+        artist_releases = models.Release.others_with(release_data, "artist_id")
 
     data = {
         "release": release_data,
-        "artist": artist_data,
-        "label": label_data,
+        "artist": artist,
+        "label": label,
         "label_releases": label_releases,
         "artist_releases": artist_releases,
     }
@@ -50,13 +45,11 @@ def edit(release_id):
         return redirect("/error", code=302)
 
     if request.method == "GET":
-        try:
-            release_image = release_data.image[1:]
-        except TypeError:
-            release_image = None
+        # Stored paths start with "./"; the template needs them from the "/" onwards
+        release_image = release_data.image[1:] if release_data.image else None
         label_data = models.Label.exists_by_id(release_data.label_id)
         artist_data = models.Artist.exists_by_id(release_data.artist_id)
-        countries = sorted(models.Release.get_distinct_column_values("country"))
+        countries = models.Release.get_distinct_column_values("country")
         return render_template(
             "edit.html",
             release=release_data,
@@ -73,7 +66,7 @@ def edit(release_id):
         try:
             if edit_data["image"]:
                 image = edit_data["image"]
-                if "http" and "://" in image:
+                if image.startswith(("http://", "https://")):
                     # If image is a URL, download it
                     new_image = Util.get_image(
                         entity_type="release", entity_id=release_id, url=image
@@ -130,32 +123,16 @@ def edit(release_id):
         # genres
         try:
             genres = edit_data["genres"]
-            genre_objs = []
             if genres:
-                for g in genres.split(","):
-                    genre_objs.append(models.Genre.create_if_not_exists(g))
-                submit_data["genres"] = genre_objs
+                submit_data["genres"] = models.Genre.create_genres(genres)
         except KeyError:
             pass
 
-        updated_release = db.construct_item("release", submit_data)
-        # construct_item() will produce a unique ID primary key, so we need to set it to the original one for update() to work
-        try:
-            updated_release.id = release_id
-            # grab the other release so we can inject the data that doesn't change
-            old_release = models.Release.exists_by_id(release_id)
-            updated_release.artist_id = old_release.artist_id
-            updated_release.label_id = old_release.label_id
-            updated_release.runtime = old_release.runtime
-            updated_release.track_count = old_release.track_count
-
-        except KeyError:
-            error = (
-                "Edit data missing ID, unable to update an existing entry without ID."
-            )
-            flash(error)
-            return redirect("/error", code=302)
-        db.update(updated_release)
+        # Edit the release loaded above in place; fields that were not submitted
+        # keep their current values
+        for key, value in submit_data.items():
+            setattr(release_data, key, value)
+        db.update(release_data)
         return redirect("/", 302)
 
 
@@ -170,12 +147,14 @@ def delete():
         flash(error)
         return redirect("/error", code=302)
 
-    if not models.Release.exists_by_id(deletion_id):
-        error = f"No release with id {deletion_id} found."
+    print(f"Deleting {deletion_type} {deletion_id}")
+    # db.delete() already looks the entry up, so there is no separate existence check
+    try:
+        db.delete(item_type=deletion_type, item_id=deletion_id)
+    except ValueError:
+        error = f"No {deletion_type} with id {deletion_id} found."
         flash(error)
         return redirect("/error", code=302)
-    print(f"Deleting {deletion_type} {deletion_id}")
-    db.delete(item_type=deletion_type, item_id=deletion_id)
     return redirect("/", 302)
 
 
@@ -200,11 +179,11 @@ def add_review(release_id):
 
 @release_bp.route("/releases", methods=["GET"])
 def releases():
-    genres = sorted(models.Genre.get_distinct_column_values("name"))
-    countries = sorted(models.Release.get_distinct_column_values("country"))
-    all_labels = sorted(models.Label.get_distinct_column_values("name"))
-    all_artists = sorted(models.Artist.get_distinct_column_values("name"))
-    all_releases = sorted(models.Release.get_distinct_column_values("name"))
+    genres = models.Genre.get_distinct_column_values("name")
+    countries = models.Release.get_distinct_column_values("country")
+    all_labels = models.Label.get_distinct_column_values("name")
+    all_artists = models.Artist.get_distinct_column_values("name")
+    all_releases = models.Release.get_distinct_column_values("name")
     data = {
         "genres": genres,
         "countries": countries,
@@ -221,16 +200,10 @@ def release_search():
 
     data = request.get_json()
     print(data)
-    search_results = models.Release.dynamic_search(data)
-
     page = Pager.get_page_param(request)
-    paged_data, flask_pagination = Pager.paginate(
-        per_page=15, current_page=page, data=search_results
-    )
-
+    paged_data, total = models.Release.search_page(data, page=page, per_page=15)
     return render_template(
         "release_search.html",
         data=paged_data,
-        data_full=search_results,
-        pagination=flask_pagination,
+        pagination=Pager.get_pagination(page, total),
     )
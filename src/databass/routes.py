@@ -8,8 +8,7 @@ Implements the main routes for the databass application, including
 
 from datetime import datetime
 from typing import Optional
-from os.path import join, abspath
-from glob import glob
+from os.path import join, abspath, isfile
 import flask
 from flask import (
     render_template,
@@ -19,15 +18,21 @@ from flask import (
     flash,
     make_response,
     send_file,
+    send_from_directory,
 )
 from sqlalchemy.exc import IntegrityError
 import pycountry
 from .api import Util, MusicBrainz
+from .api.util import IMG_DIRS, SUPPORTED_EXTENSIONS
 from . import db
 from .db import models
 from .db.util import get_all_stats, handle_submit_data
 from .pagination import Pager
 
+IMG_MAX_AGE = 600  # seconds
+# Absolute image directory of each item type, resolved once for serve_image
+SERVE_IMG_DIRS = {itemtype: abspath(path) for itemtype, path in IMG_DIRS.items()}
+
 
 def get_manual_release_data(data) -> dict:
     """
@@ -94,11 +99,12 @@ def register_routes(app):
     @app.route("/home", methods=["GET"])
     def home() -> str:
         stats_data = get_all_stats()
-        active_goals = models.Goal.get_incomplete()
-        goal_data = []
-        if active_goals is not None:
-            goal_data = [process_goal_data(goal) for goal in active_goals]
-        year = datetime.now().year
+        today = datetime.today()
+        goal_data = [
+            process_goal_data(goal, current, today)
+            for goal, current in models.Goal.incomplete_with_counts()
+        ]
+        year = today.year
         return render_template(
             "index.html",
             stats=stats_data,
@@ -109,17 +115,17 @@ def register_routes(app):
 
     @app.route("/home_release_table")
     def home_release_table():
-        data = models.Release.home_data()
-
-        page = Pager.get_page_param(request)
-        paged_data, flask_pagination = Pager.paginate(
-            per_page=5, current_page=page, data=data
+        # The back/next buttons pass the first/last release ID shown as a cursor
+        data, has_prev, has_next = models.Release.home_page(
+            per_page=5,
+            after=request.args.get("after", type=int),
+            before=request.args.get("before", type=int),
         )
-
         return render_template(
             "home_release_table.html",
-            data=paged_data,
-            pagination=flask_pagination,
+            data=data,
+            has_prev=has_prev,
+            has_next=has_next,
         )
 
     @app.route("/new")
@@ -128,59 +134,30 @@ def register_routes(app):
 
     @app.route("/search", methods=["POST", "GET"])
     def search() -> str | flask.Response:
-        page = paged_data = release_data = per_page = None
-
         if request.method == "GET":
-            return render_template(
-                "search.html",
-                page=page,
-                data=paged_data,
-                pagination=None,
-                data_full=release_data,
-                per_page=per_page,
-            )
+            return render_template("search.html", data=None, pagination=None)
 
         data = request.get_json()
-        search_release = data.get("release")
-        search_artist = data.get("artist")
-        search_label = data.get("label")
+        search_terms = {key: data.get(key) for key in ("release", "artist", "label")}
 
-        if search_release is None and search_artist is None and search_label is None:
+        # Blank form fields arrive as empty strings; don't send MusicBrainz an empty query
+        if not any(search_terms.values()):
             error = "ERROR: Search requires at least one search term"
             flash(error)
             return redirect("/error")
 
-        release_data = MusicBrainz.release_search(
-            release=search_release, artist=search_artist, label=search_label
-        )
+        # Other pages of the results repeat the search with ?page=; release_search
+        # caches its results, so only the requested page is sent back each time
+        release_data = MusicBrainz.release_search(**search_terms)
         page = Pager.get_page_param(request)
         paged_data, flask_pagination = Pager.paginate(
             per_page=10, current_page=page, data=release_data
         )
         return render_template(
             "search.html",
-            page=page,
-            data=paged_data,
-            pagination=flask_pagination,
-            data_full=release_data,
-            per_page=per_page,
-        )
-
-    @app.route("/search_results", methods=["POST"])
-    def search_results():
-        data = request.get_json()
-        per_page = 10
-        page = Pager.get_page_param(request)
-        paged_data, flask_pagination = Pager.paginate(
-            per_page=per_page, current_page=page, data=data
-        )
-        return render_template(
-            "search.html",
-            page=page,
             data=paged_data,
             pagination=flask_pagination,
-            data_full=data,
-            per_page=per_page,
+            search_terms=search_terms,
         )
 
     @app.route("/submit", methods=["POST"])
@@ -262,24 +239,26 @@ def register_routes(app):
 
     @app.route("/img/<string:itemtype>/<int:itemid>", methods=["GET"])
     def serve_image(itemtype: str, itemid: int):
-        match itemtype:
-            case "artist":
-                item = models.Artist.exists_by_id(itemid)
-            case "label":
-                item = models.Label.exists_by_id(itemid)
-            case "release":
-                item = models.Release.exists_by_id(itemid)
-            case _:
-                return
-        img_dir = abspath(join("databass", "static", "img", itemtype))
-        img_pattern = join(img_dir, f"{item.id}.*")
-        img_match = glob(img_pattern)
-        if img_match:
-            img_path = img_match[0]
+        img_dir = SERVE_IMG_DIRS.get(itemtype)
+        if img_dir is None:
+            abort(404)
+        # Images are saved as <id><ext>, so probing the few supported extensions
+        # takes at most one stat call each instead of listing the whole directory
+        for ext in SUPPORTED_EXTENSIONS:
+            img_name = f"{itemid}{ext}"
+            if isfile(join(img_dir, img_name)):
+                resp = make_response(
+                    send_from_directory(img_dir, img_name, max_age=IMG_MAX_AGE)
+                )
+                break
         else:
-            img_path = "./static/img/none.png"
-        resp = make_response(send_file(img_path))
-        resp.headers["Cache-Control"] = "max-age=600"
+            # A new release's image is still downloading in the background, so the
+            # placeholder must not be cached in its place
+            resp = make_response(send_file("./static/img/none.png", max_age=0))
+        # send_file already sets ETag and Last-Modified and answers revalidation with
+        # a 304. Images are overwritten in place when replaced, so they can't be
+        # marked immutable; public lets shared caches keep them too
+        resp.cache_control.public = True
         return resp
 
     @app.route("/new_release", methods=["POST"])
@@ -296,6 +275,24 @@ def register_routes(app):
         return country_code(country)
 
 
+# Built once so the template filters, which run for every row of a release table,
+# are dictionary lookups instead of scans over every pycountry country
+COUNTRY_NAMES = {country.alpha_2: country.name for country in pycountry.countries}
+COUNTRY_CODES = {
+    getattr(country, field).lower(): country.alpha_2
+    for country in pycountry.countries
+    for field in (
+        "alpha_2",
+        "alpha_3",
+        "numeric",
+        "name",
+        "common_name",
+        "official_name",
+    )
+    if hasattr(country, field)
+}
+
+
 def country_name(code: Optional[str]) -> Optional[str]:
     """
     Converts a two-letter country code to the full country name.
@@ -303,8 +300,7 @@ def country_name(code: Optional[str]) -> Optional[str]:
     the original country code is returned.
     """
     try:
-        country = pycountry.countries.get(alpha_2=code.upper())
-        return country.name if country else code
+        return COUNTRY_NAMES.get(code.upper(), code)
     except AttributeError:
         return code
 
@@ -316,6 +312,9 @@ def country_code(country: str) -> Optional[str]:
     """
     if country is None:
         return None
+    code = COUNTRY_CODES.get(country.lower())
+    if code is not None:
+        return code
     try:
         code = pycountry.countries.lookup(country)
         return code.alpha_2 if code else None
@@ -323,13 +322,21 @@ def country_code(country: str) -> Optional[str]:
         return country
 
 
-def process_goal_data(goal: models.Goal):
+def process_goal_data(
+    goal: models.Goal,
+    current: Optional[int] = None,
+    today: Optional[datetime] = None,
+):
     """
     Processes the data for a given goal, calculating the current progress,
     remaining amount, and daily target.
 
     Args:
         goal (models.Goal): The goal object to process.
+        current (int, optional): The goal's release count, if already known.
+            Queried from the database when omitted.
+        today (datetime, optional): The current time, so a caller processing several
+            goals can read the clock once. Defaults to now.
 
     Returns:
         dict: A dictionary containing the following keys:
@@ -341,13 +348,13 @@ def process_goal_data(goal: models.Goal):
             - target (float): The daily target amount needed to reach the goal.
             - current (int): The current amount achieved for the goal.
     """
-    current = goal.new_releases_since_start_date
+    if current is None:
+        current = goal.new_releases_since_start_date
+    if today is None:
+        today = datetime.today()
     remaining = goal.amount - current
-    days_left = (goal.end - datetime.today()).days
-    try:
-        target = round((remaining / days_left), 2)
-    except ZeroDivisionError:
-        target = 0
+    days_left = (goal.end - today).days
+    target = round((remaining / days_left), 2) if days_left > 0 else 0
     return {
         "start": goal.start,
         "end": goal.end,
@@ -135,13 +135,12 @@ function handleSearchButton() {
 
 function loadSearchResults(direction) {
     let targetPage = getTargetPage(direction);
-    let data = document.getElementById("data_full").innerHTML;
-    let formattedData = formatDataString(data);
-    let parsedData = JSON.parse(formattedData);
-    fetch('/search_results?page=' + targetPage, {
+    // The server repeats the search and only returns the requested page
+    let searchTerms = document.getElementById("search_terms").value;
+    fetch('/search?page=' + targetPage, {
         method: 'POST',
         headers: {'Content-Type': 'application/json'},
-        body: JSON.stringify(parsedData)
+        body: searchTerms
     })
         .then(response => response.text())
         .then(html => {
@@ -163,9 +162,11 @@ function getTargetPage(direction) {
     return targetPage
 }
 
-function loadHomeTable(direction) {
-    let targetPage = getTargetPage(direction);
-    fetch('/home_release_table?page=' + targetPage)
+function loadHomeTable(cursor) {
+    // cursor is "after=<id>" or "before=<id>", taken from the clicked next/back button
+    let url = '/home_release_table';
+    if (cursor) url += '?' + cursor;
+    fetch(url)
         .then(response => response.text())
         .then(html => {
             document.getElementById('home_release_table').innerHTML = html;
@@ -228,10 +229,10 @@ document.addEventListener('DOMContentLoaded', () => {
         loadHomeTable();
         document.addEventListener('click', function(event) {
             if (event.target.classList.contains('prev_page')) {
-                loadHomeTable('prev')
+                loadHomeTable('before=' + event.target.dataset.before)
             }
             if (event.target.classList.contains('next_page')) {
-                loadHomeTable('next')
+                loadHomeTable('after=' + event.target.dataset.after)
             }
         });
     }
@@ -1,7 +1,17 @@
+from concurrent.futures import Future
 from pathlib import Path
 import datetime
+import io
+import os
 import pytest
-from databass.api.util import Util
+from databass.api.util import (
+    Util,
+    IMG_INDEX,
+    SESSION,
+    image_dir,
+    report_image_error,
+    to_static_path,
+)
 
 VALID_JPEG_BYTES = bytes([0xFF, 0xD8, 0xFF, 0xE0, 0x00, 0x10, 0x4A, 0x46])
 VALID_PNG_BYTES = bytes([0x89, 0x50, 0x4E, 0x47, 0x0D, 0x0A, 0x1A, 0x0A])
@@ -110,6 +120,16 @@ class TestGetImageTypeFromUrl:
         for url, expected in test_cases.items():
             assert Util.get_image_type_from_url(url) == expected
 
+    def test_extension_in_query_string_ignored(self):
+        """Test that an extension in the query string doesn't override the path's."""
+        url = "https://example.com/photo.png?fallback=image.jpg"
+        assert Util.get_image_type_from_url(url) == ".png"
+
+    def test_fallback_scan_is_deterministic(self):
+        """Test that the fallback scan is deterministic when several extensions appear."""
+        url = "https://example.com/cover.png.jpg/download"
+        assert Util.get_image_type_from_url(url) == ".jpg"
+
     def test_invalid_url(self):
         """Test that invalid URLs raise ValueError."""
         invalid_urls = [
@@ -145,6 +165,12 @@ class TestGetImageTypeFromBytes:
             Util.get_image_type_from_bytes(INVALID_BYTES)
         assert "Unsupported file type" in str(exc_info.value)
 
+    def test_get_image_type_from_bytes_png_prefix_only(self):
+        """Test to verify the full PNG signature is required, not just its first bytes"""
+        with pytest.raises(ValueError) as exc_info:
+            Util.get_image_type_from_bytes(b"\x89PNxxxxxxxx")
+        assert "Unsupported file type" in str(exc_info.value)
+
     def test_get_image_type_from_bytes_empty(self):
         """Test to verify ValueError is raised for empty bytes"""
         with pytest.raises(ValueError) as exc_info:
@@ -159,13 +185,155 @@ class TestGetImageTypeFromBytes:
         assert "must be at least 8 bytes" in str(exc_info.value)
 
 
-# class TestGetImage:
-# Tests for Util.get_image()
+class TestGetImage:
+    """Tests for Util.get_image()"""
+
+    def test_caa_image_written(self, mocker):
+        """A CoverArtArchive image is written without consulting Discogs"""
+        mocker.patch.object(
+            Util, "get_caa_image", return_value={"image": b"img", "type": ".jpg"}
+        )
+        mock_write = mocker.patch.object(
+            Util, "write_image", return_value="./static/img/release/1.jpg"
+        )
+        mock_discogs = mocker.patch.object(Util, "get_discogs_image_url")
+
+        result = Util.get_image("release", 1, mbid="mbid", release_name="Release")
+        assert result == "./static/img/release/1.jpg"
+        mock_write.assert_called_once_with(
+            entity_type="release", entity_id=1, img_bytes=b"img", img_type=".jpg"
+        )
+        mock_discogs.assert_not_called()
+
+    def test_caa_failure_falls_back_to_discogs(self, mocker):
+        """When CoverArtArchive fails, the Discogs image is downloaded and its path returned"""
+        mocker.patch.object(Util, "get_caa_image", side_effect=ValueError)
+        mock_discogs = mocker.patch.object(
+            Util, "get_discogs_image_url", return_value="https://x.com/a.jpg"
+        )
+        mock_download = mocker.patch.object(
+            Util, "download_image", return_value="./static/img/release/1.jpg"
+        )
+
+        result = Util.get_image(
+            "release", 1, mbid="mbid", release_name="Release", artist_name="Artist"
+        )
+        assert result == "./static/img/release/1.jpg"
+        mock_discogs.assert_called_once_with(
+            entity_type="release",
+            release_name="Release",
+            artist_name="Artist",
+            label_name=None,
+        )
+        mock_download.assert_called_once_with(
+            url="https://x.com/a.jpg", entity_type="release", entity_id=1
+        )
+
+    def test_no_image_found(self, mocker):
+        """None is returned when Discogs has no image either"""
+        mocker.patch.object(Util, "get_discogs_image_url", return_value=None)
+        assert Util.get_image("artist", 1, artist_name="Artist") is None
+
+    def test_invalid_entity_type(self):
+        """An unknown entity type raises ValueError"""
+        with pytest.raises(ValueError):
+            Util.get_image("album", 1)
+
+
+class TestToStaticPath:
+    """Tests for to_static_path"""
+
+    def test_strips_package_prefix(self):
+        """The leading databass/ directory is removed from a saved image's path"""
+        path = Path("databass/static/img/release/1.jpg")
+        assert to_static_path(path) == "./static/img/release/1.jpg"
+
+    def test_only_prefix_removed(self):
+        """A databass/ further into the path is left alone"""
+        path = Path("databass/static/img/release/databass/1.jpg")
+        assert to_static_path(path) == "./static/img/release/databass/1.jpg"
+
+
+class TestGetImageFromUrl:
+    """Tests for Util.get_image_from_url"""
+
+    @pytest.fixture(autouse=True)
+    def in_tmp_dir(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        image_dir.cache_clear()
+        yield
+        image_dir.cache_clear()
+
+    def mock_response(self, mocker, ok=True, body=b""):
+        response = mocker.MagicMock()
+        response.__bool__.return_value = ok
+        response.__enter__.return_value = response
+        response.raw = io.BytesIO(body)
+        return response
+
+    def test_streams_body_to_file(self, mocker, tmp_path):
+        """The response body is copied to disk and the static path is returned"""
+        body = VALID_PNG_BYTES * 100
+        mock_get = mocker.patch.object(
+            SESSION, "get", return_value=self.mock_response(mocker, body=body)
+        )
+        result = Util.get_image_from_url("https://x.com/a.png", "artist", 5)
+
+        assert result == "./static/img/artist/5.png"
+        assert (tmp_path / "databass/static/img/artist/5.png").read_bytes() == body
+        mock_get.assert_called_once_with("https://x.com/a.png", stream=True, timeout=60)
+
+    def test_failed_response(self, mocker, tmp_path):
+        """Nothing is written when the request fails"""
+        mocker.patch.object(
+            SESSION, "get", return_value=self.mock_response(mocker, ok=False)
+        )
+        assert Util.get_image_from_url("https://x.com/a.png", "artist", 5) is None
+        assert not (tmp_path / "databass/static/img/artist/5.png").exists()
+
+
+class TestGetImageInBackground:
+    """Tests for Util.get_image_in_background"""
+
+    def test_returns_future_of_get_image(self, mocker):
+        """get_image runs with the given arguments and its result is on the future"""
+        mock_get_image = mocker.patch.object(Util, "get_image", return_value="release/1")
+
+        future = Util.get_image_in_background(entity_type="release", entity_id=1)
+
+        assert future.result(timeout=5) == "release/1"
+        mock_get_image.assert_called_once_with(entity_type="release", entity_id=1)
+
+    def test_error_is_logged(self, caplog):
+        """The error of a failed download is logged with its traceback instead of being lost"""
+        error = ValueError("bad type")
+        future = Future()
+        future.set_exception(error)
+
+        report_image_error(future)
+
+        assert len(caplog.records) == 1
+        assert caplog.records[0].levelname == "ERROR"
+        assert caplog.records[0].exc_info[1] is error
 
 
 class TestImgExists:
     """Test suite for the img_exists utility function"""
 
+    @pytest.fixture(autouse=True)
+    def static_dir(self, tmp_path, monkeypatch):
+        """Run each test from an empty directory with a fresh image index"""
+        monkeypatch.chdir(tmp_path)
+        IMG_INDEX.clear()
+        yield tmp_path
+        IMG_INDEX.clear()
+
+    @staticmethod
+    def make_image(root: Path, item_type: str, file_name: str) -> None:
+        img_dir = root / "static" / "img" / item_type
+        img_dir.mkdir(parents=True, exist_ok=True)
+        (img_dir / file_name).touch()
+
     @pytest.mark.parametrize(
         "item_id,item_type,expected,extension",
         [
@@ -174,40 +342,54 @@ class TestImgExists:
             (789, "label", "/static/img/label/789.jpg", "jpg"),
         ],
     )
-    def test_existing_image(self, item_id, item_type, expected, extension, monkeypatch):
+    def test_existing_image(self, item_id, item_type, expected, extension, static_dir):
         """
         Test that the function returns the correct path when an image exists
         """
-
-        def mock_glob(*args, **kwargs):
-            return [Path(f"static/img/{item_type}/{item_id}.{extension}")]
-
-        monkeypatch.setattr(Path, "glob", mock_glob)
+        self.make_image(static_dir, item_type, f"{item_id}.{extension}")
         result = Util.img_exists(item_id, item_type)
         assert result == expected
 
-    def test_nonexistent_image(self, monkeypatch):
+    def test_nonexistent_image(self, static_dir):
         """
         Test that the function returns None when no image exists
         """
-
-        def mock_glob(*args, **kwargs):
-            return []
-
-        monkeypatch.setattr(Path, "glob", mock_glob)
+        self.make_image(static_dir, "release", "1234.jpg")
         result = Util.img_exists(123, "release")
         assert result is None
 
-    @pytest.mark.parametrize("item_type", ["RELEASE", "ARTIST", "LABEL"])
-    def test_case_insensitive_type(self, item_type, monkeypatch):
+    def test_missing_directory(self):
         """
-        Test that the function handles case-insensitive item types correctly
+        Test that the function returns None when the image directory doesn't exist
         """
+        assert Util.img_exists(123, "release") is None
 
-        def mock_glob(*args, **kwargs):
-            return [Path(f"static/img/{item_type.lower()}/123.jpg")]
+    def test_unsupported_extension_ignored(self, static_dir):
+        """
+        Test that files without a supported image extension are not matched
+        """
+        self.make_image(static_dir, "release", "123.txt")
+        assert Util.img_exists(123, "release") is None
+
+    def test_new_image_found_after_index_built(self, static_dir):
+        """
+        Test that an image added after the directory was indexed is still found
+        """
+        self.make_image(static_dir, "artist", "1.jpg")
+        assert Util.img_exists(2, "artist") is None
 
-        monkeypatch.setattr(Path, "glob", mock_glob)
+        self.make_image(static_dir, "artist", "2.png")
+        img_dir = static_dir / "static" / "img" / "artist"
+        mtime = os.stat(img_dir).st_mtime_ns
+        os.utime(img_dir, ns=(mtime, mtime + 1_000_000_000))
+        assert Util.img_exists(2, "artist") == "/static/img/artist/2.png"
+
+    @pytest.mark.parametrize("item_type", ["RELEASE", "ARTIST", "LABEL"])
+    def test_case_insensitive_type(self, item_type, static_dir):
+        """
+        Test that the function handles case-insensitive item types correctly
+        """
+        self.make_image(static_dir, item_type.lower(), "123.jpg")
         result = Util.img_exists(123, item_type)
         assert result is not None
 
@@ -1,9 +1,18 @@
 import pytest
 import requests.exceptions
 from requests import Response
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from databass.api.discogs import Discogs, RATE_LIMIT_THRESHOLD
+from databass.api.discogs import Discogs, RATE_LIMIT_THRESHOLD, SESSION
+
+
+@pytest.fixture(autouse=True)
+def clear_discogs_cache():
+    """Lookups are memoized, so start every test with an empty cache"""
+    Discogs.clear_cache()
+    Discogs.remaining_requests = None
 
 
 class TestUpdateRateLimit:
@@ -47,26 +56,78 @@ class TestRequest:
         mock_response.headers = {"x-discogs-ratelimit-remaining": "5"}
         mock_response.json.return_value = {"data": "test"}
 
-        mock_get = mocker.patch("requests.get", return_value=mock_response)
+        mock_get = mocker.patch.object(SESSION, "get", return_value=mock_response)
         result = Discogs.request("/test")
 
         assert result == {"data": "test"}
         mock_get.assert_called_once()
 
     def test_request_with_throttling(self, mocker):
-        """Test request handling when rate limited"""
+        """Test that a throttled client sleeps before sending the request"""
         mock_response = mocker.Mock(spec=requests.Response)
         mock_response.status_code = 200
         mock_response.headers = {"x-discogs-ratelimit-remaining": "1"}
         mock_response.json.return_value = {"data": "test"}
 
-        mock_sleep = mocker.patch("time.sleep")
-        mocker.patch("requests.get", return_value=mock_response)
+        calls = []
+        mocker.patch("time.sleep", side_effect=lambda s: calls.append("sleep"))
+        mocker.patch.object(
+            SESSION,
+            "get",
+            side_effect=lambda *a, **kw: calls.append("get") or mock_response,
+        )
+        Discogs.remaining_requests = 1
 
         result = Discogs.request("/test")
 
         assert result == {"data": "test"}
-        mock_sleep.assert_called_once_with(5)
+        assert calls == ["sleep", "get"]
+        assert Discogs.remaining_requests == 1
+
+    def test_throttled_response_not_slept_after(self, mocker):
+        """A low count in the response only delays the next request"""
+        mock_response = mocker.Mock(spec=requests.Response)
+        mock_response.status_code = 200
+        mock_response.headers = {"x-discogs-ratelimit-remaining": "1"}
+        mock_response.json.return_value = {"data": "test"}
+
+        mock_sleep = mocker.patch("time.sleep")
+        mocker.patch.object(SESSION, "get", return_value=mock_response)
+
+        Discogs.request("/test")
+
+        mock_sleep.assert_not_called()
+        assert Discogs.is_throttled() is True
+
+    def test_throttle_delays_concurrent_requests(self, mocker):
+        """Threads sending while throttled each wait before their request goes out"""
+        mock_response = mocker.Mock(spec=requests.Response)
+        mock_response.status_code = 200
+        mock_response.headers = {"x-discogs-ratelimit-remaining": "1"}
+        mock_response.json.return_value = {"data": "test"}
+
+        events = []
+        events_lock = threading.Lock()
+
+        def record(event):
+            with events_lock:
+                events.append(event)
+
+        mocker.patch("time.sleep", side_effect=lambda s: record("sleep"))
+        mocker.patch.object(
+            SESSION, "get", side_effect=lambda *a, **kw: record("get") or mock_response
+        )
+        Discogs.remaining_requests = 1
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(Discogs.request, ["/test"] * 4))
+
+        assert results == [{"data": "test"}] * 4
+        assert events.count("get") == 4
+        # No request is sent until a sleep has run ahead of it
+        for i, event in enumerate(events):
+            if event == "get":
+                assert events[:i].count("sleep") > events[:i].count("get")
 
     def test_failed_request(self, mocker):
         """Test handling of failed API requests"""
@@ -74,7 +135,7 @@ class TestRequest:
         mock_response.status_code = 404
         mock_response.headers = {"x-discogs-ratelimit-remaining": "5"}
 
-        mocker.patch("requests.get", return_value=mock_response)
+        mocker.patch.object(SESSION, "get", return_value=mock_response)
 
         with pytest.raises(requests.exceptions.RequestException):
             Discogs.request("/test")
@@ -484,3 +545,31 @@ class TestGetLabelImageUrl:
             name="Test Label", item_type="label"
         )
         Discogs.request.assert_called_once_with(f"/labels/{label_id}")
+
+
+class TestBatchImageUrls:
+    """Test suite for Discogs.batch_image_urls method"""
+
+    def test_empty_input(self):
+        """Test that no items returns an empty list"""
+        assert Discogs.batch_image_urls([]) == []
+
+    def test_results_keep_input_order(self, mocker):
+        """Test that each item is dispatched to the right helper and order is preserved"""
+        mock_release = mocker.patch.object(
+            Discogs, "get_release_image_url", return_value="release.jpg"
+        )
+        mocker.patch.object(Discogs, "get_artist_image_url", return_value="artist.jpg")
+        mocker.patch.object(Discogs, "get_label_image_url", return_value=None)
+
+        result = Discogs.batch_image_urls(
+            [
+                ("label", "Test Label", None),
+                ("release", "Test Album", "Test Artist"),
+                ("artist", "Test Artist", None),
+                ("invalid", "Test", None),
+            ]
+        )
+
+        assert result == [None, "release.jpg", "artist.jpg", None]
+        mock_release.assert_called_once_with(name="Test Album", artist="Test Artist")
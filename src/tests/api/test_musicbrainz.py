@@ -1,10 +1,18 @@
 import pytest
-from databass.api.musicbrainz import MusicBrainz, MbzParser
+import requests
+from databass.api.musicbrainz import MusicBrainz, MbzParser, SEARCH_CACHE_TTL
 from databass.api.types import ReleaseInfo
+from databass.api.util import SESSION
 import musicbrainzngs as mbz
 import datetime
 
 
+@pytest.fixture(autouse=True)
+def clear_musicbrainz_cache():
+    """Release searches are cached, so start every test with an empty cache"""
+    MusicBrainz.clear_cache()
+
+
 class TestInitialize:
     # Tests for MusicBrainz.release_search()
     def test_initialize_success(self, mocker):
@@ -145,6 +153,38 @@ class TestMusicBrainzReleaseSearch:
 
         assert result[0]["track_count"] == 22
 
+    def test_repeated_search_uses_cache(self, mocker, mock_mbz_response):
+        """
+        Test that repeating a search, ignoring case and whitespace, doesn't query MusicBrainz again
+        """
+        mock_search = mocker.patch(
+            "musicbrainzngs.search_releases", return_value=mock_mbz_response
+        )
+        MusicBrainz.init = True
+
+        first = MusicBrainz.release_search(release="Test Album", artist="Test Artist")
+        second = MusicBrainz.release_search(release=" test album", artist="TEST ARTIST")
+
+        assert second is first
+        mock_search.assert_called_once()
+
+    def test_expired_search_queries_again(self, mocker, mock_mbz_response):
+        """
+        Test that a cached search is repeated once it is older than SEARCH_CACHE_TTL
+        """
+        mock_search = mocker.patch(
+            "musicbrainzngs.search_releases", return_value=mock_mbz_response
+        )
+        mock_time = mocker.patch("databass.api.musicbrainz.time.monotonic")
+        mock_time.return_value = 1000.0
+        MusicBrainz.init = True
+
+        MusicBrainz.release_search(release="Test Album")
+        mock_time.return_value = 1000.0 + SEARCH_CACHE_TTL
+        MusicBrainz.release_search(release="Test Album")
+
+        assert mock_search.call_count == 2
+
 
 class TestMusicBrainzLabelSearch:
     @pytest.fixture
@@ -184,18 +224,26 @@ class TestMusicBrainzLabelSearch:
 
     def test_label_search_without_mbid(self, mock_label_data, mocker):
         """
-        Test label search using only name, verifying search and subsequent lookup
+        Test label search using only name, verifying the top search result is parsed
+        without a second lookup by MBID
         """
         search_result = {"label-list": [{"id": "found-id-789", "name": "Found Label"}]}
-        mocker.patch.object(mbz, "search_labels", return_value=search_result)
-        mocker.patch.object(mbz, "get_label_by_id", return_value=mock_label_data)
+        mock_search = mocker.patch.object(
+            mbz, "search_labels", return_value=search_result
+        )
+        mock_lookup = mocker.patch.object(
+            mbz, "get_label_by_id", return_value=mock_label_data
+        )
 
         result = MusicBrainz.label_search(name="Found Label")
         assert isinstance(result, dict)
         assert all(
             key in result for key in ["name", "mbid", "begin", "end", "country", "type"]
         )
-        assert result["name"] == "Test Label"
+        assert result["name"] == "Found Label"
+        assert result["mbid"] == "found-id-789"
+        mock_search.assert_called_once_with(query="Found Label", limit=1)
+        mock_lookup.assert_not_called()
 
     def test_label_search_invalid_input(self):
         """
@@ -284,21 +332,28 @@ class TestMusicBrainzArtistSearch:
 
     def test_artist_search_without_mbid(self, mock_artist_data, mocker):
         """
-        Test artist search using only name, verifying search functionality
-        and subsequent artist lookup
+        Test artist search using only name, verifying the top search result is parsed
+        without a second lookup by MBID
         """
         search_result = {
             "artist-list": [{"id": "found-id-789", "name": "Found Artist"}]
         }
-        mocker.patch.object(mbz, "search_artists", return_value=search_result)
-        mocker.patch.object(mbz, "get_artist_by_id", return_value=mock_artist_data)
+        mock_search = mocker.patch.object(
+            mbz, "search_artists", return_value=search_result
+        )
+        mock_lookup = mocker.patch.object(
+            mbz, "get_artist_by_id", return_value=mock_artist_data
+        )
 
         result = MusicBrainz.artist_search(name="Found Artist")
         assert isinstance(result, dict)
         assert all(
             key in result for key in ["name", "mbid", "begin", "end", "country", "type"]
         )
-        assert result["name"] == "Test Artist"
+        assert result["name"] == "Found Artist"
+        assert result["mbid"] == "found-id-789"
+        mock_search.assert_called_once_with(query="Found Artist", limit=1)
+        mock_lookup.assert_not_called()
 
     @pytest.mark.parametrize("invalid_input", ["", None, 123, [], {}])
     def test_artist_search_invalid_input(self, invalid_input):
@@ -452,10 +507,13 @@ class TestGetReleaseLength:
                 ]
             }
         }
-        mocker.patch("musicbrainzngs.get_release_by_id", return_value=mock_release_data)
+        mock_get = mocker.patch(
+            "musicbrainzngs.get_release_by_id", return_value=mock_release_data
+        )
 
         result = MusicBrainz.get_release_length(mbid)
-        assert result == 730000  # Returns after first track due to finally block
+        assert result == 730000
+        mock_get.assert_called_once_with(mbid, includes=["recordings", "media"])
 
     @pytest.mark.parametrize("invalid_mbid", [None, "", 123, [], {}])
     def test_invalid_mbid(self, invalid_mbid):
@@ -532,12 +590,16 @@ class TestGetImage:
         verifying that the function returns bytes data.
         """
         mock_image = b"mock_image_data"
-        mocker.patch(
-            "musicbrainzngs.get_release_group_image_front", return_value=mock_image
+        mock_get = mocker.patch.object(
+            SESSION, "get", return_value=mocker.Mock(ok=True, content=mock_image)
         )
 
         result = MusicBrainz.get_image(mbid, size)
         assert result == mock_image
+        mock_get.assert_called_once_with(
+            f"https://coverartarchive.org/release-group/{mbid}/front-{size}",
+            timeout=(3.05, 5),
+        )
 
     def test_fallback_image_fetch(self, mocker):
         """
@@ -548,10 +610,7 @@ class TestGetImage:
         mbid = "test-mbid"
 
         # Mock primary method to fail
-        mocker.patch(
-            "musicbrainzngs.get_release_group_image_front",
-            side_effect=mbz.musicbrainz.ResponseError(None, None),
-        )
+        mocker.patch.object(SESSION, "get", return_value=mocker.Mock(ok=False))
 
         # Mock fallback methods
         mocker.patch(
@@ -586,10 +645,7 @@ class TestGetImage:
         Test handling of cases where no images are found for a valid MBID,
         verifying None is returned.
         """
-        mocker.patch(
-            "musicbrainzngs.get_release_group_image_front",
-            side_effect=mbz.musicbrainz.ResponseError(None, None),
-        )
+        mocker.patch.object(SESSION, "get", return_value=mocker.Mock(ok=False))
         mocker.patch("musicbrainzngs.get_image_list", return_value={"images": []})
 
         result = MusicBrainz.get_image("valid-mbid")
@@ -600,23 +656,28 @@ class TestGetImage:
         Test handling of API errors during image fetch, ensuring None is returned
         when unexpected errors occur.
         """
-        mocker.patch(
-            "musicbrainzngs.get_release_group_image_front",
-            side_effect=Exception("Unexpected API error"),
+        mocker.patch.object(
+            SESSION, "get", side_effect=Exception("Unexpected API error")
         )
 
         result = MusicBrainz.get_image("valid-mbid")
         assert result is None
 
+    def test_timeout(self, mocker):
+        """
+        Test that a CoverArtArchive request timing out returns None instead of raising.
+        """
+        mocker.patch.object(SESSION, "get", side_effect=requests.Timeout)
+
+        result = MusicBrainz.get_image("valid-mbid")
+        assert result is None
+
     def test_missing_image_id(self, mocker):
         """
         Test handling of missing image ID in fallback response,
         verifying None is returned when image ID cannot be found.
         """
-        mocker.patch(
-            "musicbrainzngs.get_release_group_image_front",
-            side_effect=mbz.musicbrainz.ResponseError(None, None),
-        )
+        mocker.patch.object(SESSION, "get", return_value=mocker.Mock(ok=False))
         mocker.patch("musicbrainzngs.get_image_list", return_value={"images": [{}]})
 
         result = MusicBrainz.get_image("valid-mbid")
@@ -23,6 +23,19 @@ class TestArtists:
         assert b"UK" in response.data
         assert b"artist_search" in response.data
 
+    def test_artists_countries_skip_none(self, client, mocker):
+        mock_db = mocker.patch(
+            "databass.db.models.Artist.get_distinct_column_values",
+            return_value=["CA", "US", None],
+        )
+        mock_render = mocker.patch(
+            "databass.artists.routes.render_template", return_value=""
+        )
+        response = client.get("/artists")
+        assert response.status_code == 200
+        mock_db.assert_called_once_with("country")
+        assert mock_render.call_args.kwargs["data"] == {"countries": ["CA", "US"]}
+
 
 class TestArtist:
     # Tests for /artist
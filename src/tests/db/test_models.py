@@ -1,7 +1,11 @@
 import pytest
 from databass import create_app
 from databass.db.models import Release, Artist, Label, ArtistOrLabel, Goal, Genre
-from datetime import datetime
+from databass.db.operations import STATS_CACHE
+import databass.db.operations
+from datetime import date, datetime
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError, InvalidRequestError
 
 
 @pytest.fixture
@@ -12,6 +16,11 @@ def app():
     return app
 
 
+@pytest.fixture(autouse=True)
+def clear_stats_cache():
+    STATS_CACHE.clear()
+
+
 class TestBaseGetAll:
     """
     Test suite for Base.get_all class method
@@ -52,6 +61,30 @@ class TestBaseGetAll:
         mock_query.assert_called_once_with(Release)
 
 
+class TestBaseDateAdded:
+    """Test suite for the Base.date_added column"""
+
+    @pytest.mark.parametrize("model", [Release, Artist, Label])
+    def test_date_added_defaults_on_server(self, model):
+        """Test that date_added is filled in by the database rather than a fixed Python value"""
+        column = model.__table__.c.date_added
+        assert "current_date" in str(column.server_default.arg).lower()
+
+    def test_date_added_set_on_insert(self, app):
+        """
+        Test that date_added is also set from Python on insert, since existing
+        tables created before the server default are not altered
+        """
+        with app.app_context():
+            app_db = databass.db.operations.app_db
+            artist = Artist(name="Test Artist")
+            app_db.session.add(artist)
+            app_db.session.commit()
+
+            assert Artist.__table__.c.date_added.default.is_callable
+            assert artist.date_added == date.today()
+
+
 class TestBaseTotalCount:
     """
     Test suite for Base.total_count class method
@@ -64,11 +97,11 @@ class TestBaseTotalCount:
         Test that total_count returns an integer value
         """
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.count.return_value = 0
+        mock_query.return_value.scalar.return_value = 0
 
         # Mock the session to ensure it returns the count value
         mock_session = mocker.patch("databass.db.base.app_db.session")
-        mock_session.query.return_value.count.return_value = 0
+        mock_session.query.return_value.scalar.return_value = 0
 
         result = Release.total_count()
         print(result)
@@ -79,10 +112,11 @@ class TestBaseTotalCount:
         Test that total_count queries the correct model class
         """
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.count.return_value = 0
+        mock_query.return_value.scalar.return_value = 0
 
         Release.total_count()
-        mock_query.assert_called_once_with(Release)
+        mock_query.assert_called_once()
+        assert str(mock_query.call_args[0][0]) == "count(release.id)"
 
     @pytest.mark.parametrize("count_value", [0, 1, 100])
     def test_total_count_returns_correct_value(self, mocker, count_value):
@@ -91,7 +125,7 @@ class TestBaseTotalCount:
         """
         # Mock both query and session to ensure proper return value
         mock_session = mocker.patch("databass.db.base.app_db.session")
-        mock_session.query.return_value.count.return_value = count_value
+        mock_session.query.return_value.scalar.return_value = count_value
 
         result = Release.total_count()
         assert result == count_value
@@ -101,13 +135,13 @@ class TestBaseTotalCount:
         Test total_count with database operations through mocking
         """
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.count.return_value = 0
+        mock_query.return_value.scalar.return_value = 0
 
         initial_count = Release.total_count()
         assert initial_count == 0
 
         # Simulate adding records by changing mock return value
-        mock_query.return_value.count.return_value = 3
+        mock_query.return_value.scalar.return_value = 3
 
         final_count = Release.total_count()
         assert final_count == 3
@@ -118,58 +152,41 @@ class TestBaseExistsById:
 
     def test_exists_by_id_returns_none_for_nonexistent_id(self, mocker):
         """Test that exists_by_id returns None when no matching ID is found"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.filter.return_value.one_or_none.return_value = None
+        mock_get = mocker.patch("databass.db.base.app_db.session.get")
+        mock_get.return_value = None
 
         result = Release.exists_by_id(999)
         assert result is None
-        mock_query.assert_called_once_with(Release)
+        mock_get.assert_called_once_with(Release, 999)
 
     def test_exists_by_id_returns_object_when_found(self, mocker):
         """Test that exists_by_id returns the object when a matching ID is found"""
         mock_release = mocker.Mock()
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.filter.return_value.one_or_none.return_value = (
-            mock_release
-        )
+        mock_get = mocker.patch("databass.db.base.app_db.session.get")
+        mock_get.return_value = mock_release
 
         result = Release.exists_by_id(1)
         assert result == mock_release
-        mock_query.assert_called_once_with(Release)
+        mock_get.assert_called_once_with(Release, 1)
 
     @pytest.mark.parametrize("test_id", [None, "string_id", 3.14, [], {}])
     def test_exists_by_id_with_invalid_id_types(self, mocker, test_id):
         """Test that exists_by_id handles invalid ID types appropriately"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_get = mocker.patch("databass.db.base.app_db.session.get")
 
-        result = Release.exists_by_id(test_id)
-        # Should still attempt to query even with invalid types
+        Release.exists_by_id(test_id)
+        # Should still attempt the lookup even with invalid types
         # as SQLAlchemy will handle type conversion/errors
-        mock_query.assert_called_once_with(Release)
-
-    def test_exists_by_id_query_construction(self, mocker):
-        """Test that exists_by_id constructs the correct query"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_filter = mocker.Mock()
-        mock_query.return_value.filter = mock_filter
-        mock_filter.return_value.one_or_none.return_value = None
-
-        Release.exists_by_id(1)
-
-        # Verify the query chain
-        mock_query.assert_called_once_with(Release)
-        mock_filter.assert_called_once()
+        mock_get.assert_called_once_with(Release, test_id)
 
     def test_exists_by_id_handles_database_error(self, mocker):
         """Test that exists_by_id handles database errors gracefully"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.filter.return_value.one_or_none.side_effect = Exception(
-            "Database error"
-        )
+        mock_get = mocker.patch("databass.db.base.app_db.session.get")
+        mock_get.side_effect = Exception("Database error")
 
         result = Release.exists_by_id(1)
         assert result is None
-        mock_query.assert_called_once_with(Release)
+        mock_get.assert_called_once_with(Release, 1)
 
 
 class TestBaseGetDistinctColumnValues:
@@ -177,8 +194,8 @@ class TestBaseGetDistinctColumnValues:
 
     def test_get_distinct_column_values_returns_list(self, mocker):
         """Test that get_distinct_column_values returns a list"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value = []
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.all.return_value = []
 
         result = Release.get_distinct_column_values("main_genre")
         assert isinstance(result, list)
@@ -195,8 +212,8 @@ class TestBaseGetDistinctColumnValues:
         self, mocker, column, values
     ):
         """Test that get_distinct_column_values returns the correct distinct values for a given column"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value = [(value,) for value in values]
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.all.return_value = values
 
         result = Release.get_distinct_column_values(column)
         assert result == values
@@ -208,83 +225,173 @@ class TestBaseGetDistinctColumnValues:
 
     def test_get_distinct_column_values_handles_empty_results(self, mocker):
         """Test that get_distinct_column_values handles empty result sets correctly"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value = []
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.all.return_value = []
 
         result = Release.get_distinct_column_values("main_genre")
         assert result == []
 
     def test_get_distinct_column_values_queries_correct_attribute(self, mocker):
         """Test that get_distinct_column_values constructs the query with the correct column attribute"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value = []
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.all.return_value = []
 
         Release.get_distinct_column_values("main_genre")
 
         # Verify the distinct() call was made on the correct column
-        mock_query.assert_called_once()
-        args = mock_query.call_args[0]
+        mock_scalars.assert_called_once()
+        args = mock_scalars.call_args[0]
         assert "genre" in str(args[0])
 
+    def test_get_distinct_column_values_sorted_by_database(self, mocker):
+        """Test that the distinct values are ordered in SQL rather than in Python"""
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.all.return_value = []
+
+        Release.get_distinct_column_values("country")
+
+        statement = str(mock_scalars.call_args[0][0]).lower()
+        assert "select distinct release.country" in statement
+        assert "order by release.country" in statement
+
+    def test_get_distinct_column_values_cached_per_model_and_column(self, mocker):
+        """Test that repeated calls reuse the cached result for the same model and column"""
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.all.return_value = ["US"]
+
+        Release.get_distinct_column_values("country")
+        Release.get_distinct_column_values("country")
+        Release.get_distinct_column_values("name")
+        Label.get_distinct_column_values("country")
+
+        assert mock_scalars.call_count == 3
+        assert ("Release", "get_distinct_column_values", "country") in STATS_CACHE
+
+    def test_get_distinct_column_values_requeries_after_cache_cleared(self, mocker):
+        """Test that a write through db.operations (which clears the cache) forces a new query"""
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.all.return_value = ["US"]
+
+        Release.get_distinct_column_values("country")
+        STATS_CACHE.clear()
+        Release.get_distinct_column_values("country")
+
+        assert mock_scalars.call_count == 2
+
+
+class TestMusicBrainzEntityNameFromId:
+    """Test suite for MusicBrainzEntity.name_from_id class method"""
+
+    def test_name_from_id_returns_name(self, mocker):
+        """Test that name_from_id returns the name of the entity with the given ID"""
+        mock_get = mocker.patch("databass.db.base.app_db.session.get")
+        mock_get.return_value.name = "Test Artist"
+
+        assert Artist.name_from_id(1) == "Test Artist"
+        assert mock_get.call_args[0] == (Artist, 1)
+
+    def test_name_from_id_returns_none_when_missing(self, mocker):
+        """Test that name_from_id returns None when no entity has the given ID"""
+        mocker.patch("databass.db.base.app_db.session.get", return_value=None)
+
+        assert Artist.name_from_id(999) is None
+
+    @pytest.mark.parametrize("invalid_id", [None, "1", 0, -1])
+    def test_name_from_id_invalid_id(self, mocker, invalid_id):
+        """Test that name_from_id returns None without querying for invalid IDs"""
+        mock_get = mocker.patch("databass.db.base.app_db.session.get")
+
+        assert Artist.name_from_id(invalid_id) is None
+        mock_get.assert_not_called()
+
+
+class TestMusicBrainzEntityIdByMatchingName:
+    """Test suite for MusicBrainzEntity.id_by_matching_name class method"""
+
+    def test_id_by_matching_name_returns_ids(self, mocker):
+        """Test that id_by_matching_name returns a flat list of matching IDs"""
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.all.return_value = [1, 2]
+
+        result = Artist.id_by_matching_name("Test")
+
+        assert result == [1, 2]
+        statement = str(mock_scalars.call_args[0][0])
+        assert "SELECT artist.id" in statement
+        assert "lower(artist.name) LIKE lower" in statement
+
+    def test_id_by_matching_name_invalid_name(self, mocker):
+        """Test that id_by_matching_name returns an empty list without querying for non-string names"""
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+
+        assert Artist.id_by_matching_name(None) == []
+        mock_scalars.assert_not_called()
 
 class TestMusicBrainzEntityExistsByMbid:
     """Test suite for MusicBrainzEntity.exists_by_mbid class method"""
 
     def test_exists_by_mbid_returns_none_for_nonexistent_mbid(self, mocker):
         """Test that exists_by_mbid returns None when no matching MBID is found"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.filter.return_value.one_or_none.return_value = None
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.first.return_value = None
 
         result = Release.exists_by_mbid("non-existent-mbid")
         assert result is None
-        mock_query.assert_called_once_with(Release)
+        mock_scalars.assert_called_once()
 
     def test_exists_by_mbid_returns_entity_when_found(self, mocker):
         """Test that exists_by_mbid returns the entity when a matching MBID is found"""
         mock_entity = mocker.Mock()
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.filter.return_value.one_or_none.return_value = (
-            mock_entity
-        )
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.first.return_value = mock_entity
 
         result = Release.exists_by_mbid("valid-mbid")
         assert result == mock_entity
-        mock_query.assert_called_once_with(Release)
+        mock_scalars.assert_called_once()
 
     @pytest.mark.parametrize("invalid_mbid", [None, "", 123, [], {}, True])
     def test_exists_by_mbid_with_invalid_mbid_types(self, invalid_mbid, mocker):
         """Test that exists_by_mbid returns None for invalid MBID types"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
 
         result = Release.exists_by_mbid(invalid_mbid)
         assert result is None
         # Verify query was never called with invalid input
-        mock_query.assert_not_called()
+        mock_scalars.assert_not_called()
 
     def test_exists_by_mbid_query_construction(self, mocker):
         """Test that exists_by_mbid constructs the correct query"""
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_filter = mocker.Mock()
-        mock_query.return_value.filter = mock_filter
-        mock_filter.return_value.one_or_none.return_value = None
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.first.return_value = None
 
         Release.exists_by_mbid("test-mbid")
 
-        # Verify the query chain
-        mock_query.assert_called_once_with(Release)
-        mock_filter.assert_called_once()
+        statement = str(mock_scalars.call_args[0][0]).lower()
+        assert "from release" in statement
+        assert "release.mbid =" in statement
+
+    def test_exists_by_mbid_binds_each_mbid(self, app):
+        """Test that the cached statement is re-bound for each MBID and model"""
+        with app.app_context():
+            app_db = databass.db.operations.app_db
+            artist = Artist(name="Test Artist", mbid="artist-mbid")
+            label = Label(name="Test Label", mbid="label-mbid")
+            app_db.session.add_all([artist, label])
+            app_db.session.commit()
+
+            assert Artist.exists_by_mbid("artist-mbid") is artist
+            assert Label.exists_by_mbid("label-mbid") is label
+            assert Artist.exists_by_mbid("label-mbid") is None
 
     def test_exists_by_mbid_with_whitespace_mbid(self, mocker):
         """Test that exists_by_mbid handles MBIDs with whitespace correctly"""
         mock_entity = mocker.Mock()
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.filter.return_value.one_or_none.return_value = (
-            mock_entity
-        )
+        mock_scalars = mocker.patch("databass.db.base.app_db.session.scalars")
+        mock_scalars.return_value.first.return_value = mock_entity
 
         result = Release.exists_by_mbid("  valid-mbid  ")
         assert result == mock_entity
-        mock_query.assert_called_once_with(Release)
+        mock_scalars.assert_called_once()
 
 
 class TestMusicBrainzEntityExistsByName:
@@ -293,7 +400,7 @@ class TestMusicBrainzEntityExistsByName:
     def test_exists_by_name_returns_none_for_nonexistent_name(self, mocker):
         """Test that exists_by_name returns None when no matching name is found"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.filter.return_value.one_or_none.return_value = None
+        mock_query.return_value.filter.return_value.first.return_value = None
 
         result = Release.exists_by_name("non-existent-name")
         assert result is None
@@ -303,7 +410,7 @@ class TestMusicBrainzEntityExistsByName:
         """Test that exists_by_name returns the entity when a matching name is found"""
         mock_entity = mocker.Mock()
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.filter.return_value.one_or_none.return_value = (
+        mock_query.return_value.filter.return_value.first.return_value = (
             mock_entity
         )
 
@@ -326,7 +433,7 @@ class TestMusicBrainzEntityExistsByName:
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
         mock_filter = mocker.Mock()
         mock_query.return_value.filter = mock_filter
-        mock_filter.return_value.one_or_none.return_value = None
+        mock_filter.return_value.first.return_value = None
 
         test_name = "Test Name"
         Release.exists_by_name(test_name)
@@ -342,7 +449,7 @@ class TestMusicBrainzEntityExistsByName:
         """Test that exists_by_name handles names with whitespace correctly"""
         mock_entity = mocker.Mock()
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.filter.return_value.one_or_none.return_value = (
+        mock_query.return_value.filter.return_value.first.return_value = (
             mock_entity
         )
 
@@ -471,7 +578,7 @@ class TestReleaseRatingsLowest:
     def test_ratings_lowest_returns_list(self, mocker):
         """Test that ratings_lowest returns a list regardless of whether entries exist"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.limit.return_value.order_by.return_value.all.return_value = []
+        mock_query.return_value.order_by.return_value.limit.return_value.all.return_value = []
 
         result = Release.ratings_lowest()
         assert isinstance(result, list)
@@ -483,17 +590,17 @@ class TestReleaseRatingsLowest:
         """Test that ratings_lowest returns the correct number of entries based on limit parameter"""
         mock_entries = [mocker.Mock() for _ in range(expected_count)]
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.limit.return_value.order_by.return_value.all.return_value = mock_entries
+        mock_query.return_value.order_by.return_value.limit.return_value.all.return_value = mock_entries
 
         result = Release.ratings_lowest(limit=limit)
         assert len(result) == expected_count
-        mock_query.return_value.limit.assert_called_once_with(limit)
+        mock_query.return_value.order_by.return_value.limit.assert_called_once_with(limit)
 
     def test_ratings_lowest_orders_ascending(self, mocker):
         """Test that ratings_lowest orders results by rating in ascending order"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
         mock_order = mocker.Mock()
-        mock_query.return_value.limit.return_value.order_by = mock_order
+        mock_query.return_value.order_by = mock_order
 
         Release.ratings_lowest()
         mock_order.assert_called_once()
@@ -510,7 +617,7 @@ class TestReleaseRatingsLowest:
     def test_ratings_lowest_queries_correct_columns(self, mocker):
         """Test that ratings_lowest queries the expected columns"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.limit.return_value.order_by.return_value.all.return_value = []
+        mock_query.return_value.order_by.return_value.limit.return_value.all.return_value = []
 
         Release.ratings_lowest()
 
@@ -527,7 +634,7 @@ class TestReleaseRatingsHighest:
     def test_ratings_highest_returns_list(self, mocker):
         """Test that ratings_highest returns a list regardless of whether entries exist"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.limit.return_value.order_by.return_value.all.return_value = []
+        mock_query.return_value.order_by.return_value.limit.return_value.all.return_value = []
 
         result = Release.ratings_highest()
         assert isinstance(result, list)
@@ -539,17 +646,17 @@ class TestReleaseRatingsHighest:
         """Test that ratings_highest returns the correct number of entries based on limit parameter"""
         mock_entries = [mocker.Mock() for _ in range(expected_count)]
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.limit.return_value.order_by.return_value.all.return_value = mock_entries
+        mock_query.return_value.order_by.return_value.limit.return_value.all.return_value = mock_entries
 
         result = Release.ratings_highest(limit=limit)
         assert len(result) == expected_count
-        mock_query.return_value.limit.assert_called_once_with(limit)
+        mock_query.return_value.order_by.return_value.limit.assert_called_once_with(limit)
 
     def test_ratings_highest_orders_descending(self, mocker):
         """Test that ratings_highest orders results by rating in descending order"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
         mock_order = mocker.Mock()
-        mock_query.return_value.limit.return_value.order_by = mock_order
+        mock_query.return_value.order_by = mock_order
 
         Release.ratings_highest()
         mock_order.assert_called_once()
@@ -566,7 +673,7 @@ class TestReleaseRatingsHighest:
     def test_ratings_highest_queries_correct_columns(self, mocker):
         """Test that ratings_highest queries the expected columns"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.limit.return_value.order_by.return_value.all.return_value = []
+        mock_query.return_value.order_by.return_value.limit.return_value.all.return_value = []
 
         Release.ratings_highest()
 
@@ -580,6 +687,30 @@ class TestReleaseRatingsHighest:
 class TestReleaseRatingsAverage:
     """Test suite for Release.ratings_average class method"""
 
+    def test_ratings_average_is_cached(self, mocker):
+        """Test that ratings_average reuses its result until the cache is cleared"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.return_value.scalar.return_value = 4.5
+
+        assert Release.ratings_average() == 4.5
+        mock_query.return_value.scalar.return_value = 3.0
+        assert Release.ratings_average() == 4.5
+        mock_query.assert_called_once()
+
+        STATS_CACHE.clear()
+        assert Release.ratings_average() == 3.0
+
+    def test_ratings_average_cache_expires(self, mocker):
+        """Test that ratings_average is recomputed once its cached result is older than STATS_TTL"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.return_value.scalar.return_value = 4.5
+        mock_time = mocker.patch("databass.db.models.time.monotonic", return_value=0.0)
+
+        Release.ratings_average()
+        mock_time.return_value = 301.0
+        mock_query.return_value.scalar.return_value = 3.0
+        assert Release.ratings_average() == 3.0
+
     def test_ratings_average_returns_float(self, mocker):
         """Test that ratings_average returns a float value"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
@@ -635,97 +766,139 @@ class TestReleaseRatingsAverage:
         assert "rating" in str(query_args[0]).lower()
 
 
-class TestReleaseHomeData:
-    """Test suite for Release.home_data class method"""
+class TestReleaseStatsBundle:
+    """Test suite for Release.stats_bundle class method"""
 
-    def test_home_data_returns_list(self, mocker):
-        """Test that home_data returns a list regardless of whether entries exist"""
+    def test_stats_bundle_single_query(self, mocker):
+        """Test that stats_bundle fetches every aggregate in one query"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_order_by = mock_query.return_value.order_by
-        mock_order_by.return_value.all.return_value = []
+        mock_query.return_value.one.return_value = mocker.Mock(
+            total=3, rating=7.333, runtime_avg=7200000, runtime_sum=21600000, this_year=2
+        )
 
-        result = Release.home_data()
-        assert isinstance(result, list)
+        result = Release.stats_bundle()
+
+        mock_query.assert_called_once()
+        assert "FILTER (WHERE" in str(mock_query.call_args[0][4])
+        assert result == {
+            "total_count": 3,
+            "ratings_average": 7.33,
+            "average_runtime": 120.0,
+            "total_runtime": 6.0,
+            "added_this_year": 2,
+        }
 
-    def test_home_data_orders_by_id_desc(self, mocker):
-        """Test that home_data orders results by release ID in descending order"""
+    def test_stats_bundle_empty_table(self, mocker):
+        """Test that stats_bundle returns zeroes when there are no releases"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_order_by = mock_query.return_value.order_by
-        mock_order_by.return_value.all.return_value = []
+        mock_query.return_value.one.return_value = mocker.Mock(
+            total=0, rating=None, runtime_avg=None, runtime_sum=None, this_year=0
+        )
 
-        Release.home_data()
+        result = Release.stats_bundle()
+        assert result["ratings_average"] == 0
+        assert result["average_runtime"] == 0
+        assert result["total_runtime"] == 0
 
-        mock_query.assert_called_once_with(Release)
-        mock_order_by.assert_called_once()
+    def test_stats_bundle_handles_database_error(self, mocker):
+        """Test that stats_bundle returns zeroes when the query fails"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.return_value.one.side_effect = Exception("Database error")
 
-    def test_home_data_returns_correct_fields(self, mocker):
-        """Test that home_data returns rows with all expected fields"""
-        # Mock a database row with the expected fields
-        mock_row = mocker.Mock()
-        mock_row.artist_id = 1
-        mock_row.artist_name = "Test Artist"
-        mock_row.id = 1
-        mock_row.name = "Test Release"
-        mock_row.rating = 4.5
-        mock_row.listen_date = "2024-12-14"
-        mock_row.main_genre = "Test Genre"
-        mock_row.image = "test.jpg"
-        mock_row.genres = ["genre1", "genre2"]
+        result = Release.stats_bundle()
+        assert set(result.values()) == {0}
 
-        # Patch the query to return a list containing the mock row
-        mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.order_by.return_value.all.return_value = [mock_row]
 
-        # Call the function
-        result = Release.home_data()
+class TestReleaseHomePage:
+    """Test suite for Release.home_page class method"""
 
-        # Validate that one row is returned
-        assert len(result) == 1
+    @pytest.fixture
+    def release_ids(self, app):
+        """Seven releases in an in-memory database, yielding their IDs"""
+        with app.app_context():
+            app_db = databass.db.operations.app_db
+            releases = [
+                Release(
+                    name=f"Release {n}",
+                    year=2024,
+                    runtime=0,
+                    rating=50,
+                    track_count=1,
+                    main_genre_id=0,
+                    listen_date=datetime(2024, 1, n + 1),
+                )
+                for n in range(7)
+            ]
+            app_db.session.add_all(releases)
+            app_db.session.commit()
+            yield [release.id for release in releases]
 
-        # Validate that the row contains all expected fields
-        row = result[0]
-        expected_fields = [
-            "artist_id",
-            "artist_name",
-            "id",
-            "name",
-            "rating",
-            "listen_date",
-            "main_genre",
-            "image",
-            "genres",
-        ]
-        for field in expected_fields:
-            assert hasattr(row, field)
+    def test_home_page_first_page(self, release_ids):
+        """Test that the first page holds the newest releases and only an older page exists"""
+        results, has_prev, has_next = Release.home_page(per_page=3)
 
-    def test_home_data_handles_empty_genres(self, mocker):
-        """Test that home_data handles releases with no genres"""
-        # Mock a database row with genres set to None
-        mock_row = mocker.Mock()
-        mock_row.artist_id = 1
-        mock_row.artist_name = "Test Artist"
-        mock_row.id = 2
-        mock_row.name = "Another Release"
-        mock_row.rating = 3.0
-        mock_row.listen_date = "2024-12-14"
-        mock_row.main_genre = "Test Genre"
-        mock_row.image = "test2.jpg"
-        mock_row.genres = None
+        assert [r.id for r in results] == release_ids[::-1][:3]
+        assert has_prev is False
+        assert has_next is True
 
-        # Patch the query to return a list containing the mock row
+    def test_home_page_after_cursor(self, release_ids):
+        """Test that `after` returns the releases older than the given ID"""
+        newest_first = release_ids[::-1]
+
+        results, has_prev, has_next = Release.home_page(
+            per_page=3, after=newest_first[2]
+        )
+        assert [r.id for r in results] == newest_first[3:6]
+        assert (has_prev, has_next) == (True, True)
+
+        results, has_prev, has_next = Release.home_page(
+            per_page=3, after=newest_first[5]
+        )
+        assert [r.id for r in results] == newest_first[6:]
+        assert (has_prev, has_next) == (True, False)
+
+    def test_home_page_before_cursor(self, release_ids):
+        """Test that `before` returns the releases newer than the given ID, newest first"""
+        newest_first = release_ids[::-1]
+
+        results, has_prev, has_next = Release.home_page(
+            per_page=3, before=newest_first[6]
+        )
+        assert [r.id for r in results] == newest_first[3:6]
+        assert (has_prev, has_next) == (True, True)
+
+        results, has_prev, has_next = Release.home_page(
+            per_page=3, before=newest_first[3]
+        )
+        assert [r.id for r in results] == newest_first[:3]
+        assert (has_prev, has_next) == (False, True)
+
+    def test_home_page_handles_database_error(self, mocker):
+        """Test that home_page returns an empty page when the query fails"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.order_by.return_value.all.return_value = [mock_row]
+        mock_query.side_effect = Exception("Database error")
 
-        # Call the function
-        result = Release.home_data()
+        assert Release.home_page(per_page=5) == ([], False, False)
 
-        # Validate that one row is returned
-        assert len(result) == 1
+    def test_home_page_eager_loads_relationships(self, mocker):
+        """Test that home_page loads the relationships rendered on the home page with the releases"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.return_value.options.return_value.order_by.return_value.limit.return_value.all.return_value = []
+
+        Release.home_page(per_page=5)
 
-        # Validate that the row has the `genres` attribute even if it's None
-        row = result[0]
-        assert hasattr(row, "genres")
-        assert row.genres is None
+        options = mock_query.return_value.options.call_args[0]
+        loaded = {option.path[1].key for option in options if len(option.path) > 1}
+        assert loaded == {"artist", "main_genre", "genres"}
+
+    def test_home_page_raises_on_other_relationships(self, release_ids):
+        """Test that relationships the home table doesn't load are not lazy loaded per row"""
+        databass.db.operations.app_db.session.expunge_all()
+        results, _, _ = Release.home_page(per_page=3)
+
+        assert results[0].genres == []
+        with pytest.raises(InvalidRequestError):
+            results[0].reviews
 
 
 class TestReleaseListensThisYear:
@@ -778,6 +951,19 @@ class TestReleaseListensThisYear:
         assert "count" in str(query_args[0]).lower()
         assert "release.id" in str(query_args[0]).lower()
 
+    def test_listens_this_year_filters_on_date_range(self, mocker):
+        """Test that listens_this_year filters on a range of listen_date rather than extracting the year"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.return_value.filter.return_value.scalar.return_value = 0
+
+        Release.listens_this_year()
+
+        conditions = mock_query.return_value.filter.call_args[0]
+        assert len(conditions) == 2
+        for condition in conditions:
+            assert "extract" not in str(condition).lower()
+            assert "release.listen_date" in str(condition)
+
 
 class TestReleaseAddedPerDayThisYear:
     """Test suite for Release.listens_per_day class method"""
@@ -858,7 +1044,7 @@ class TestReleaseDynamicSearch:
     def test_dynamic_search_returns_list(self, mocker):
         """Test that dynamic_search returns a list regardless of search criteria"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.order_by.return_value.all.return_value = []
+        mock_query.return_value.options.return_value.order_by.return_value.all.return_value = []
 
         result = Release.dynamic_search({})
         assert isinstance(result, list)
@@ -873,6 +1059,7 @@ class TestReleaseDynamicSearch:
         mock_query = mocker.MagicMock()
         mock_query.filter.return_value = mock_query
         mock_query.where.return_value = mock_query
+        mock_query.options.return_value = mock_query
         mock_query.order_by.return_value = mock_query
         mock_query.all.return_value = []
 
@@ -882,31 +1069,31 @@ class TestReleaseDynamicSearch:
         assert isinstance(result, list)
         assert len(result) == 0
 
-    def test_dynamic_search_label_filter(self, mocker):
-        """Test that dynamic_search correctly handles label filtering"""
+    @pytest.mark.parametrize(
+        "key,column,table", [("label", "label_id", "label"), ("artist", "artist_id", "artist")]
+    )
+    def test_dynamic_search_name_subquery_filter(self, mocker, key, column, table):
+        """Test that dynamic_search filters artists and labels by name in a subquery"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_label = mocker.Mock()
-        mock_label.id = 1
-        mock_exists = mocker.patch("databass.db.models.Label.id_by_matching_name")
-        mock_exists.return_value = [mock_label]
+        mock_lookup = mocker.patch(
+            f"databass.db.models.{table.capitalize()}.id_by_matching_name"
+        )
 
-        Release.dynamic_search({"label": "Test Label"})
+        Release.dynamic_search({key: "Test"})
 
-        mock_exists.assert_called_once_with(name="Test Label")
-        mock_query.return_value.filter.assert_called()
+        mock_lookup.assert_not_called()
+        filter_arg = str(mock_query.return_value.filter.call_args[0][0])
+        assert f"release.{column} IN (SELECT {table}.id" in filter_arg
+        assert f"lower({table}.name) LIKE lower" in filter_arg
 
-    def test_dynamic_search_artist_filter(self, mocker):
-        """Test that dynamic_search correctly handles artist filtering"""
+    def test_dynamic_search_applies_filters_together(self, mocker):
+        """Test that the plain search predicates are applied with a single filter() call"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_artist = mocker.Mock()
-        mock_artist.id = 1
-        mock_exists = mocker.patch("databass.db.models.Artist.id_by_matching_name")
-        mock_exists.return_value = [mock_artist]
 
-        Release.dynamic_search({"artist": "Test Artist"})
+        Release.dynamic_search({"name": "Test", "country": "US", "main_genre": "rock"})
 
-        mock_exists.assert_called_once_with(name="Test Artist")
-        mock_query.return_value.filter.assert_called()
+        mock_query.return_value.filter.assert_called_once()
+        assert len(mock_query.return_value.filter.call_args[0]) == 3
 
     def test_dynamic_search_comparison_filters(self, mocker):
         """Test that dynamic_search correctly handles comparison filters"""
@@ -938,7 +1125,116 @@ class TestReleaseDynamicSearch:
 
         mock_filter.assert_called_once()
 
-        mock_query_instance.order_by.return_value.all.assert_called_once()
+        mock_query_instance.options.return_value.order_by.return_value.all.assert_called_once()
+
+    def test_dynamic_search_raises_on_lazy_loads(self, mocker):
+        """Test that dynamic_search makes relationship access on its results raise instead of querying"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+
+        Release.dynamic_search({})
+
+        (option,) = mock_query.return_value.options.call_args[0]
+        assert option.strategy == (("lazy", "raise"),)
+
+
+class TestReleaseSearchPage:
+    """Test suite for Release.search_page class method"""
+
+    @pytest.fixture
+    def mock_query(self, mocker):
+        mock_query = mocker.MagicMock()
+        mock_query.filter.return_value = mock_query
+        mock_query.options.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.offset.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mocker.patch("databass.db.base.app_db.session.query", return_value=mock_query)
+        return mock_query
+
+    def test_search_page_returns_page_and_total(self, mock_query):
+        """Test that search_page returns the page's rows and the total match count"""
+        mock_query.with_entities.return_value.scalar.return_value = 40
+        mock_query.all.return_value = ["release"] * 15
+
+        results, total = Release.search_page({"name": "Test"}, page=2, per_page=15)
+        assert results == ["release"] * 15
+        assert total == 40
+        mock_query.count.assert_not_called()
+
+    def test_search_page_limits_query(self, mock_query):
+        """Test that search_page only fetches the requested page from the database"""
+        Release.search_page({}, page=3, per_page=15)
+        mock_query.offset.assert_called_once_with(30)
+        mock_query.limit.assert_called_once_with(15)
+
+    def test_search_page_invalid_input(self, mock_query):
+        """Test that search_page raises ValueError for non-dict search criteria"""
+        with pytest.raises(ValueError, match="Search criteria must be a dictionary"):
+            Release.search_page("invalid input", page=1, per_page=15)
+
+
+class TestReleaseGetWithRelations:
+    """Test suite for Release.get_with_relations class method"""
+
+    def test_get_with_relations_loads_relationships(self, mocker):
+        """Test that get_with_relations loads everything the release page renders with the release"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+
+        Release.get_with_relations(1)
+
+        mock_query.assert_called_once_with(Release)
+        *loaders, wildcard = mock_query.return_value.options.call_args[0]
+        assert {option.path[1].key for option in loaders} == {
+            "artist",
+            "label",
+            "main_genre",
+            "genres",
+            "reviews",
+        }
+        assert wildcard.strategy == (("lazy", "raise"),)
+
+    def test_get_with_relations_returns_release(self, mocker):
+        """Test that get_with_relations returns the matching release"""
+        mock_release = mocker.Mock()
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.return_value.options.return_value.filter.return_value.one_or_none.return_value = (
+            mock_release
+        )
+
+        assert Release.get_with_relations(1) == mock_release
+
+    def test_get_with_relations_handles_database_error(self, mocker):
+        """Test that get_with_relations returns None when the query fails"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.return_value.options.return_value.filter.return_value.one_or_none.side_effect = Exception(
+            "Database error"
+        )
+
+        assert Release.get_with_relations(1) is None
+
+
+class TestReleaseOthersWith:
+    """Test suite for Release.others_with class method"""
+
+    @pytest.mark.parametrize("column", ["artist_id", "label_id"])
+    def test_others_with_filters_in_query(self, mocker, column):
+        """Test that others_with excludes the given release in SQL rather than in Python"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        release = Release(name="Test Release", artist_id=3, label_id=4)
+        release.id = 7
+
+        Release.others_with(release, column)
+
+        conditions = [
+            str(condition)
+            for condition in mock_query.return_value.options.return_value.filter.call_args[0]
+        ]
+        assert conditions == [f"release.{column} = :{column}_1", "release.id != :id_1"]
+
+    def test_others_with_invalid_column(self):
+        """Test that others_with raises ValueError for columns other than artist_id and label_id"""
+        with pytest.raises(ValueError, match="Unsupported column"):
+            Release.others_with(Release(name="Test Release"), "main_genre_id")
 
 
 class TestReleaseGetReviews:
@@ -982,17 +1278,15 @@ class TestReleaseGetReviews:
 
     def test_get_reviews_returns_correct_data(self, mocker):
         """Test that get_reviews returns the correct review data structure"""
-        mock_review = mocker.Mock()
-        mock_review.timestamp = "2024-01-01 12:00"
-        mock_review.text = "Test review text"
-
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.where.return_value.all.return_value = [mock_review]
+        mock_query.return_value.where.return_value.all.return_value = [
+            (datetime(2024, 1, 1, 12, 0, 45), "Test review text")
+        ]
 
         result = Release.get_reviews(1)
         assert len(result) == 1
-        assert result[0].timestamp == mock_review.timestamp
-        assert result[0].text == mock_review.text
+        assert result[0].timestamp == "2024-01-01 12:00"
+        assert result[0].text == "Test review text"
 
     def test_get_reviews_filters_by_release_id(self, mocker):
         """Test that get_reviews filters reviews by the correct release ID"""
@@ -1025,7 +1319,7 @@ class TestReleaseCreateNew:
         mock_construct = mocker.patch("databass.db.construct_item")
         mock_insert = mocker.patch("databass.db.operations.insert")
         mocker.patch("databass.db.operations.update")
-        mock_get_image = mocker.patch("databass.api.Util.get_image")
+        mock_get_image = mocker.patch("databass.api.Util.get_image_in_background")
 
         mock_release = mocker.Mock()
         mock_release.id = 42
@@ -1056,7 +1350,7 @@ class TestReleaseCreateNew:
         mock_construct = mocker.patch("databass.db.operations.construct_item")
         mock_insert = mocker.patch("databass.db.operations.insert")
         mock_update = mocker.patch("databass.db.operations.update")
-        mock_get_image = mocker.patch("databass.api.Util.get_image")
+        mock_get_image = mocker.patch("databass.api.Util.get_image_in_background")
 
         test_data = {
             "name": "Test Release",
@@ -1069,6 +1363,24 @@ class TestReleaseCreateNew:
         Release.create_new(test_data)
         mock_construct.assert_called_once_with("release", test_data)
 
+    @pytest.mark.parametrize("image", [None, "https://example.com/cover.jpg"])
+    def test_create_new_fetches_image_once(self, mocker, image):
+        """Test that create_new starts exactly one background fetch of the release image"""
+        mocker.patch("databass.db.operations.construct_item")
+        mocker.patch("databass.db.operations.insert", return_value=1)
+        mock_get_image = mocker.patch("databass.api.Util.get_image_in_background")
+
+        Release.create_new(
+            {
+                "name": "Test Release",
+                "artist_name": "Test Artist",
+                "label_name": "Test Label",
+                "release_group_mbid": "test-mbid",
+                "image": image,
+            }
+        )
+        mock_get_image.assert_called_once()
+
     def test_create_new_missing_required_fields(self, mocker):
         """Test that create_new handles missing required fields appropriately"""
         mock_construct = mocker.patch("databass.db.operations.construct_item")
@@ -1089,7 +1401,7 @@ class TestArtistOrLabelFrequencyHighest:
     def test_frequency_highest_returns_list(self, mocker):
         """Test that frequency_highest returns a list regardless of whether entries exist"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.join.return_value.where.return_value.group_by.return_value.order_by.return_value.limit.return_value.all.return_value = []
+        mock_query.return_value.join.return_value.where.return_value.order_by.return_value.limit.return_value.all.return_value = []
 
         result = Artist.frequency_highest()
         assert isinstance(result, list)
@@ -1101,7 +1413,7 @@ class TestArtistOrLabelFrequencyHighest:
         """Test that frequency_highest returns the correct number of entries based on limit parameter"""
         mock_entries = [mocker.Mock() for _ in range(expected_count)]
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.join.return_value.where.return_value.group_by.return_value.order_by.return_value.limit.return_value.all.return_value = mock_entries
+        mock_query.return_value.join.return_value.where.return_value.order_by.return_value.limit.return_value.all.return_value = mock_entries
 
         result = Artist.frequency_highest(limit=limit)
         assert len(result) == expected_count
@@ -1110,7 +1422,7 @@ class TestArtistOrLabelFrequencyHighest:
         """Test that frequency_highest orders results by count in descending order"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
         mock_order = mocker.Mock()
-        mock_query.return_value.join.return_value.where.return_value.group_by.return_value.order_by = mock_order
+        mock_query.return_value.join.return_value.where.return_value.order_by = mock_order
         mock_order.return_value.limit.return_value.all.return_value = []
 
         Artist.frequency_highest()
@@ -1126,7 +1438,7 @@ class TestArtistOrLabelFrequencyHighest:
         mock_result.image = "test.jpg"
 
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.join.return_value.where.return_value.group_by.return_value.order_by.return_value.limit.return_value.all.return_value = [
+        mock_query.return_value.join.return_value.where.return_value.order_by.return_value.limit.return_value.all.return_value = [
             mock_result
         ]
 
@@ -1148,12 +1460,13 @@ class TestArtistOrLabelFrequencyHighest:
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
         mock_join = mocker.Mock()
         mock_query.return_value.join = mock_join
-        mock_join.return_value.where.return_value.group_by.return_value.order_by.return_value.limit.return_value.all.return_value = []
+        mock_join.return_value.where.return_value.order_by.return_value.limit.return_value.all.return_value = []
 
         Artist.frequency_highest()
 
-        join_args = mock_join.call_args[0]
-        assert "Release" in str(join_args)
+        subquery, onclause = mock_join.call_args[0]
+        assert "GROUP BY release.artist_id" in str(subquery.element)
+        assert str(onclause) == "release_counts.entity_id = artist.id"
 
 
 class TestArtistOrLabelAverageRatingsAndTotalCounts:
@@ -1249,50 +1562,50 @@ class TestArtistOrLabelAverageRatingsAndTotalCounts:
 class TestArtistOrLabelAverageRatingsBayesian:
     """Test suite for ArtistOrLabel.average_ratings_bayesian class method"""
 
-    def test_average_ratings_bayesian_returns_list(self, mocker):
-        """Test that average_ratings_bayesian returns a list regardless of whether entries exist"""
-        mock_ratings = mocker.patch(
-            "databass.db.models.ArtistOrLabel.average_ratings_and_total_counts"
+    @pytest.fixture
+    def mock_all(self, mocker):
+        """
+        Build real, unbound queries so the generated SQL can be inspected, and
+        mock only the final fetch of the results
+        """
+        from sqlalchemy.orm import Query
+
+        mocker.patch(
+            "databass.db.base.app_db.session.query",
+            side_effect=lambda *entities: Query(entities),
         )
-        mock_ratings.return_value = []
+        return mocker.patch.object(Query, "all", autospec=True, return_value=[])
 
+    def test_average_ratings_bayesian_returns_list(self, mock_all):
+        """Test that average_ratings_bayesian returns a list regardless of whether entries exist"""
         result = Artist.average_ratings_bayesian()
         assert isinstance(result, list)
 
-    @pytest.mark.parametrize(
-        "sort_order,expected_order", [("desc", True), ("asc", False)]
-    )
-    def test_average_ratings_bayesian_sort_order(
-        self, mocker, sort_order, expected_order
-    ):
-        """Test that average_ratings_bayesian sorts results correctly based on sort_order parameter"""
-        mock_entity = mocker.Mock()
-        mock_entity.id = 1
-        mock_entity.name = "Test Entity"
-        mock_entity.average_rating = 4
-        mock_entity.release_count = 10
-        mock_entity.image = "test.jpg"
+    @pytest.mark.parametrize("sort_order", ["desc", "asc"])
+    def test_average_ratings_bayesian_sort_order(self, mock_all, sort_order):
+        """Test that average_ratings_bayesian sorts by the Bayesian average in the database"""
+        Artist.average_ratings_bayesian(sort_order=sort_order)
 
-        mock_ratings = mocker.patch(
-            "databass.db.models.ArtistOrLabel.average_ratings_and_total_counts"
-        )
-        mock_ratings.return_value = [mock_entity]
+        query = mock_all.call_args[0][0]
+        assert f"ORDER BY bayesian {sort_order.upper()}" in str(query)
 
-        result = Artist.average_ratings_bayesian(sort_order=sort_order)
-        assert len(result) > 0
-        assert isinstance(result[0], dict)
+    def test_average_ratings_bayesian_single_query(self, mock_all):
+        """Test that the per-entity and overall averages are computed in one query"""
+        Artist.average_ratings_bayesian()
 
-        # Verify sort order was applied correctly
-        if len(result) > 1:
-            is_descending = result[0]["rating"] >= result[1]["rating"]
-            assert is_descending == expected_order
+        mock_all.assert_called_once()
+        sql = str(mock_all.call_args[0][0])
+        assert "WITH entities AS" in sql
+        assert "stats AS" in sql
 
-    def test_average_ratings_bayesian_empty_database(self, mocker):
+    def test_average_ratings_bayesian_empty_database(self, mock_all):
         """Test that average_ratings_bayesian handles empty database correctly"""
-        mock_ratings = mocker.patch(
-            "databass.db.models.ArtistOrLabel.average_ratings_and_total_counts"
-        )
-        mock_ratings.return_value = []
+        result = Artist.average_ratings_bayesian()
+        assert result == []
+
+    def test_average_ratings_bayesian_database_error(self, mock_all):
+        """Test that average_ratings_bayesian returns an empty list when the query fails"""
+        mock_all.side_effect = Exception("Database error")
 
         result = Artist.average_ratings_bayesian()
         assert result == []
@@ -1305,49 +1618,129 @@ class TestArtistOrLabelAverageRatingsBayesian:
         with pytest.raises(ValueError, match="Unrecognized sort order"):
             Artist.average_ratings_bayesian(sort_order=invalid_sort_order)
 
-    def test_average_ratings_bayesian_calculation(self, mocker):
-        """Test that average_ratings_bayesian calculates Bayesian averages correctly"""
-        mock_entity1 = mocker.Mock()
-        mock_entity1.id = 1
-        mock_entity1.name = "Entity 1"
-        mock_entity1.average_rating = 4
-        mock_entity1.release_count = 10
-        mock_entity1.image = "test1.jpg"
-
-        mock_entity2 = mocker.Mock()
-        mock_entity2.id = 2
-        mock_entity2.name = "Entity 2"
-        mock_entity2.average_rating = 5
-        mock_entity2.release_count = 5
-        mock_entity2.image = "test2.jpg"
-
-        mock_ratings = mocker.patch(
-            "databass.db.models.ArtistOrLabel.average_ratings_and_total_counts"
-        )
-        mock_ratings.return_value = [mock_entity1, mock_entity2]
-
-        result = Artist.average_ratings_bayesian()
-        assert len(result) == 2
-        assert all(
-            key in result[0] for key in ["id", "name", "rating", "image", "count"]
-        )
-
-    def test_average_ratings_bayesian_rounding(self, mocker):
-        """Test that average_ratings_bayesian rounds ratings correctly"""
+    def test_average_ratings_bayesian_result_fields(self, mocker, mock_all):
+        """Test that average_ratings_bayesian returns a dict per entity with its rounded rating"""
         mock_entity = mocker.Mock()
         mock_entity.id = 1
         mock_entity.name = "Test Entity"
-        mock_entity.average_rating = 4.6789
+        mock_entity.bayesian = 72.4
         mock_entity.release_count = 10
         mock_entity.image = "test.jpg"
+        mock_all.return_value = [mock_entity]
+
+        result = Artist.average_ratings_bayesian()
+        assert result == [
+            {
+                "id": 1,
+                "name": "Test Entity",
+                "rating": 72,
+                "image": "test.jpg",
+                "count": 10,
+            }
+        ]
+
+    @pytest.fixture
+    def rated_artists(self, app):
+        """
+        Artists with known release ratings in an in-memory database:
+        A averages 85 over 2 releases, B 67.5 over 4 and C 45 over 3.
+        D has a single release and is left out of the rankings.
+        """
+        with app.app_context():
+            app_db = databass.db.operations.app_db
+            ratings = {
+                "Artist A": [80, 90],
+                "Artist B": [60, 70, 65, 75],
+                "Artist C": [40, 50, 45],
+                "Artist D": [100],
+            }
+            for name, artist_ratings in ratings.items():
+                artist = Artist(name=name)
+                app_db.session.add(artist)
+                app_db.session.flush()
+                app_db.session.add_all(
+                    Release(
+                        name=f"{name} {n}",
+                        artist_id=artist.id,
+                        year=2024,
+                        runtime=0,
+                        rating=rating,
+                        track_count=1,
+                        main_genre_id=0,
+                        listen_date=datetime(2024, 1, 1),
+                    )
+                    for n, rating in enumerate(artist_ratings)
+                )
+            app_db.session.commit()
+            yield
+
+    @pytest.mark.parametrize(
+        "sort_order,expected",
+        [
+            # Mean average is (85 + 67 + 45) / 3 and mean count is 3, so e.g.
+            # A: 2/5 * 85 + 3/5 * 65.67 = 73.4
+            ("desc", [("Artist A", 73), ("Artist B", 66), ("Artist C", 55)]),
+            ("asc", [("Artist C", 55), ("Artist B", 66), ("Artist A", 73)]),
+        ],
+    )
+    def test_average_ratings_bayesian_values(self, rated_artists, sort_order, expected):
+        """Test the Bayesian average computed by the database and the order it is returned in"""
+        result = Artist.average_ratings_bayesian(sort_order=sort_order)
 
-        mock_ratings = mocker.patch(
-            "databass.db.models.ArtistOrLabel.average_ratings_and_total_counts"
+        assert [(entity["name"], entity["rating"]) for entity in result] == expected
+        assert {entity["name"]: entity["count"] for entity in result} == {
+            "Artist A": 2,
+            "Artist B": 4,
+            "Artist C": 3,
+        }
+
+
+class TestArtistOrLabelStatistic:
+    """Test suite for ArtistOrLabel.statistic class method"""
+
+    @pytest.mark.parametrize("sort_order", ["desc", "asc"])
+    def test_statistic_orders_in_query(self, mocker, sort_order):
+        """Test that statistic sorts in the database in the requested direction"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_order = mock_query.return_value.join.return_value.where.return_value.group_by.return_value.order_by
+        mock_order.return_value.all.return_value = []
+
+        Artist.statistic(sort_order=sort_order, metric="total", item_property="count")
+
+        order_arg = str(mock_order.call_args[0][0])
+        assert order_arg == f"count(release.id) {sort_order.upper()}"
+
+    def test_statistic_returns_dicts_keyed_by_property(self, mocker):
+        """Test that statistic returns the statistic under the requested property name"""
+        mock_row = mocker.Mock()
+        mock_row.id = 1
+        mock_row.name = "Test Artist"
+        mock_row.value = 4.5
+        mock_row.image = "test.jpg"
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.return_value.join.return_value.where.return_value.group_by.return_value.order_by.return_value.all.return_value = [
+            mock_row
+        ]
+
+        result = Artist.statistic(
+            sort_order="desc", metric="average", item_property="rating"
         )
-        mock_ratings.return_value = [mock_entity]
+        assert result == [
+            {"id": 1, "name": "Test Artist", "rating": 4.5, "image": "test.jpg"}
+        ]
 
-        result = Artist.average_ratings_bayesian()
-        assert isinstance(result[0]["rating"], int)
+    @pytest.mark.parametrize(
+        "metric,item_property", [("average", "count"), ("median", "rating")]
+    )
+    def test_statistic_unsupported(self, metric, item_property):
+        """Test that statistic raises ValueError for statistics it cannot compute"""
+        with pytest.raises(ValueError, match="Unsupported statistic"):
+            Artist.statistic(sort_order="desc", metric=metric, item_property=item_property)
+
+    def test_statistic_invalid_sort_order(self):
+        """Test that statistic raises ValueError for invalid sort orders"""
+        with pytest.raises(ValueError, match="Unrecognized sort order"):
+            Artist.statistic(sort_order="lowest", metric="total", item_property="count")
 
 
 class TestArtistOrLabelDynamicSearch:
@@ -1356,7 +1749,7 @@ class TestArtistOrLabelDynamicSearch:
     def test_dynamic_search_returns_list(self, mocker):
         """Test that dynamic_search returns a list regardless of whether entries exist"""
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
-        mock_query.return_value.where.return_value.where.return_value.where.return_value.all.return_value = []
+        mock_query.return_value.filter.return_value.options.return_value.all.return_value = []
 
         result = Artist.dynamic_search({})
         assert isinstance(result, list)
@@ -1392,6 +1785,7 @@ class TestArtistOrLabelDynamicSearch:
         mock_query = mocker.MagicMock()
         mock_query.filter.return_value = mock_query
         mock_query.where.return_value = mock_query
+        mock_query.options.return_value = mock_query
         mock_query.all.return_value = []
 
         mocker.patch("databass.db.base.app_db.session.query", return_value=mock_query)
@@ -1405,13 +1799,25 @@ class TestArtistOrLabelDynamicSearch:
         mock_query = mocker.patch("databass.db.base.app_db.session.query")
         mock_filter = mocker.Mock()
         mock_query.return_value.filter = mock_filter
-        mock_filter.return_value.where.return_value.where.return_value.where.return_value.all.return_value = []
+        mock_filter.return_value.options.return_value.all.return_value = []
 
         Artist.dynamic_search({"name": "Test Artist"})
         mock_filter.assert_called_once()
         filter_arg = mock_filter.call_args[0][0]
         assert "lower(artist.name) like lower" in str(filter_arg).lower()
 
+    def test_dynamic_search_excludes_placeholder_names(self, mocker):
+        """Test that placeholder names are excluded with a single NOT IN predicate"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.return_value.filter.return_value.options.return_value.all.return_value = []
+
+        Artist.dynamic_search({"name": "Test", "country": "US"})
+
+        mock_query.return_value.filter.assert_called_once()
+        filter_args = mock_query.return_value.filter.call_args[0]
+        assert len(filter_args) == 3
+        assert "artist.name not in" in str(filter_args[-1]).lower()
+
     def test_dynamic_search_invalid_comparison_operator(self, mocker):
         """Test that dynamic_search raises ValueError for invalid comparison operators"""
         # Mock the database session and query
@@ -1430,6 +1836,43 @@ class TestArtistOrLabelDynamicSearch:
             )
 
 
+class TestArtistOrLabelSearchPage:
+    """Test suite for ArtistOrLabel.search_page class method"""
+
+    @pytest.fixture
+    def mock_query(self, mocker):
+        mock_query = mocker.MagicMock()
+        mock_query.filter.return_value = mock_query
+        mock_query.where.return_value = mock_query
+        mock_query.options.return_value = mock_query
+        mock_query.order_by.return_value = mock_query
+        mock_query.offset.return_value = mock_query
+        mock_query.limit.return_value = mock_query
+        mocker.patch("databass.db.base.app_db.session.query", return_value=mock_query)
+        return mock_query
+
+    def test_search_page_returns_page_and_total(self, mock_query):
+        """Test that search_page returns the page's rows and the total match count"""
+        mock_query.with_entities.return_value.scalar.return_value = 40
+        mock_query.all.return_value = ["artist"] * 15
+
+        results, total = Artist.search_page({"name": "Test"}, page=2, per_page=15)
+        assert results == ["artist"] * 15
+        assert total == 40
+        mock_query.count.assert_not_called()
+
+    def test_search_page_limits_query(self, mock_query):
+        """Test that search_page only fetches the requested page from the database"""
+        Artist.search_page({}, page=3, per_page=15)
+        mock_query.offset.assert_called_once_with(30)
+        mock_query.limit.assert_called_once_with(15)
+
+    def test_search_page_invalid_page(self, mock_query):
+        """Test that search_page raises ValueError for a non-positive page"""
+        with pytest.raises(ValueError):
+            Artist.search_page({}, page=0, per_page=15)
+
+
 class TestArtistOrLabelCreateIfNotExist:
     """Test suite for ArtistOrLabel.create_if_not_exist class method"""
 
@@ -1437,11 +1880,122 @@ class TestArtistOrLabelCreateIfNotExist:
         """Test that create_if_not_exist returns existing ID when item exists"""
         mock_item = mocker.Mock()
         mock_item.id = 42
-        mock_exists = mocker.patch("databass.db.models.ArtistOrLabel.exists_by_mbid")
+        mock_exists = mocker.patch(
+            "databass.db.models.ArtistOrLabel.exists_by_mbid_or_name"
+        )
         mock_exists.return_value = mock_item
 
         result = Artist.create_if_not_exist(name="Test Artist")
         assert result == 42
+        mock_exists.assert_called_once_with(mbid=None, name="Test Artist")
+
+    def test_create_if_not_exist_returns_existing_id_on_mbid_conflict(
+        self, mocker, app
+    ):
+        """Test that an insert rejected for a duplicate MBID returns the existing entry's ID"""
+        with app.app_context():
+            mocker.patch(
+                "databass.db.models.ArtistOrLabel.exists_by_mbid_or_name",
+                return_value=None,
+            )
+            mocker.patch(
+                "databass.api.MusicBrainz.artist_search",
+                return_value={"name": "Test Artist", "mbid": "known-mbid"},
+            )
+            mocker.patch(
+                "databass.db.operations.insert",
+                side_effect=IntegrityError("statement", "params", "orig"),
+            )
+            mock_item = mocker.Mock()
+            mock_item.id = 7
+            mock_exists = mocker.patch(
+                "databass.db.models.ArtistOrLabel.exists_by_mbid",
+                return_value=mock_item,
+            )
+
+            result = Artist.create_if_not_exist(name="Test Artist")
+            assert result == 7
+            mock_exists.assert_called_once_with("known-mbid")
+
+    def test_create_if_not_exist_releases_connection_during_search(self, mocker, app):
+        """Test that no database transaction is held open while MusicBrainz is queried"""
+        with app.app_context():
+            session = databass.db.operations.app_db.session
+            in_transaction = []
+
+            def artist_search(name, mbid):
+                in_transaction.append(session().in_transaction())
+                return {"name": name, "mbid": None}
+
+            mocker.patch("databass.api.MusicBrainz.artist_search", artist_search)
+            mocker.patch("databass.api.Util.get_image_in_background")
+
+            artist_id = Artist.create_if_not_exist(name="Test Artist")
+
+            assert in_transaction == [False]
+            assert Artist.exists_by_id(artist_id).name == "Test Artist"
+
+    @pytest.mark.parametrize(
+        "model,search,name_kwarg",
+        [
+            (Artist, "artist_search", "artist_name"),
+            (Label, "label_search", "label_name"),
+        ],
+    )
+    def test_create_if_not_exist_fetches_image_in_background(
+        self, mocker, app, model, search, name_kwarg
+    ):
+        """Test that the new entity's image is fetched off the request thread"""
+        with app.app_context():
+            mocker.patch(f"databass.api.MusicBrainz.{search}", return_value=None)
+            mock_get_image = mocker.patch("databass.api.Util.get_image")
+            mock_background = mocker.patch("databass.api.Util.get_image_in_background")
+
+            item_id = model.create_if_not_exist(name="New Entity")
+
+            mock_get_image.assert_not_called()
+            mock_background.assert_called_once_with(
+                entity_type=model.__name__.lower(),
+                entity_id=item_id,
+                **{name_kwarg: "New Entity"},
+            )
+
+
+class TestArtistOrLabelExistsByMbidOrName:
+    """Test suite for ArtistOrLabel.exists_by_mbid_or_name class method"""
+
+    @pytest.mark.parametrize(
+        "mbid,name", [(None, None), ("", ""), (123, None), (None, ["Artist"])]
+    )
+    def test_exists_by_mbid_or_name_invalid_input(self, mocker, mbid, name):
+        """Test that no query is made without a usable MBID or name"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+
+        assert Artist.exists_by_mbid_or_name(mbid=mbid, name=name) is None
+        mock_query.assert_not_called()
+
+    def test_exists_by_mbid_or_name_prefers_mbid_match(self, app):
+        """Test that an MBID match is returned ahead of an earlier name match"""
+        with app.app_context():
+            app_db = databass.db.operations.app_db
+            by_name = Artist(name="Test Artist", mbid="other-mbid")
+            by_mbid = Artist(name="Renamed", mbid="wanted-mbid")
+            app_db.session.add_all([by_name, by_mbid])
+            app_db.session.commit()
+
+            result = Artist.exists_by_mbid_or_name(mbid="wanted-mbid", name="Test")
+            assert result is by_mbid
+
+    def test_exists_by_mbid_or_name_falls_back_to_name(self, app):
+        """Test that a partial name match is returned when no entry has the MBID"""
+        with app.app_context():
+            app_db = databass.db.operations.app_db
+            artist = Artist(name="Test Artist", mbid="other-mbid")
+            app_db.session.add(artist)
+            app_db.session.commit()
+
+            assert Artist.exists_by_mbid_or_name(mbid="missing", name="test") is artist
+            assert Artist.exists_by_mbid_or_name(mbid="missing", name="nope") is None
 
 
 class TestGoalNewReleasesSinceStartDate:
@@ -1505,92 +2059,224 @@ class TestGoalNewReleasesSinceStartDate:
         assert result == count_value
 
 
-class TestGenreCreateGenres:
-    """Test suite for Genre.create_genres static method"""
+class TestGoalIncompleteWithCounts:
+    """Test suite for Goal.incomplete_with_counts class method"""
 
-    def test_create_genres_creates_correct_number_of_genres(self, mocker, app):
-        """Test that create_genres creates the correct number of Genre objects from comma-separated string"""
+    def test_incomplete_with_counts_returns_counts(self, app):
+        """Test that each incomplete goal is paired with its release count"""
         with app.app_context():
-            # Mock the exists_by_name method to always return False
-            mocker.patch.object(Genre, "exists_by_name", return_value=False)
+            app_db = databass.db.operations.app_db
+            app_db.session.add_all(
+                Release(
+                    name=name,
+                    listen_date=listen_date,
+                    year=2024,
+                    runtime=0,
+                    rating=50,
+                    track_count=1,
+                    main_genre_id=0,
+                )
+                for name, listen_date in [
+                    ("Old", datetime(2023, 6, 1)),
+                    ("New", datetime(2024, 2, 1)),
+                ]
+            )
+            goal_fields = {"end": datetime(2025, 12, 31), "type": "release", "amount": 5}
+            active = Goal(start=datetime(2023, 1, 1), **goal_fields)
+            empty = Goal(start=datetime(2025, 1, 1), **goal_fields)
+            done = Goal(
+                start=datetime(2023, 1, 1), completed=datetime(2024, 1, 1), **goal_fields
+            )
+            app_db.session.add_all([active, empty, done])
+            app_db.session.commit()
 
-            # Mock construct_item to return a predictable Genre object
-            mock_construct = mocker.patch("databass.db.operations.construct_item")
-            mock_construct.side_effect = lambda type, data: Genre(name=data["name"])
+            result = dict(Goal.incomplete_with_counts())
 
-            # Mock insert to return a predictable ID
-            mock_insert = mocker.patch(
-                "databass.db.operations.insert", side_effect=[1, 2, 3]
+            assert result == {active: 2, empty: 0}
+            assert result[active] == active.new_releases_since_start_date
+
+    def test_incomplete_with_counts_handles_database_error(self, mocker):
+        """Test that an empty list is returned when the query fails"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.side_effect = Exception("Database error")
+
+        assert Goal.incomplete_with_counts() == []
+
+
+class TestGoalCheckGoals:
+    """Test suite for Goal.check_goals class method"""
+
+    def test_check_goals_completes_met_goals_only(self, mocker, app):
+        """Test that check_goals completes goals whose release count has reached their amount"""
+        with app.app_context():
+            app_db = databass.db.operations.app_db
+            release_fields = {
+                "year": 2023,
+                "runtime": 0,
+                "rating": 50,
+                "track_count": 1,
+                "main_genre_id": 0,
+            }
+            app_db.session.add_all(
+                Release(name=name, listen_date=listen_date, **release_fields)
+                for name, listen_date in [
+                    ("Old", datetime(2023, 6, 1)),
+                    ("New", datetime(2024, 2, 1)),
+                    ("Newer", datetime(2024, 3, 1)),
+                ]
+            )
+            met = Goal(
+                start=datetime(2024, 1, 1),
+                end=datetime(2025, 12, 31),
+                type="release",
+                amount=2,
+            )
+            unmet = Goal(
+                start=datetime(2024, 1, 1),
+                end=datetime(2025, 12, 31),
+                type="release",
+                amount=3,
+            )
+            empty = Goal(
+                start=datetime(2025, 1, 1),
+                end=datetime(2025, 12, 31),
+                type="release",
+                amount=1,
             )
+            app_db.session.add_all([met, unmet, empty])
+            app_db.session.commit()
+            mock_query = mocker.spy(app_db.session, "query")
+            mock_commit = mocker.spy(app_db.session, "commit")
 
-            test_genres = "rock,jazz,electronic"
-            result = Genre.create_genres(test_genres)
+            Goal.check_goals()
 
-            # Verify the mocks were called correctly
-            assert mock_construct.call_count == 3
-            assert mock_insert.call_count == 3
+            # One aggregate query for all goals and one commit for the met goals
+            assert mock_query.call_count == 1
+            mock_commit.assert_called_once()
+            assert met.completed is not None
+            assert unmet.completed is None
+            assert empty.completed is None
 
-            # Verify the correct genre names were used
-            assert [genre.name for genre in result] == ["rock", "jazz", "electronic"]
+    def test_check_goals_handles_database_error(self, mocker):
+        """Test that check_goals does nothing when the query fails"""
+        mock_query = mocker.patch("databass.db.base.app_db.session.query")
+        mock_query.side_effect = Exception("Database error")
+        mock_commit = mocker.patch("databass.db.base.app_db.session.commit")
 
-    @pytest.mark.parametrize(
-        "genres_string,expected_genres",
-        [
-            ("rock,jazz", ["rock", "jazz"]),
-            ("electronic", ["electronic"]),
-            ("metal,punk,indie,folk", ["metal", "punk", "indie", "folk"]),
-            ("", [""]),
-        ],
-    )
-    def test_create_genres_splits_string_correctly(
-        self, mocker, genres_string, expected_genres, app
-    ):
-        """Test that create_genres correctly splits the input string into individual genres"""
+        Goal.check_goals()
+
+        mock_commit.assert_not_called()
+
+
+class TestGenreExistsByName:
+    """Test suite for Genre.exists_by_name class method"""
+
+    def test_exists_by_name_matches_full_name_only(self, app):
+        """Test that only an exact genre name matches"""
         with app.app_context():
-            mock_construct = mocker.patch("databass.db.operations.construct_item")
-            mock_insert = mocker.patch("databass.db.operations.insert")
+            app_db = databass.db.operations.app_db
+            genre = Genre(name="rock")
+            app_db.session.add(genre)
+            app_db.session.commit()
 
-            Genre.create_genres(genres_string)
+            assert Genre.exists_by_name("rock") is genre
+            assert Genre.exists_by_name("roc") is None
+            assert Genre.exists_by_name("") is None
 
-            for genre in expected_genres:
-                mock_construct.assert_any_call("genre", {"name": genre})
 
-    def test_create_genress_constructs_genre_objects_correctly(self, mocker, app):
-        """Test that create_genres constructs Genre objects with correct parameters"""
+class TestGenreRequestCache:
+    """Test suite for the per-request genre cache used by Genre.create_if_not_exists and create_genres"""
+
+    def test_create_if_not_exists_looks_up_each_name_once(self, mocker, app):
+        """Test that a genre is only queried for once within the same request"""
         with app.app_context():
-            mock_construct = mocker.patch("databass.db.operations.construct_item")
-            mock_insert = mocker.patch("databass.db.operations.insert")
+            mock_exists = mocker.spy(Genre, "exists_by_name")
 
-            test_release_id = 42
-            test_genre = "rock"
-            Genre.create_genres(test_genre)
+            first = Genre.create_if_not_exists("rock")
+            second = Genre.create_if_not_exists("rock")
 
-            mock_construct.assert_called_once_with("genre", {"name": test_genre})
+            assert first is second
+            mock_exists.assert_called_once_with("rock")
 
-    def test_create_genres_inserts_constructed_objects(self, mocker, app):
-        """Test that create_genres inserts the constructed Genre objects into the database"""
+    def test_create_genres_reuses_main_genre(self, mocker, app):
+        """Test that create_genres does not query for a genre create_if_not_exists already returned"""
         with app.app_context():
-            mock_genre = mocker.Mock()
-            mock_construct = mocker.patch("databass.db.operations.construct_item")
-            mock_insert = mocker.patch("databass.db.operations.insert")
-            mock_construct.return_value = mock_genre
+            main_genre = Genre.create_if_not_exists("rock")
+            mock_query = mocker.spy(databass.db.operations.app_db.session, "query")
+
+            result = Genre.create_genres("rock")
+
+            assert result == [main_genre]
+            mock_query.assert_not_called()
 
-            Genre.create_genres("rock")
+    def test_request_cache_outside_app_context(self):
+        """Test that nothing is shared between calls without an app context"""
+        Genre.request_cache()["rock"] = "cached"
 
-            mock_insert.assert_called_once_with(mock_genre)
+        assert Genre.request_cache() == {}
 
-    def test_create_genres_handles_whitespace(self, mocker, app):
-        """Test that create_genres handles genres with whitespace correctly"""
+
+class TestGenreCreateGenres:
+    """Test suite for Genre.create_genres static method"""
+
+    def test_create_genres_creates_missing_genres(self, app):
+        """Test that create_genres inserts every new genre and returns them in input order"""
         with app.app_context():
-            mock_construct = mocker.patch("databass.db.operations.construct_item")
-            mock_insert = mocker.patch("databass.db.operations.insert")
+            result = Genre.create_genres("rock,jazz,electronic")
 
-            test_genres = "rock , jazz , electronic"
-            Genre.create_genres(test_genres)
+            assert [genre.name for genre in result] == ["rock", "jazz", "electronic"]
+            assert all(genre.id is not None for genre in result)
 
-            expected_calls = [
-                mocker.call("genre", {"name": "rock "}),
-                mocker.call("genre", {"name": " jazz "}),
-                mocker.call("genre", {"name": " electronic"}),
-            ]
-            mock_construct.assert_has_calls(expected_calls)
+    def test_create_genres_reuses_existing_genres(self, mocker, app):
+        """Test that create_genres only inserts genres that do not exist yet, in one batch"""
+        with app.app_context():
+            (existing,) = Genre.create_genres("rock")
+            mock_insert_all = mocker.patch(
+                "databass.db.operations.insert_all",
+                side_effect=databass.db.operations.insert_all,
+            )
+
+            result = Genre.create_genres("jazz,rock,punk")
+
+            assert result[1] is existing
+            mock_insert_all.assert_called_once()
+            inserted = mock_insert_all.call_args[0][0]
+            assert [genre.name for genre in inserted] == ["jazz", "punk"]
+
+    def test_create_genres_does_not_reload_new_genres(self, app):
+        """Test that new genres are not re-selected one by one after being inserted"""
+        with app.app_context():
+            app_db = databass.db.operations.app_db
+            statements = []
+
+            def record(conn, cursor, statement, *args):
+                statements.append(statement)
+
+            event.listen(app_db.engine, "before_cursor_execute", record)
+            try:
+                Genre.create_genres("rock,jazz,electronic")
+            finally:
+                event.remove(app_db.engine, "before_cursor_execute", record)
+
+            selects = [s for s in statements if s.lstrip().startswith("SELECT")]
+            assert len(selects) == 1
+
+    @pytest.mark.parametrize(
+        "genres_string,expected_genres",
+        [
+            ("rock,jazz", ["rock", "jazz"]),
+            ("electronic", ["electronic"]),
+            ("rock , jazz , electronic", ["rock", "jazz", "electronic"]),
+            ("rock,,rock, jazz", ["rock", "jazz"]),
+            ("", []),
+            (" , ", []),
+        ],
+    )
+    def test_create_genres_splits_string_correctly(
+        self, genres_string, expected_genres, app
+    ):
+        """Test that create_genres strips names and skips blanks and repeats"""
+        with app.app_context():
+            result = Genre.create_genres(genres_string)
+
+            assert [genre.name for genre in result] == expected_genres
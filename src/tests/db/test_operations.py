@@ -1,7 +1,18 @@
+from unittest.mock import MagicMock
 import pytest
 from sqlalchemy.exc import IntegrityError
-from databass.db.operations import insert, update, delete, get_model, construct_item
+from sqlalchemy.orm import Session
+from databass.db.operations import (
+    insert,
+    insert_all,
+    update,
+    delete,
+    get_model,
+    construct_item,
+    STATS_CACHE,
+)
 from databass.db.models import Artist, Label, Release
+from databass.db.operations import app_db
 
 
 class MockModel:
@@ -19,23 +30,35 @@ mock_models = {
 }
 
 
-@pytest.fixture
+def get_mock_model(model_name: str):
+    return mock_models.get(model_name.capitalize())
+
+
+@pytest.fixture(scope="session")
 def mock_model_fixture():
-    return lambda model_name: mock_models.get(model_name.capitalize(), None)
+    return get_mock_model
+
+
+@pytest.fixture(scope="session")
+def session_mock():
+    """
+    One mock session shared by every test, reset after each. Specced on Session,
+    so a misspelled session method in a test fails instead of passing silently
+    """
+    return MagicMock(spec=Session)
 
 
 @pytest.fixture
-def mock_db_session(mocker):
+def mock_db_session(monkeypatch, session_mock):
     """Fixture to mock database session"""
-    return mocker.patch("databass.db.operations.app_db.session")
+    monkeypatch.setattr(app_db, "session", session_mock)
+    yield session_mock
+    session_mock.reset_mock(return_value=True, side_effect=True)
 
 
 class TestGetModel:
     # Tests for get_model()
-    def test_get_model_success(self, mocker):
-        class MockModel:
-            pass
-
+    def test_get_model_success(self):
         result = get_model("release")
         assert result == Release
 
@@ -44,13 +67,11 @@ class TestGetModel:
         with pytest.raises(ValueError, match="model_name must be a string"):
             get_model(model)
 
-    def test_get_model_fail_model_not_found(self, mocker):
+    def test_get_model_fail_model_not_found(self, monkeypatch):
         class MockModel:
             pass
 
-        mock_globals = mocker.patch(
-            "databass.db.util.globals", return_value={"Model": MockModel}
-        )
+        monkeypatch.setattr("databass.db.registry.MODELS", {"model": MockModel})
         with pytest.raises(NameError, match="No model with the name"):
             get_model("TestModel")
 
@@ -68,26 +89,27 @@ class TestConstructItem:
             ("tag", {"name": "Test Tag"}),
         ],
     )
-    def test_construct_item_success(self, model, data_dict, mocker, mock_model_fixture):
-        mocker.patch("databass.db.operations.get_model", side_effect=mock_model_fixture)
+    def test_construct_item_success(
+        self, model, data_dict, monkeypatch, mock_model_fixture
+    ):
+        monkeypatch.setattr("databass.db.operations.get_model", mock_model_fixture)
         item = construct_item(model_name=model, data_dict=data_dict)
         expected_class = mock_model_fixture(model)
         name = "Test " + model.capitalize()
         assert isinstance(item, expected_class)
         assert item.name == name
 
-    def test_construct_item_fail_invalid_model_name(self, mocker, mock_model_fixture):
+    def test_construct_item_fail_invalid_model_name(
+        self, monkeypatch, mock_model_fixture
+    ):
         """
         Test for successful handling of a model name not found in valid_models
         """
-        mock_get_model = mocker.patch(
-            "databass.db.operations.get_model", side_effect=mock_model_fixture
-        )
+        monkeypatch.setattr("databass.db.operations.get_model", mock_model_fixture)
         data_dict = {"name": "asdf"}
         bad_name = "asdf"
         with pytest.raises(NameError):
             construct_item(model_name=bad_name, data_dict=data_dict)
-            mock_get_model.assert_called_once_with(bad_name)
 
 
 class TestInsert:
@@ -109,6 +131,14 @@ class TestInsert:
         mock_db_session.add.assert_called_once_with(test_artist)
         mock_db_session.commit.assert_called_once()
 
+    def test_insert_clears_stats_cache(self, mock_db_session):
+        """Test that cached aggregate results are dropped after a successful insert"""
+        STATS_CACHE[("Release", "ratings_average")] = (float("inf"), 4.5)
+
+        insert(Release(name="Test Release"))
+
+        assert STATS_CACHE == {}
+
     def test_integrity_error_handling(self, mock_db_session):
         """
         Test handling of IntegrityError during insertion
@@ -164,6 +194,38 @@ class TestInsert:
         mock_db_session.commit.assert_called_once()
 
 
+class TestInsertAll:
+    """Tests for insert_all()"""
+
+    def test_successful_insert_all(self, mock_db_session):
+        """Test that all items are added and committed together and their IDs returned"""
+        artists = [Artist(name="First"), Artist(name="Second")]
+        artists[0].id, artists[1].id = 1, 2
+
+        result = insert_all(artists)
+
+        assert result == [1, 2]
+        mock_db_session.add_all.assert_called_once_with(artists)
+        mock_db_session.commit.assert_called_once()
+
+    def test_insert_all_clears_stats_cache(self, mock_db_session):
+        """Test that cached aggregate results are dropped after a successful insert"""
+        STATS_CACHE[("Release", "ratings_average")] = (float("inf"), 4.5)
+
+        insert_all([Release(name="Test Release")])
+
+        assert STATS_CACHE == {}
+
+    def test_insert_all_integrity_error_handling(self, mock_db_session):
+        """Test that an IntegrityError is re-raised and the session rolled back"""
+        mock_db_session.commit.side_effect = IntegrityError("statement", "params", "orig")
+
+        with pytest.raises(IntegrityError):
+            insert_all([Label(name="Test Label")])
+
+        mock_db_session.rollback.assert_called_once()
+
+
 class TestUpdate:
     """Tests for update()"""
 
@@ -171,7 +233,7 @@ class TestUpdate:
         """
         Test successful update of an existing database entry
         Verifies that:
-        - query().get() returns the existing item
+        - session.get() returns the existing item
         - commit() is called
         - attributes are updated correctly
         """
@@ -181,10 +243,11 @@ class TestUpdate:
         updated_artist = Artist(name="Updated Name")
         updated_artist.id = 1
 
-        mock_db_session.query().get.return_value = test_artist
+        mock_db_session.get.return_value = test_artist
 
         update(updated_artist)
 
+        mock_db_session.get.assert_called_once_with(Artist, 1)
         assert test_artist.name == "Updated Name"
         mock_db_session.commit.assert_called_once()
 
@@ -198,7 +261,7 @@ class TestUpdate:
         test_artist = Artist(name="Test Artist")
         test_artist.id = 999
 
-        mock_db_session.query().get.return_value = None
+        mock_db_session.get.return_value = None
 
         with pytest.raises(Exception, match=f"No entry found with ID {test_artist.id}"):
             update(test_artist)
@@ -233,7 +296,7 @@ class TestUpdate:
         updated_item = model_class(**updated_data)
         updated_item.id = 1
 
-        mock_db_session.query().get.return_value = initial_item
+        mock_db_session.get.return_value = initial_item
 
         update(updated_item)
 
@@ -251,7 +314,7 @@ class TestUpdate:
         test_artist = Artist(name="Test Artist")
         test_artist.id = 1
 
-        mock_db_session.query().get.side_effect = Exception("Database error")
+        mock_db_session.get.side_effect = Exception("Database error")
 
         with pytest.raises(Exception, match="Unexpected error: Database error"):
             update(test_artist)
@@ -273,7 +336,7 @@ class TestUpdate:
         updated_artist.id = 1
         updated_artist._private_attr = "updated"
 
-        mock_db_session.query().get.return_value = initial_artist
+        mock_db_session.get.return_value = initial_artist
 
         update(updated_artist)
 
@@ -289,15 +352,16 @@ class TestDelete:
         """
         Test successful deletion of a database entry
         Verifies that:
-        - query().where().one() returns the correct item
+        - session.get() returns the correct item
         - delete() is called with correct item
         - commit() is called
         """
         test_artist = Artist(name="Test Artist")
-        mock_db_session.query().where().one.return_value = test_artist
+        mock_db_session.get.return_value = test_artist
 
         delete("artist", "1")
 
+        mock_db_session.get.assert_called_once_with(Artist, "1")
         mock_db_session.delete.assert_called_once_with(test_artist)
         mock_db_session.commit.assert_called_once()
 
@@ -320,19 +384,25 @@ class TestDelete:
         - Exception is raised when item not found
         - Session is rolled back
         """
-        mock_db_session.query().where().one.side_effect = Exception("No such item")
+        mock_db_session.get.side_effect = Exception("No such item")
 
         with pytest.raises(Exception, match="No such item"):
             delete("artist", "999")
 
         mock_db_session.rollback.assert_called_once()
 
+    # delete() only passes the item to session.delete, so one instance per model
+    # can be built at collection time and shared
     @pytest.mark.parametrize(
-        "model_type,item_id,expected_model",
-        [("artist", "1", Artist), ("label", "2", Label), ("release", "3", Release)],
+        "model_type,item_id,test_item",
+        [
+            ("artist", "1", Artist(name="Test Item")),
+            ("label", "2", Label(name="Test Item")),
+            ("release", "3", Release(name="Test Item")),
+        ],
     )
     def test_delete_different_models(
-        self, mock_db_session, model_type, item_id, expected_model
+        self, mock_db_session, model_type, item_id, test_item
     ):
         """
         Test deletion of different model types
@@ -341,11 +411,11 @@ class TestDelete:
         - Correct model class is queried for each type
         - Correct methods are called for each model type
         """
-        test_item = expected_model(name="Test Item")
-        mock_db_session.query().where().one.return_value = test_item
+        mock_db_session.get.return_value = test_item
 
         delete(model_type, item_id)
 
+        mock_db_session.get.assert_called_once_with(type(test_item), item_id)
         mock_db_session.delete.assert_called_once_with(test_item)
         mock_db_session.commit.assert_called_once()
 
@@ -356,7 +426,7 @@ class TestDelete:
         - Database errors are caught and re-raised with correct message
         - Session is rolled back
         """
-        mock_db_session.query().where().one.side_effect = Exception("Database error")
+        mock_db_session.get.side_effect = Exception("Database error")
 
         with pytest.raises(Exception, match="Database error"):
             delete("artist", "1")
@@ -364,6 +434,6 @@ class TestDelete:
         mock_db_session.rollback.assert_called_once()
 
     def test_delete_no_db_match(self, mock_db_session):
-        mock_db_session.query().where().one.return_value = None
+        mock_db_session.get.return_value = None
         with pytest.raises(ValueError, match="No release entry found"):
             delete("release", 1)
@@ -69,21 +69,38 @@ class TestReleases:
         assert b"release_search" in response.data
 
 
+class TestReleaseSearch:
+    # Tests for /release_search
+    def test_release_search_loads_one_page(self, client, mock_release_data, mocker):
+        mock_search = mocker.patch(
+            "databass.db.models.Release.search_page",
+            return_value=([mock_release_data], 16),
+        )
+        response = client.post("/release_search?page=2", json={"name": "BLUE"})
+        assert response.status_code == 200
+        mock_search.assert_called_once_with({"name": "BLUE"}, page=2, per_page=15)
+
+
 class TestRelease:
     # Tests for /release
     def test_release_successful_page_load(
         self, client, mock_release_data, mock_artist_data, mock_label_data, mocker
     ):
         mocker.patch(
-            "databass.db.models.Release.exists_by_id", return_value=mock_release_data
+            "databass.db.models.Release.get_with_relations",
+            return_value=mock_release_data,
+        )
+        mock_others = mocker.patch(
+            "databass.db.models.Release.others_with", return_value=[]
         )
-        mocker.patch("databass.db.models.Release.get_reviews", return_value=[])
         response = client.get("/release/1")
         assert response.status_code == 200
         assert b"release_container" in response.data
+        mock_others.assert_any_call(mock_release_data, "artist_id")
+        mock_others.assert_any_call(mock_release_data, "label_id")
 
     def test_release_not_found(self, client, mocker):
-        mocker.patch("databass.db.models.Release.exists_by_id", return_value=False)
+        mocker.patch("databass.db.models.Release.get_with_relations", return_value=None)
         response = client.get("/release/99999999999999999999")
         assert response.status_code == 302
         assert b"You should be redirected automatically" in response.data
@@ -124,11 +141,10 @@ class TestEdit:
         """
         Test for successful handling of a POST request, which submits edited data
         """
-        mocker.patch("databass.db.construct_item", return_value=mock_release_data)
-        mocker.patch(
+        mock_exists = mocker.patch(
             "databass.db.models.Release.exists_by_id", return_value=mock_release_data
         )
-        mocker.patch("databass.db.update")
+        mock_update = mocker.patch("databass.db.update")
         response = client.post(
             "/release/1/edit",
             data={
@@ -148,6 +164,13 @@ class TestEdit:
         assert response.status_code == 302
         assert response.location == "/"
         assert b"You should be redirected automatically" in response.data
+        # The loaded release is edited in place; fields not submitted are untouched
+        mock_exists.assert_called_once()
+        mock_update.assert_called_once_with(mock_release_data)
+        assert mock_release_data.rating == "1"
+        assert mock_release_data.listen_date == datetime.datetime(2024, 3, 4)
+        assert mock_release_data.runtime == 3361000
+        assert mock_release_data.mbid == "46004fde-3059-42a8-b399-daa0a18816e0"
 
     def test_edit_post_failure_non_existing_release(self, client, mocker):
         """
@@ -169,12 +192,14 @@ class TestDelete:
         """
         Test for proper handling of a successful deletion
         """
-        mocker.patch("databass.db.delete")
-        mocker.patch("databass.db.models.Release.exists_by_id", return_value="a")
+        mock_delete = mocker.patch("databass.db.delete")
+        mock_exists = mocker.patch("databass.db.models.Release.exists_by_id")
         delete_data = {"id": 1, "type": "release"}
         response = client.post("/delete", json=delete_data)
         assert response.status_code == 302
         assert response.location == "/"
+        mock_delete.assert_called_once_with(item_type="release", item_id=1)
+        mock_exists.assert_not_called()
 
     def test_delete_fail_malformed_request(self, client):
         """
@@ -189,7 +214,10 @@ class TestDelete:
         """
         Test for proper handling of a deletion request for a release that does not exist
         """
-        mocker.patch("databass.db.models.Release.exists_by_id", return_value=False)
+        mocker.patch(
+            "databass.db.delete",
+            side_effect=ValueError("No release entry found for 1"),
+        )
         delete_data = {"id": 1, "type": "release"}
         response = client.post("/delete", json=delete_data)
         assert response.status_code == 302
@@ -1,13 +1,27 @@
+import gzip
+from unittest.mock import patch
 import pytest
 from databass import create_app
+from databass.routes import (
+    country_code,
+    country_name,
+    process_goal_data,
+    SERVE_IMG_DIRS,
+)
 from datetime import datetime
 
 
-@pytest.fixture()
-def client():
+@pytest.fixture(scope="session")
+def app():
+    """One app for the whole run; building it is most of a test's fixed cost"""
     app = create_app()
     app.config.update({"TESTING": True})
-    with app.test_client() as client:
+    return app
+
+
+@pytest.fixture()
+def client(app):
+    with app.app_context(), app.test_client() as client:
         yield client
 
 
@@ -18,6 +32,72 @@ class TestHome:
         assert response.status_code == 200
         assert b"home_release_table" in response.data
 
+    def test_home_uses_batched_goal_counts(self, client, mocker):
+        goal = mocker.MagicMock(
+            start=datetime(2024, 1, 1),
+            end=datetime(2099, 1, 1),
+            type="release",
+            amount=10,
+        )
+        mocker.patch(
+            "databass.db.models.Goal.incomplete_with_counts",
+            return_value=[(goal, 4)],
+        )
+        mock_process = mocker.patch(
+            "databass.routes.process_goal_data", return_value={}
+        )
+        response = client.get("/")
+        assert response.status_code == 200
+        mock_process.assert_called_once_with(goal, 4, mocker.ANY)
+
+
+class TestProcessGoalData:
+    def test_process_goal_data_target(self, mocker):
+        goal = mocker.Mock(
+            start=datetime(2024, 1, 1), end=datetime(2024, 1, 11), type="release", amount=10
+        )
+        result = process_goal_data(goal, 5, today=datetime(2024, 1, 1))
+        assert result["current"] == 5
+        assert result["progress"] == 50
+        assert result["target"] == 0.5
+
+    def test_process_goal_data_past_end(self, mocker):
+        goal = mocker.Mock(
+            start=datetime(2024, 1, 1), end=datetime(2024, 1, 11), type="release", amount=10
+        )
+        result = process_goal_data(goal, 5, today=datetime(2024, 2, 1))
+        assert result["target"] == 0
+
+
+class TestCompression:
+    def test_html_gzipped_when_accepted(self, client):
+        response = client.get("/", headers={"Accept-Encoding": "gzip, deflate"})
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert b"home_release_table" in gzip.decompress(response.data)
+
+    def test_not_gzipped_when_not_accepted(self, client):
+        response = client.get("/")
+        assert "Content-Encoding" not in response.headers
+        assert b"home_release_table" in response.data
+
+    def test_small_response_not_gzipped(self, client, monkeypatch):
+        monkeypatch.setitem(client.application.config, "COMPRESS_MIN_SIZE", 10**9)
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in response.headers
+
+
+class TestHomeReleaseTable:
+    # Tests for /home_release_table
+    def test_home_release_table_passes_cursor(self, client, mocker):
+        mock_page = mocker.patch(
+            "databass.db.models.Release.home_page", return_value=([], True, False)
+        )
+        response = client.get("/home_release_table?after=12")
+        assert response.status_code == 200
+        mock_page.assert_called_once_with(per_page=5, after=12, before=None)
+
 
 class TestNew:
     # Tests for /new
@@ -27,22 +107,32 @@ class TestNew:
         assert b"new-release" in response.data
 
 
+@pytest.fixture(scope="class")
+def class_search_mock():
+    """MusicBrainz.release_search, patched once for the whole test class"""
+    with patch("databass.api.MusicBrainz.release_search") as mock_search:
+        yield mock_search
+
+
 class TestSearch:
     # Tests for /search
-    def test_search_page_load_success(self, client, mocker):
+    @pytest.fixture(autouse=True)
+    def search_mock(self, class_search_mock):
+        """The class-wide release_search mock, reset after each test"""
+        yield class_search_mock
+        class_search_mock.reset_mock(return_value=True, side_effect=True)
+
+    def test_search_page_load_success(self, client, search_mock):
         """
         Test for successful page load
         """
-        mocker.patch(
-            "databass.api.MusicBrainz.release_search",
-            return_value=[
-                {
-                    "release": {"name": "name"},
-                    "artist": {"name": "name"},
-                    "label": {"name": "name"},
-                }
-            ],
-        )
+        search_mock.return_value = [
+            {
+                "release": {"name": "name"},
+                "artist": {"name": "name"},
+                "label": {"name": "name"},
+            }
+        ]
         response = client.post(
             "/search",
             json={
@@ -55,11 +145,11 @@ class TestSearch:
         assert response.status_code == 200
         assert b"data_form" in response.data
 
-    def test_search_page_load_success_no_results(self, client, mocker):
+    def test_search_page_load_success_no_results(self, client, search_mock):
         """
         Test for successful page load when no search results are found
         """
-        mocker.patch("databass.api.MusicBrainz.release_search", return_value=[])
+        search_mock.return_value = []
         response = client.post(
             "/search",
             json={
@@ -72,6 +162,30 @@ class TestSearch:
         assert response.status_code == 200
         assert b"No search results" in response.data
 
+    def test_search_returns_requested_page_only(self, client, search_mock):
+        """
+        Test that a later page repeats the search and renders only that page's results
+        """
+        results = [
+            {
+                "release": {"name": f"release {n}"},
+                "artist": {"name": "name"},
+                "label": {"name": "name"},
+            }
+            for n in range(15)
+        ]
+        search_mock.return_value = results
+        response = client.post(
+            "/search?page=2",
+            json={"release": "search", "artist": "", "label": ""},
+        )
+        assert response.status_code == 200
+        search_mock.assert_called_once_with(release="search", artist="", label="")
+        assert b"release 14" in response.data
+        assert b"release 9<" not in response.data
+        assert b"data_full" not in response.data
+        assert b'id="search_terms"' in response.data
+
     def test_search_malformed_request_no_search_terms(self, client):
         """
         Test for successful page load
@@ -83,6 +197,18 @@ class TestSearch:
         assert response.status_code == 302
         assert response.location == "/error"
 
+    def test_search_blank_search_terms(self, client, search_mock):
+        """
+        Test that blank search terms are rejected without querying MusicBrainz
+        """
+        response = client.post(
+            "/search",
+            json={"referrer": "search", "release": "", "artist": "", "label": ""},
+        )
+        assert response.status_code == 302
+        assert response.location == "/error"
+        search_mock.assert_not_called()
+
     def test_search_non_json(self, client):
         """
         Test for successful handling of a request missing JSON data
@@ -94,6 +220,11 @@ class TestSearch:
 class TestSubmit:
     # Tests for /submit
     # TODO: make compatible with manual submission after routes.submit_manual() is merged into routes.submit()
+    @pytest.fixture
+    def mock_handler(self, mocker):
+        """Mock of handle_submit_data, so submissions don't touch the database or APIs"""
+        return mocker.patch("databass.routes.handle_submit_data")
+
     def test_submit_malformed_request(self, client):
         """
         Test for successful handling of a request missing required data
@@ -134,12 +265,9 @@ class TestSubmit:
             },
         ],
     )
-    def test_submit_successful_page_load(self, client, mocker, data_dict):
+    def test_submit_successful_page_load(self, client, mock_handler, data_dict):
         """Test for successful submission and redirection"""
 
-        # Mock the handle_submit_data function
-        mock_handler = mocker.patch("databass.routes.handle_submit_data")
-
         # Ensure that the mock handler is correctly called in the test
         response = client.post("/submit", data=data_dict)
 
@@ -161,6 +289,34 @@ class TestStats:
         mock_get_stats.assert_called_once()
 
 
+MOCK_GOALS = [
+    {
+        "id": 1,
+        "start": datetime(2024, 1, 1),
+        "end": datetime(2025, 1, 1),
+        "completed": None,
+        "type": "release",
+        "amount": 50,
+    },
+    {
+        "id": 2,
+        "start": datetime(2024, 1, 1),
+        "end": datetime(2026, 1, 1),
+        "completed": None,
+        "type": "album",
+        "amount": 10,
+    },
+    {
+        "id": 3,
+        "start": datetime(2024, 1, 1),
+        "end": datetime(2027, 1, 1),
+        "completed": None,
+        "type": "label",
+        "amount": 250,
+    },
+]
+
+
 class TestGoals:
     # Tests for /goals route
     def test_goals_no_goals_found(self, client, mocker):
@@ -176,33 +332,7 @@ class TestGoals:
         """
         Test that all goals available in database are displayed
         """
-        mock_goals = [
-            {
-                "id": 1,
-                "start": datetime(2024, 1, 1),
-                "end": datetime(2025, 1, 1),
-                "completed": None,
-                "type": "release",
-                "amount": 50,
-            },
-            {
-                "id": 2,
-                "start": datetime(2024, 1, 1),
-                "end": datetime(2026, 1, 1),
-                "completed": None,
-                "type": "album",
-                "amount": 10,
-            },
-            {
-                "id": 3,
-                "start": datetime(2024, 1, 1),
-                "end": datetime(2027, 1, 1),
-                "completed": None,
-                "type": "label",
-                "amount": 250,
-            },
-        ]
-        mocker.patch("databass.db.models.Goal.get_incomplete", return_value=mock_goals)
+        mocker.patch("databass.db.models.Goal.get_incomplete", return_value=MOCK_GOALS)
         response = client.get("/goals")
         assert response.status_code == 200
         assert b"2027-01-01" in response.data
@@ -236,87 +366,107 @@ class TestAddGoal:
         assert response.location == "/error"
 
     @pytest.mark.parametrize(
-        "amount,end_goal,start_date,goal_type",
+        "form",
         [
-            ("4", "2024-10-24", "2024-10-11", "release"),
-            ("100000", "2025-01-01", "2030-12-12", "album"),
-            ("4234", "2111-11-11", "3000-01-01", "label"),
+            {
+                "amount": "4",
+                "end_goal": "2024-10-24",
+                "start_date": "2024-10-11",
+                "type": "release",
+            },
+            {
+                "amount": "100000",
+                "end_goal": "2025-01-01",
+                "start_date": "2030-12-12",
+                "type": "album",
+            },
+            {
+                "amount": "4234",
+                "end_goal": "2111-11-11",
+                "start_date": "3000-01-01",
+                "type": "label",
+            },
         ],
+        ids=["release", "album", "label"],
     )
-    def test_add_goals_goal_construction_success(
-        self, client, mocker, amount, end_goal, start_date, goal_type
-    ):
+    def test_add_goals_goal_construction_success(self, client, mocker, form):
         """
         Test for successful Goal object construction and insertion
         """
         mock_insert = mocker.patch("databass.db.insert", return_value=2)
         mock_goal = mocker.patch("databass.db.construct_item", autospec=True)
-        mock_instance = mock_goal.return_value
-        mock_instance.id = 2
+        mock_goal.return_value.id = 2
 
-        data = {
-            "amount": amount,
-            "end_goal": end_goal,
-            "start_date": start_date,
-            "type": goal_type,
-        }
-        response = client.post("/add_goal", data=data)
+        response = client.post("/add_goal", data=form)
 
-        mock_goal.assert_called_once_with(
-            model_name="goal",
-            data_dict={
-                "amount": amount,
-                "end_goal": end_goal,
-                "start_date": start_date,
-                "type": goal_type,
-            },
-        )
+        mock_goal.assert_called_once_with(model_name="goal", data_dict=form)
         assert response.status_code == 302
         assert response.location == "/goals"
         mock_insert.assert_called_once_with(mock_goal.return_value)
 
 
 class TestCountryCode:
-    def test_country_code_with_valid_country(self, client):
-        country_code = client.application.jinja_env.filters["country_code"]
-
-        def test_filter(country: str):
-            return country_code(country)
+    @pytest.mark.parametrize(
+        "country, expected",
+        [
+            ("United States", "US"),
+            ("US", "US"),
+            ("Invalid Country", "Invalid Country"),
+            (None, None),
+        ],
+    )
+    def test_country_code(self, country, expected):
+        assert country_code(country) == expected
 
-        assert test_filter("United States") == "US"
+    def test_country_code_with_partial_match(self, mocker):
+        mock_lookup = mocker.patch("pycountry.countries.lookup")
+        mock_lookup.side_effect = KeyError
 
-    def test_country_code_with_code(self, client):
-        country_code = client.application.jinja_env.filters["country_code"]
+        assert country_code("United") == "United"
+        mock_lookup.assert_called_once_with("United")
 
-        def test_filter(country: str):
-            return country_code(country)
+    def test_country_code_with_alternate_name(self, mocker):
+        mock_lookup = mocker.patch("pycountry.countries.lookup")
 
-        assert test_filter("US") == "US"
+        assert country_code("bolivia") == "BO"
+        assert country_code("CZE") == "CZ"
+        mock_lookup.assert_not_called()
 
-    def test_country_code_with_invalid_country(self, client):
-        country_code = client.application.jinja_env.filters["country_code"]
 
-        def test_filter(country: str):
-            return country_code(country)
+class TestCountryFilters:
+    def test_filters_registered(self, app):
+        assert app.jinja_env.filters["country_name"]("US") == "United States"
+        assert app.jinja_env.filters["country_code"]("United States") == "US"
 
-        assert test_filter("Invalid Country") == "Invalid Country"
 
-    def test_country_code_with_none(self, client):
-        country_code = client.application.jinja_env.filters["country_code"]
+class TestCountryName:
+    def test_country_name_with_code(self):
+        assert country_name("us") == "United States"
 
-        def test_filter(country: str):
-            return country_code(country)
+    def test_country_name_with_unknown_code(self):
+        assert country_name("XX") == "XX"
+        assert country_name(None) is None
 
-        assert test_filter(None) is None
 
-    def test_country_code_with_partial_match(self, client, mocker):
-        mock_lookup = mocker.patch("pycountry.countries.lookup")
-        mock_lookup.side_effect = KeyError
+class TestServeImage:
+    # Tests for /img/<itemtype>/<itemid>
+    def test_serve_image_found(self, client, tmp_path, monkeypatch):
+        img_dir = tmp_path / "databass" / "static" / "img" / "artist"
+        img_dir.mkdir(parents=True)
+        (img_dir / "3.png").write_bytes(b"\x89PNG\r\n\x1a\n")
+        monkeypatch.setitem(SERVE_IMG_DIRS, "artist", str(img_dir))
 
-        country_code = client.application.jinja_env.filters["country_code"]
+        response = client.get("/img/artist/3")
+        assert response.status_code == 200
+        assert response.data == b"\x89PNG\r\n\x1a\n"
+        assert response.headers["Cache-Control"] == "public, max-age=600"
 
-        def test_filter(country: str):
-            return country_code(country)
+        revalidated = client.get(
+            "/img/artist/3", headers={"If-None-Match": response.headers["ETag"]}
+        )
+        assert revalidated.status_code == 304
+        assert revalidated.data == b""
 
-        assert test_filter("United") == "United"
-        mock_lookup.assert_called_once_with("United")
+    def test_serve_image_invalid_type(self, client):
+        response = client.get("/img/goal/3")
+        assert response.status_code == 404